@@ -0,0 +1,335 @@
+"""Compare how the sync WSGI app and the async app scale with concurrent requests.
+
+Both apps serve the same database (a temporary SQLite file unless --database-url is
+given, seeded like endpoint_benchmark) from a single process each:
+    sync   create_app() on a WSGI server with a fixed pool of --threads threads, the way
+           a threaded worker (e.g. gunicorn --threads) serves it
+    async  create_async_app() under uvicorn, on one thread
+and both get the same connection pool (--pool-size connections, no overflow) with the
+response cache off, so every request reaches the database.
+
+First every GET endpoint of endpoint_benchmark is requested from both servers, and the
+run stops unless the responses are identical. Then, for each --concurrency level, that
+many clients send --requests requests between them, and the throughput, p50 and p99
+latency and the server process's peak memory (resident set size so far) are reported.
+
+On a local database queries return almost at once and both apps are CPU bound. With
+--db-latency-ms, PostgreSQL is reached through a proxy that delays every packet, like a
+database across a network; that is where a sync worker runs out of threads while the
+async one keeps more requests in flight.
+
+Run from the src directory:
+    python -m benchmarks.concurrency_benchmark --database-url postgresql+psycopg2://user@host/db --db-latency-ms 2
+"""
+import argparse
+import asyncio
+import http.client
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Headers that differ between WSGI and ASGI servers rather than between the apps
+SERVER_HEADERS = {"date", "server", "connection", "keep-alive", "transfer-encoding"}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def serve_sync(args):
+    import logging
+    from concurrent.futures import ThreadPoolExecutor
+    from werkzeug.serving import BaseWSGIServer
+    from main import create_app
+
+    executor = ThreadPoolExecutor(max_workers=args.threads)
+    # uvicorn runs without an access log too
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+
+    class PooledWSGIServer(BaseWSGIServer):
+        # Claiming to be multithreaded makes werkzeug speak HTTP/1.1
+        multithread = True
+
+        def process_request(self, request, client_address):
+            executor.submit(self.handle_in_thread, request, client_address)
+
+        def handle_in_thread(self, request, client_address):
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+    server = PooledWSGIServer("127.0.0.1", args.port, create_app())
+    server.request_queue_size = 1024
+    server.serve_forever()
+
+
+def serve_async(args):
+    import uvicorn
+    uvicorn.run("main:create_async_app", factory=True, host="127.0.0.1", port=args.port,
+                log_level="warning", access_log=False, backlog=1024)
+
+
+def serve_proxy(args):
+    """Forward TCP connections to --upstream, delaying every chunk by --delay-ms each way."""
+    delay = args.delay_ms / 1000
+    upstream = args.upstream
+
+    async def pump(reader, writer):
+        queue = asyncio.Queue()
+
+        async def deliver():
+            while True:
+                due, data = await queue.get()
+                await asyncio.sleep(max(0, due - time.monotonic()))
+                if not data:
+                    writer.close()
+                    return
+                writer.write(data)
+                await writer.drain()
+
+        delivery = asyncio.create_task(deliver())
+        try:
+            while True:
+                data = await reader.read(65536)
+                queue.put_nowait((time.monotonic() + delay, data))
+                if not data:
+                    break
+            await delivery
+        except ConnectionError:
+            delivery.cancel()
+
+    async def handle(client_reader, client_writer):
+        if upstream.startswith("/"):
+            server_reader, server_writer = await asyncio.open_unix_connection(upstream)
+        else:
+            host, port = upstream.rsplit(":", 1)
+            server_reader, server_writer = await asyncio.open_connection(host, int(port))
+        await asyncio.gather(pump(client_reader, server_writer), pump(server_reader, client_writer))
+
+    async def main():
+        server = await asyncio.start_server(handle, "127.0.0.1", args.port, backlog=1024)
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(main())
+
+
+def proxied_url(database_url, port):
+    """Return the upstream address of a PostgreSQL URL and the URL pointing at the proxy instead."""
+    from sqlalchemy import make_url
+    url = make_url(database_url)
+    if url.get_backend_name() != "postgresql":
+        raise SystemExit("--db-latency-ms needs a PostgreSQL --database-url")
+    host = url.query.get("host") or url.host or "localhost"
+    upstream_port = url.query.get("port") or url.port or 5432
+    upstream = f"{host}/.s.PGSQL.{upstream_port}" if host.startswith("/") else f"{host}:{upstream_port}"
+    url = url.difference_update_query(["host", "port"]).set(host="127.0.0.1", port=port)
+    return upstream, url.render_as_string(hide_password=False)
+
+
+def start(command, env, port=None):
+    process = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.concurrency_benchmark", "serve", *command],
+        env=env, stdout=subprocess.DEVNULL
+    )
+    if port is not None:
+        deadline = time.monotonic() + 60
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=1).close()
+                break
+            except OSError:
+                if process.poll() is not None or time.monotonic() > deadline:
+                    process.kill()
+                    raise SystemExit(f"Server '{' '.join(command)}' did not start")
+                time.sleep(0.1)
+    return process
+
+
+def peak_rss_mb(pid):
+    """Peak resident set size of a process in MB, or None where /proc is not available."""
+    try:
+        with open(f"/proc/{pid}/status") as file:
+            for line in file:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+
+
+def fetch(port, method, path, headers, body=None):
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    try:
+        if body is not None:
+            body, headers = json.dumps(body), {**headers, "Content-Type": "application/json"}
+        connection.request(method, path, body=body, headers=headers)
+        response = connection.getresponse()
+        kept = sorted((name.lower(), value) for name, value in response.getheaders() if name.lower() not in SERVER_HEADERS)
+        return response.status, kept, response.read()
+    finally:
+        connection.close()
+
+
+def check_identical(ids, ports, headers):
+    from benchmarks.endpoint_benchmark import endpoints
+    checked = 0
+    for name, method, path, _body in endpoints(ids):
+        if method != "GET":
+            continue
+        sync_response, async_response = (fetch(port, method, path, headers) for port in ports)
+        if sync_response != async_response:
+            raise SystemExit(f"{name}: responses differ\n  sync:  {sync_response}\n  async: {async_response}")
+        checked += 1
+    print(f"Responses of {checked} GET endpoints are identical")
+
+
+async def load(port, path, headers, concurrency, requests):
+    request = (
+        f"GET {path} HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\nConnection: close\r\n"
+        + "".join(f"{name}: {value}\r\n" for name, value in headers.items())
+        + "\r\n"
+    ).encode("latin-1")
+    timings, errors = [], 0
+    remaining = iter(range(requests))
+
+    async def client():
+        nonlocal errors
+        for _ in remaining:
+            started = time.perf_counter()
+            try:
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                writer.write(request)
+                head = await reader.readuntil(b"\r\n\r\n")
+                # Stop at the end of the body like an HTTP client, not when the server closes
+                length = next((line.split(b":", 1)[1] for line in head.lower().split(b"\r\n")
+                               if line.startswith(b"content-length:")), None)
+                await (reader.readexactly(int(length)) if length is not None else reader.read(-1))
+                writer.close()
+                if not head.startswith(b"HTTP/1.1 200"):
+                    errors += 1
+                    continue
+            except (OSError, asyncio.IncompleteReadError):
+                errors += 1
+                continue
+            timings.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return timings, errors, time.perf_counter() - started
+
+
+def run(args):
+    database = None
+    if args.database_url:
+        database_url = args.database_url
+    else:
+        database = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        database.close()
+        database_url = f"sqlite:///{database.name}"
+    env = {
+        **os.environ,
+        "DATABASE_URL": database_url,
+        "JWT_SECRET_KEY": os.environ.get("JWT_SECRET_KEY", "benchmark-secret-key-that-is-long-enough"),
+        "RESPONSE_CACHE_ENABLED": "0",
+        "DATABASE_POOL_SIZE": str(args.pool_size),
+        "DATABASE_MAX_OVERFLOW": "0",
+    }
+    os.environ.update(env)
+
+    from main import create_app
+    from benchmarks.endpoint_benchmark import prepare
+
+    with create_app().app_context():
+        ids = prepare(args)
+
+    processes = []
+    try:
+        if args.db_latency_ms:
+            proxy_port = free_port()
+            upstream, env["DATABASE_URL"] = proxied_url(database_url, proxy_port)
+            processes.append(start(["proxy", "--port", str(proxy_port), "--upstream", upstream,
+                                    "--delay-ms", str(args.db_latency_ms)], env, proxy_port))
+
+        ports = {"sync": free_port(), "async": free_port()}
+        servers = {
+            "sync": start(["sync", "--port", str(ports["sync"]), "--threads", str(args.threads)], env, ports["sync"]),
+            "async": start(["async", "--port", str(ports["async"])], env, ports["async"]),
+        }
+        processes.extend(servers.values())
+
+        login = {"email": ids["email"], "password": ids["password"]}
+        _status, _headers, body = fetch(ports["sync"], "POST", "/auth/login", {}, login)
+        headers = {"Authorization": f"Bearer {json.loads(body)['token']}"}
+
+        check_identical(ids, (ports["sync"], ports["async"]), headers)
+
+        path = args.path.format(**ids)
+        print(f"GET {path}  sync: {args.threads} threads  async: 1 event loop  pool: {args.pool_size} connections"
+              + (f"  database latency: {args.db_latency_ms} ms" if args.db_latency_ms else ""))
+        print(f"{'server':<6} {'clients':>7} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7} {'peak MB':>8}")
+        for concurrency in args.concurrency:
+            for mode in ("sync", "async"):
+                asyncio.run(load(ports[mode], path, headers, min(concurrency, 8), min(args.requests, 50)))
+                timings, errors, elapsed = asyncio.run(load(ports[mode], path, headers, concurrency, args.requests))
+                p50 = statistics.median(timings) * 1000 if timings else float("nan")
+                p99 = sorted(timings)[int(len(timings) * 0.99) - 1] * 1000 if timings else float("nan")
+                rss = peak_rss_mb(servers[mode].pid)
+                print(f"{mode:<6} {concurrency:>7} {len(timings) / elapsed:>9.1f} {p50:>9.2f} {p99:>9.2f} {errors:>7} "
+                      + (f"{rss:>8.1f}" if rss is not None else f"{'n/a':>8}"))
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait()
+        if database is not None:
+            os.unlink(database.name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command")
+    parser.add_argument("--database-url", help="Database to use (it is dropped and recreated); defaults to a temporary SQLite file")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--tasks-per-user", type=int, default=20)
+    parser.add_argument("--comments-per-task", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--path", default="/tasks/?fields=id,title,due_date,priority&limit=20",
+                        help="Endpoint to load; {task} and {category} are replaced by ids from the seeded data")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per concurrency level and server")
+    parser.add_argument("--threads", type=int, default=8, help="Threads of the sync server")
+    parser.add_argument("--pool-size", type=int, default=20, help="Database connections of each server")
+    parser.add_argument("--db-latency-ms", type=float, default=0, help="Delay added to every database packet (PostgreSQL only)")
+    parser.set_defaults(func=run)
+
+    serve_parser = commands.add_parser("serve", help=argparse.SUPPRESS)
+    servers = serve_parser.add_subparsers(dest="server", required=True)
+    sync_parser = servers.add_parser("sync")
+    sync_parser.add_argument("--port", type=int, required=True)
+    sync_parser.add_argument("--threads", type=int, required=True)
+    sync_parser.set_defaults(func=serve_sync)
+    async_parser = servers.add_parser("async")
+    async_parser.add_argument("--port", type=int, required=True)
+    async_parser.set_defaults(func=serve_async)
+    proxy_parser = servers.add_parser("proxy")
+    proxy_parser.add_argument("--port", type=int, required=True)
+    proxy_parser.add_argument("--upstream", required=True)
+    proxy_parser.add_argument("--delay-ms", type=float, required=True)
+    proxy_parser.set_defaults(func=serve_proxy)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
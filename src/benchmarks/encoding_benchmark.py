@@ -0,0 +1,80 @@
+"""Compare the response encoders: Flask's default JSON provider, orjson and MessagePack.
+
+Encodes the dumped documents of a large list of in-memory tasks (see
+serializer_benchmark) the way a response does, and decodes them back the way a request
+body is read. Checks that every format decodes to the same documents and reports the best
+time of several runs and the encoded size. A second case encodes rows holding date and
+datetime objects, which the default provider converts in Python one value at a time.
+
+Run from the src directory:
+    python -m benchmarks.encoding_benchmark --tasks 10000
+"""
+import argparse
+import os
+import msgpack
+from flask.json.provider import DefaultJSONProvider
+from benchmarks.serializer_benchmark import best_of, build_tasks
+from main import create_app
+from models.task import tasks_schema
+from utils.json_provider import OrjsonProvider
+from utils.negotiation import packb
+from utils.serializer import fast_dump
+
+
+def encoders(app):
+    default, fast = DefaultJSONProvider(app), OrjsonProvider(app)
+    default.sort_keys = fast.sort_keys = False
+    return {
+        "json (default)": (lambda obj: default.response(obj).get_data(), default.loads),
+        "json (orjson)": (lambda obj: fast.response(obj).get_data(), fast.loads),
+        "msgpack": (packb, msgpack.unpackb),
+    }
+
+
+def compare(label, obj, encoders, repeat, verify=True):
+    print(label)
+    baseline = None
+    for name, (encode, decode) in encoders.items():
+        body = encode(obj)
+        if verify and decode(body) != obj:
+            raise SystemExit(f"{name}: decoded output differs from the input")
+        encoding = best_of(lambda: encode(obj), repeat)
+        decoding = best_of(lambda: decode(body), repeat)
+        baseline = baseline or encoding
+        print(
+            f"  {name:<16} encode {encoding * 1000:8.1f} ms ({baseline / encoding:4.1f}x)"
+            f"   decode {decoding * 1000:8.1f} ms   {len(body) / 1024:8.0f} KiB"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--comments-per-task", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    # The tasks are built in memory; the app only needs some database to start
+    if not os.environ.get("DATABASE_URL"):
+        os.environ["DATABASE_URL"] = "sqlite://"
+    app = create_app()
+    with app.test_request_context():
+        tasks, _categories = build_tasks(args.tasks, args.comments_per_task)
+        documents = fast_dump(tasks_schema, tasks)
+        rows = [
+            {
+                "id": task.id,
+                "due_date": task.due_date,
+                "started_at": task.task_tracking.started_at,
+                "finished_at": task.task_tracking.finished_at
+            }
+            for task in tasks
+        ]
+        print(f"{args.tasks} tasks, {args.comments_per_task} comments each (decoded output verified)")
+        compare("dumped task documents", documents, encoders(app), args.repeat)
+        # The default provider writes HTTP dates and the others ISO 8601, so only time them
+        compare("rows of date and datetime values", rows, encoders(app), args.repeat, verify=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+"""Measure latency, SQL queries and memory of every API endpoint, and compare runs.
+
+The run command builds the app with create_app() against a fresh database (a temporary
+SQLite file unless --database-url is given), fills it with the synthetic dataset from
+flask db seed, and drives each route through the Flask test client. For every endpoint
+it records p50/p95/p99 latency, the number of SQL statements per request and the peak
+memory allocated while handling one request (measured in a separate tracemalloc pass so
+tracing does not skew the timings), and writes them to a JSON file.
+
+The compare command reads two such files and lists the endpoints that got slower, ran
+more queries or allocated more memory than the threshold allows, exiting with status 1
+if there are any. Latency changes below --min-delta-ms are treated as noise.
+
+Run from the src directory:
+    python -m benchmarks.endpoint_benchmark run --output baseline.json
+    python -m benchmarks.endpoint_benchmark run --output current.json
+    python -m benchmarks.endpoint_benchmark compare baseline.json current.json
+"""
+import argparse
+import contextlib
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+
+def endpoints(ids):
+    """The requests to benchmark, as (name, method, path, JSON body) tuples.
+
+    Writes only update rows in place or add a few, so repeated runs measure the same data.
+    """
+    task, other_task, category, comment, tracking = (
+        ids["task"], ids["other_task"], ids["category"], ids["comment"], ids["tracking"]
+    )
+    return [
+        # auth_controller
+        ("auth.login", "POST", "/auth/login", {"email": ids["email"], "password": ids["password"]}),
+        ("auth.update_user", "PATCH", "/auth/users", {"name": "Benchmark Admin"}),
+        # task_controller
+        ("tasks.list", "GET", "/tasks/", None),
+        ("tasks.list_sparse", "GET", "/tasks/?fields=id,title,due_date,priority", None),
+        ("tasks.list_expanded", "GET", "/tasks/?expand=comments.user,user,category,task_tracking", None),
+        ("tasks.list_page_200", "GET", "/tasks/?limit=200", None),
+        ("tasks.search", "GET", "/tasks/search?q=project+report&fields=id,title", None),
+        ("tasks.detail", "GET", f"/tasks/{task}", None),
+        ("tasks.detail_other", "GET", f"/tasks/{other_task}", None),
+        ("tasks.create", "POST", "/tasks/", {"title": "Benchmark task", "priority": "Low", "category": {"label": ids["label"]}}),
+        ("tasks.update", "PATCH", f"/tasks/{task}", {"priority": "High"}),
+        ("tasks.bulk_update", "PATCH", "/tasks/bulk", [{"id": task, "priority": "Medium"}]),
+        # category_controller
+        ("categories.list", "GET", "/categories/?fields=id,label", None),
+        ("categories.detail", "GET", f"/categories/{category}?fields=id,label", None),
+        ("categories.tasks", "GET", f"/categories/{category}/tasks?fields=id,title", None),
+        ("categories.edit", "PATCH", f"/categories/{category}", {"label": ids["label"]}),
+        # comment_controller
+        ("comments.list", "GET", f"/tasks/{task}/comments/", None),
+        ("comments.create", "POST", f"/tasks/{task}/comments/", {"content": "Benchmark comment"}),
+        ("comments.edit", "PATCH", f"/tasks/{task}/comments/{comment}", {"content": "Edited benchmark comment"}),
+        # task_tracking_controller
+        ("task_trackings.list", "GET", f"/tasks/{task}/task_trackings/", None),
+        ("task_trackings.update", "PATCH", f"/tasks/{task}/task_trackings/{tracking}", {"estimated_hours": 12}),
+        # report_controller
+        ("reports.tracking", "GET", "/reports/tracking", None),
+        ("reports.tracking_grouped", "GET", "/reports/tracking?group_by=category,week", None),
+    ]
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def prepare(args):
+    """Create and seed the database, and return the ids the endpoint paths refer to."""
+    from init import db
+    from models.users import User
+    from models.category import Category
+    from models.task import Task
+    from models.comment import Comment
+    from models.task_tracking import TaskTracking
+    from utils import synthetic_data
+
+    db.drop_all()
+    db.create_all()
+    start = time.perf_counter()
+    counts, _seconds = synthetic_data.generate(args.users, args.tasks_per_user, args.comments_per_task, args.seed)
+    print(f"Seeded {sum(counts.values()):,} rows in {time.perf_counter() - start:.1f}s")
+
+    admin = db.session.scalar(db.select(User).filter_by(is_admin=True).order_by(User.id))
+    tracked = db.session.scalar(
+        db.select(TaskTracking).join(Task).filter(Task.user_id == admin.id).order_by(TaskTracking.id)
+    )
+    if tracked is None:
+        raise SystemExit("The admin user has no tracked tasks; use more --tasks-per-user")
+    comment = Comment(content="Benchmark comment", timestamp=datetime.now(), user_id=admin.id, task_idfi=tracked.task_id)
+    db.session.add(comment)
+    db.session.commit()
+
+    category = db.session.scalar(db.select(Category).order_by(Category.id))
+    other_task = db.session.scalar(db.select(Task.id).filter(Task.user_id != admin.id).order_by(Task.id))
+    ids = {
+        "email": admin.email,
+        "password": synthetic_data.SYNTHETIC_PASSWORD,
+        "task": tracked.task_id,
+        "other_task": other_task or tracked.task_id,
+        "category": category.id,
+        "label": category.label,
+        "comment": comment.id,
+        "tracking": tracked.id,
+    }
+    db.session.remove()
+    return ids
+
+
+def measure(client, headers, method, path, body, iterations, warmup, memory_iterations, queries):
+    for _ in range(warmup):
+        client.open(path, method=method, json=body, headers=headers)
+
+    # Start each endpoint without garbage left over from the previous one
+    gc.collect()
+    timings = []
+    query_counts = []
+    status = None
+    for _ in range(iterations):
+        queries[0] = 0
+        start = time.perf_counter()
+        response = client.open(path, method=method, json=body, headers=headers)
+        response.get_data()
+        timings.append(time.perf_counter() - start)
+        query_counts.append(queries[0])
+        status = response.status_code
+
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(memory_iterations):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            client.open(path, method=method, json=body, headers=headers).get_data()
+            peaks.append(tracemalloc.get_traced_memory()[1] - before)
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "method": method,
+        "path": path,
+        "status": status,
+        "iterations": iterations,
+        "p50_ms": round(percentile(timings, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(timings, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(timings, 0.99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(timings) * 1000, 3),
+        "queries": statistics.median_low(query_counts),
+        "peak_alloc_kb": round(max(peaks) / 1024, 1) if peaks else None,
+    }
+
+
+def run(args):
+    database = None
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        database = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        database.close()
+        os.environ["DATABASE_URL"] = f"sqlite:///{database.name}"
+    os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret-key-that-is-long-enough")
+    if args.no_cache:
+        os.environ["RESPONSE_CACHE_ENABLED"] = "0"
+
+    from sqlalchemy import event
+    from main import create_app
+    from init import db
+
+    app = create_app()
+    results = {}
+    try:
+        with app.app_context():
+            ids = prepare(args)
+            queries = [0]
+            event.listen(db.engine, "before_cursor_execute", lambda *_args: queries.__setitem__(0, queries[0] + 1))
+            engine_name = db.engine.dialect.name
+
+        client = app.test_client()
+        token = client.post("/auth/login", json={"email": ids["email"], "password": ids["password"]}).json["token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        selected = [endpoint for endpoint in endpoints(ids) if not args.only or any(name in endpoint[0] for name in args.only)]
+        for name, method, path, body in selected:
+            # bcrypt dominates login, so fewer iterations are enough
+            iterations = max(5, args.iterations // 10) if name == "auth.login" else args.iterations
+            # Keep the controllers' debug prints out of the report
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                results[name] = measure(client, headers, method, path, body, iterations, args.warmup, args.memory_iterations, queries)
+            result = results[name]
+            print(f"{name:<24} {result['status']:>3}  p50 {result['p50_ms']:8.2f} ms  p95 {result['p95_ms']:8.2f} ms  "
+                  f"p99 {result['p99_ms']:8.2f} ms  queries {result['queries']:>3}  peak {result['peak_alloc_kb']:>9.1f} KB")
+    finally:
+        if database is not None:
+            os.unlink(database.name)
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "database": engine_name,
+            "python": platform.python_version(),
+            "users": args.users,
+            "tasks_per_user": args.tasks_per_user,
+            "comments_per_task": args.comments_per_task,
+            "seed": args.seed,
+            "response_cache": not args.no_cache,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"Results written to {args.output}")
+
+
+def compare(args):
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    with open(args.current) as file:
+        current = json.load(file)
+
+    regressions = []
+    print(f"{'endpoint':<24} {'p50 ms':>19} {'p95 ms':>19} {'queries':>9} {'peak KB':>21}")
+    for name, new in current["results"].items():
+        old = baseline["results"].get(name)
+        if old is None:
+            print(f"{name:<24} (not in baseline)")
+            continue
+
+        problems = []
+        for metric, min_delta in (("p50_ms", args.min_delta_ms), ("p95_ms", args.min_delta_ms), ("peak_alloc_kb", 1)):
+            if old[metric] and new[metric] > old[metric] * (1 + args.threshold) and new[metric] - old[metric] >= min_delta:
+                problems.append(f"{metric} {old[metric]} -> {new[metric]}")
+        if new["queries"] > old["queries"]:
+            problems.append(f"queries {old['queries']} -> {new['queries']}")
+
+        flag = "  REGRESSION" if problems else ""
+        print(f"{name:<24} {old['p50_ms']:>8.2f} -> {new['p50_ms']:<8.2f} {old['p95_ms']:>8.2f} -> {new['p95_ms']:<8.2f} "
+              f"{old['queries']:>3} -> {new['queries']:<3} {old['peak_alloc_kb']:>9.1f} -> {new['peak_alloc_kb']:<9.1f}{flag}")
+        if problems:
+            regressions.append((name, problems))
+
+    if regressions:
+        print(f"\n{len(regressions)} endpoint(s) regressed beyond {args.threshold:.0%}:")
+        for name, problems in regressions:
+            print(f"  {name}: {', '.join(problems)}")
+        sys.exit(1)
+    print(f"\nNo regressions beyond {args.threshold:.0%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Benchmark every endpoint and write the results as JSON")
+    run_parser.add_argument("--database-url", help="Database to use (it is dropped and recreated); defaults to a temporary SQLite file")
+    run_parser.add_argument("--users", type=int, default=200)
+    run_parser.add_argument("--tasks-per-user", type=int, default=20)
+    run_parser.add_argument("--comments-per-task", type=int, default=3)
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--iterations", type=int, default=200)
+    run_parser.add_argument("--warmup", type=int, default=10)
+    run_parser.add_argument("--memory-iterations", type=int, default=5)
+    run_parser.add_argument("--only", nargs="*", help="Only benchmark endpoints whose name contains one of these")
+    run_parser.add_argument("--no-cache", action="store_true", help="Disable the response cache")
+    run_parser.add_argument("--output", default="benchmark-results.json")
+    run_parser.set_defaults(func=run)
+
+    compare_parser = commands.add_parser("compare", help="Flag regressions between two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="Allowed relative increase (default 0.10)")
+    compare_parser.add_argument("--min-delta-ms", type=float, default=1.0, help="Ignore latency increases smaller than this (default 1.0)")
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Compare the compiled serializer against marshmallow on a large list of tasks.
+
+Builds in-memory tasks (no database needed), each with an owner, a category, a tracking
+record and a few comments, checks that both serializers produce byte-identical JSON and
+reports the best time of several runs.
+
+Run from the src directory:
+    python -m benchmarks.serializer_benchmark --tasks 10000
+"""
+import argparse
+import os
+import json
+import time
+from datetime import date, datetime, timedelta
+from main import create_app
+from models.users import User
+from models.category import Category, categories_schema
+from models.task import Task, tasks_schema
+from models.comment import Comment
+from models.task_tracking import TaskTracking
+from utils.serializer import compile_schema
+
+
+def build_tasks(count, comments_per_task):
+    users = [User(id=i, name=f"User {i}", email=f"user{i}@example.com") for i in range(1, 51)]
+    categories = [Category(id=i, label=label) for i, label in enumerate(["Work", "Personal", "Team Collaboration", "On Hold"], 1)]
+    started = datetime(2024, 7, 1, 9, 30)
+    tasks = []
+    comment_id = 1
+    for i in range(1, count + 1):
+        task = Task(
+            id=i,
+            title=f"Task {i}",
+            description="Prepare and submit the final project report by the end of the week.",
+            due_date=date(2024, 7, 1) + timedelta(days=i % 365),
+            priority=("Low", "Medium", "High")[i % 3],
+            user=users[i % len(users)],
+            category=categories[i % len(categories)],
+        )
+        task.task_tracking = TaskTracking(
+            id=i, estimated_hours=float(i % 40), actual_hours=None,
+            started_at=started, finished_at=started + timedelta(hours=i % 12)
+        )
+        for _ in range(comments_per_task):
+            task.comments.append(Comment(
+                id=comment_id, content="Looks good, needs more testing.",
+                timestamp=started + timedelta(minutes=comment_id), user=users[comment_id % len(users)]
+            ))
+            comment_id += 1
+        tasks.append(task)
+    return tasks, categories
+
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def compare(label, schema, objs, repeat):
+    compiled = compile_schema(schema)
+    expected = json.dumps(schema.dump(objs)).encode()
+    actual = json.dumps(compiled(objs)).encode()
+    if expected != actual:
+        raise SystemExit(f"{label}: compiled output differs from marshmallow")
+
+    slow = best_of(lambda: schema.dump(objs), repeat)
+    fast = best_of(lambda: compiled(objs), repeat)
+    print(f"{label:<28} marshmallow {slow * 1000:9.1f} ms   compiled {fast * 1000:9.1f} ms   speedup {slow / fast:5.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--comments-per-task", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    # The tasks are built in memory; the app only needs some database to start
+    if not os.environ.get("DATABASE_URL"):
+        os.environ["DATABASE_URL"] = "sqlite://"
+    app = create_app()
+    with app.app_context():
+        tasks, categories = build_tasks(args.tasks, args.comments_per_task)
+        print(f"{args.tasks} tasks, {args.comments_per_task} comments each (output verified byte-identical)")
+        compare("tasks_schema", tasks_schema, tasks, args.repeat)
+        compare("categories_schema", categories_schema, categories, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
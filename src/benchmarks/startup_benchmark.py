@@ -0,0 +1,144 @@
+"""Measure how long a new worker takes to import the app, create it and answer its first request.
+
+Every run is a fresh Python process, like a worker started by an autoscaler. It imports
+main, calls create_app, waits until GET /ready passes and sends one request through the
+Flask test client, then a second one for comparison. The runs cover each startup mode:
+    eager          controllers imported and serializers compiled in create_app (the default)
+    lazy           STARTUP_LAZY: controllers imported on the first request
+    prewarm        STARTUP_PREWARM: warmed up in the background before /ready passes
+    lazy+prewarm   both
+    lazy-metrics   STARTUP_LAZY with METRICS_ENABLED=0, which skips importing prometheus_client
+The median of --runs runs is reported for each phase, and for the whole process from
+being spawned to receiving its first response.
+
+Run from the src directory:
+    python -m benchmarks.startup_benchmark --runs 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Settings of each startup mode
+MODES = {
+    "eager": {},
+    "lazy": {"STARTUP_LAZY": "1"},
+    "prewarm": {"STARTUP_PREWARM": "1"},
+    "lazy+prewarm": {"STARTUP_LAZY": "1", "STARTUP_PREWARM": "1"},
+    "lazy-metrics": {"STARTUP_LAZY": "1", "METRICS_ENABLED": "0"},
+}
+
+PHASES = ("import", "create_app", "ready", "first", "second", "process")
+
+
+def child(args):
+    """Time the startup phases in this process and print them as a JSON line."""
+    started = time.perf_counter()
+    import main
+    imported = time.perf_counter()
+    app = main.create_app()
+    created = time.perf_counter()
+
+    client = app.test_client()
+    while client.get("/ready").status_code != 200:
+        time.sleep(0.001)
+    ready = time.perf_counter()
+
+    response = client.get(args.path)
+    if response.status_code != 200:
+        raise SystemExit(f"GET {args.path} returned {response.status_code}")
+    first = time.perf_counter()
+    client.get(args.path)
+    second = time.perf_counter()
+
+    print(json.dumps({
+        "import": imported - started,
+        "create_app": created - imported,
+        "ready": ready - created,
+        "first": first - ready,
+        "second": second - first,
+        "modules": len(sys.modules),
+    }), flush=True)
+
+
+def run(args):
+    database = None
+    if args.database_url:
+        database_url = args.database_url
+    else:
+        database = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        database.close()
+        database_url = f"sqlite:///{database.name}"
+    env = {
+        **os.environ,
+        "DATABASE_URL": database_url,
+        "JWT_SECRET_KEY": os.environ.get("JWT_SECRET_KEY", "benchmark-secret-key-that-is-long-enough"),
+    }
+    os.environ.update(env)
+
+    try:
+        # Seed from a separate process, so this one has not imported the app either
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.startup_benchmark", "seed", "--users", str(args.users)],
+            env=env, check=True, stdout=subprocess.DEVNULL
+        )
+
+        print(f"GET {args.path}, median of {args.runs} runs (ms)")
+        print(f"{'mode':<13}" + "".join(f"{phase:>11}" for phase in PHASES) + f"{'modules':>9}")
+        for mode, settings in MODES.items():
+            runs = []
+            for _ in range(args.runs):
+                spawned = time.perf_counter()
+                output = subprocess.run(
+                    [sys.executable, "-m", "benchmarks.startup_benchmark", "child", "--path", args.path],
+                    env={**env, **settings}, check=True, capture_output=True, text=True
+                ).stdout
+                timings = json.loads(output.splitlines()[-1])
+                # The child reports just before exiting; its exit is not part of the startup
+                timings["process"] = time.perf_counter() - spawned
+                runs.append(timings)
+            medians = {phase: statistics.median(run[phase] for run in runs) * 1000 for phase in PHASES}
+            modules = statistics.median(run["modules"] for run in runs)
+            print(f"{mode:<13}" + "".join(f"{medians[phase]:>11.1f}" for phase in PHASES) + f"{modules:>9.0f}")
+    finally:
+        if database is not None:
+            os.unlink(database.name)
+
+
+def seed(args):
+    from main import create_app
+    from init import db
+    from utils import synthetic_data
+
+    with create_app().app_context():
+        db.drop_all()
+        db.create_all()
+        synthetic_data.generate(args.users, 10, 3, 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command")
+    parser.add_argument("--database-url", help="Database to use (it is dropped and recreated); defaults to a temporary SQLite file")
+    parser.add_argument("--users", type=int, default=20, help="Synthetic users to seed, with 10 tasks each")
+    parser.add_argument("--path", default="/tasks/?limit=20", help="Endpoint to request")
+    parser.add_argument("--runs", type=int, default=10, help="Processes started per mode")
+    parser.set_defaults(func=run)
+
+    child_parser = commands.add_parser("child", help=argparse.SUPPRESS)
+    child_parser.add_argument("--path", required=True)
+    child_parser.set_defaults(func=child)
+    seed_parser = commands.add_parser("seed", help=argparse.SUPPRESS)
+    seed_parser.add_argument("--users", type=int, required=True)
+    seed_parser.set_defaults(func=seed)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,29 @@
 from datetime import timedelta 
 from flask import Blueprint, request 
 from models.users import User, user_schema, UserSchema
-from init import bcrypt, db 
+from init import db 
 from sqlalchemy.exc import IntegrityError
-from psycopg2 import errorcodes
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import create_access_token, jwt_required, current_user
+from utils.loading import loader_options
+from utils.passwords import password_hasher
+from utils.serializer import fast_dump, load_data
 
 auth_bp = Blueprint("auth", __name__, url_prefix="/auth")
 
+# SQLSTATE codes of psycopg2.errorcodes, written out so the controller doesn't import psycopg2
+NOT_NULL_VIOLATION = "23502"
+UNIQUE_VIOLATION = "23505"
+
+def load_user(user_id):
+    """Load a user with everything user_schema dumps, in one query per relationship level."""
+    stmt = db.select(User).filter_by(id=user_id).options(*loader_options(User, user_schema))
+    return db.session.scalar(stmt)
+
+def violated_column(err):
+    # psycopg2 reports the column in diag; with asyncpg it is on the driver's own exception
+    diag = getattr(err.orig, "diag", None)
+    return diag.column_name if diag is not None else getattr(err.orig.__cause__, "column_name", None)
+
 @auth_bp.route("/register", methods=["POST"])
 def register_user():
     """Registers a new user.
@@ -20,7 +36,7 @@ def register_user():
         409: If the email is already in use or a required field is missing.
     """
     try:
-        body_data = UserSchema().load(request.get_json())
+        body_data = load_data(UserSchema(), request.get_json())
         user = User(
             name=body_data.get("name"), 
             email=body_data.get("email")
@@ -28,18 +44,18 @@ def register_user():
     
         password = body_data.get("password")
         if password: 
-            user.password = bcrypt.generate_password_hash(password).decode("utf-8")
+            user.password = password_hasher.hash(password)
 
         db.session.add(user)
         db.session.commit()
 
-        return user_schema.dump(user), 201
+        return fast_dump(user_schema, load_user(user.id)), 201
     
     except IntegrityError as err: 
-        if err.orig.pgcode == errorcodes.NOT_NULL_VIOLATION:
-            return {"error": f"The column {err.orig.diag.column_name} is required"}, 409 
+        if err.orig.pgcode == NOT_NULL_VIOLATION:
+            return {"error": f"The column {violated_column(err)} is required"}, 409 
         
-        if err.orig.pgcode == errorcodes.UNIQUE_VIOLATION:
+        if err.orig.pgcode == UNIQUE_VIOLATION:
             return {"error": "Email address is already in use"}, 409
 
 @auth_bp.route("/login", methods=["POST"])
@@ -62,7 +78,7 @@ def login_user():
         stmt = db.select(User).filter_by(email=body_data.get("email"))
         user = db.session.scalar(stmt)
 
-        if user and bcrypt.check_password_hash(user.password, body_data.get("password")): 
+        if user and password_hasher.check(user.password, body_data.get("password")): 
             token = create_access_token(identity=str(user.id), expires_delta=timedelta(days=1))
             return {"email": user.email, "is_admin": user.is_admin, "token": token}
       
@@ -83,17 +99,33 @@ def update_user():
     Errors:
         404: If the user does not exist.
     """
-    body_data = UserSchema().load(request.get_json(), partial=True)
+    body_data = load_data(UserSchema(), request.get_json(), partial=True)
     password = body_data.get("password")
-    stmt = db.select(User).filter_by(id=get_jwt_identity())
-    user = db.session.scalar(stmt)
+    user = db.session.get(User, current_user.id)
     if user: 
         user.name = body_data.get("name") or user.name 
         if password:
-            user.password = bcrypt.generate_password_hash(password).decode("utf-8")
+            user.password = password_hasher.hash(password)
         
         db.session.commit()
 
-        return user_schema.dump(user)
+        # The commit expired the user; reload it with its tasks, comments and tracking records
+        return fast_dump(user_schema, load_user(user.id))
     else:
         return{"error": "User does not exist"}
+
+@auth_bp.route("/hashing/stats", methods=["GET"])
+@jwt_required()
+def get_hashing_stats():
+    """Fetches the password hashing pool counters of the worker handling the request.
+
+    Returns:
+        JSON: Completed, rejected and in-flight operations, plus queue wait and hash times.
+
+    Errors:
+        403: If the user is not an admin.
+    """
+    if not current_user.is_admin:
+        return {"error": "Only admins can view hashing statistics"}, 403
+
+    return password_hasher.stats()
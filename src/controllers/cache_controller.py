@@ -0,0 +1,21 @@
+from flask import Blueprint
+from flask_jwt_extended import jwt_required, current_user
+from utils.cache import response_cache
+
+cache_bp = Blueprint("cache", __name__, url_prefix="/cache")
+
+# Fetch response cache counters - GET
+@cache_bp.route("/stats", methods=["GET"])
+@jwt_required()
+def get_cache_stats():
+    """Fetch the response cache counters of the worker handling the request.
+
+    Returns:
+        JSON: Hits, misses, evictions, expirations, invalidations, entries and bytes.
+        200: Counters fetched successfully.
+        403: The user is not an admin.
+    """
+    if not current_user.is_admin:
+        return {"error": "Only admins can view cache statistics"}, 403
+
+    return response_cache.stats()
@@ -4,11 +4,21 @@ from init import db
 from models.category import Category, category_schema, categories_schema
 from models.task import Task, task_schema, tasks_schema
 from sqlalchemy.exc import SQLAlchemyError
+from utils.cache import cached
+from utils.conditional import conditional
+from utils.loading import loader_options
+from utils.projection import projected_schema
+from utils.replicas import read_only
+from utils.serializer import fast_dump, load_data
+from utils.streaming import stream_json, wants_stream
+from utils.validators import categories_version, category_version
 
 categories_bp = Blueprint("categories", __name__, url_prefix="/categories")
 
 # Fetch tasks by category - GET
 @categories_bp.route("/<int:category_id>/tasks", methods=["GET"])
+@read_only
+@conditional(category_version)
 def get_tasks_by_category(category_id):
     """Fetch tasks for a specific category.
     This endpoint allows users to fetch tasks belonging to a specific category.
@@ -16,21 +26,35 @@ def get_tasks_by_category(category_id):
     Args:
         category_id (int): The ID of the category whose tasks will be fetched.
 
+    Query Parameters:
+        fields (str): Comma separated task fields to return.
+        expand (str): Comma separated relationships to include (user, comments, category, task_tracking).
+        stream (bool): Stream the tasks as a chunked JSON array.
+
     Returns:
         JSON: A list of tasks in the specified category or an error message.
         200: Tasks fetched successfully.
+        400: Unknown field or relationship requested.
         404: No tasks found for the specified category.
         500: Internal server error.
     """ 
+    schema = projected_schema(tasks_schema)
     try:
         print(f"Fetching tasks for category_id: {category_id}")  # Debug print
 
         # Fetching tasks by category_id
-        stmt = db.select(Task).filter_by(category_id=category_id)
+        stmt = db.select(Task).filter_by(category_id=category_id).options(*loader_options(Task, schema))
+
+        if wants_stream():
+            has_tasks = db.session.scalar(db.select(Task.id).filter_by(category_id=category_id).limit(1))
+            if not has_tasks:
+                return {"error": f"No tasks found for category with id {category_id}"}, 404
+            return stream_json(stmt.order_by(Task.id), schema)
+
         tasks = db.session.scalars(stmt).all()
 
         if tasks:
-            response = jsonify(tasks_schema.dump(tasks))
+            response = jsonify(fast_dump(schema, tasks))
             return response 
         else:
             return {"error": f"No tasks found for category with id {category_id}"}, 404
@@ -40,25 +64,40 @@ def get_tasks_by_category(category_id):
 
 # Fetch all categories - GET
 @categories_bp.route("/", methods=["GET"])
+@read_only
+@conditional(categories_version)
 def get_all_categories():
     """Fetch all categories.
     This endpoint allows users to fetch all categories.
 
+    Query Parameters:
+        fields (str): Comma separated category fields to return.
+        expand (str): Comma separated relationships to include (tasks, tasks.comments, ...).
+        stream (bool): Stream the categories as a chunked JSON array.
+
     Returns:
         JSON: A list of all categories or an error message.
         200: Categories fetched successfully.
+        400: Unknown field or relationship requested.
         500: Internal server error.
     """
+    schema = projected_schema(categories_schema)
     try:
-        stmt = db.select(Category).order_by(Category.label)
+        stmt = db.select(Category).order_by(Category.label).options(*loader_options(Category, schema))
+        if wants_stream():
+            return stream_json(stmt, schema)
+
         categories = db.session.scalars(stmt).all()
-        return jsonify(categories_schema.dump(categories))
+        return jsonify(fast_dump(schema, categories))
     
     except Exception:
         return {"error": "An unexpected error occurred while fetching categories"}, 500
 
 # Fetch a single category - GET
 @categories_bp.route("/<int:category_id>", methods=["GET"])
+@read_only
+@conditional(category_version)
+@cached
 def get_one_category(category_id):
     """Fetch a single category by its ID.
     This endpoint allows users to fetch a category by its ID.
@@ -66,17 +105,23 @@ def get_one_category(category_id):
     Args:
         category_id (int): The ID of the category to be fetched.
 
+    Query Parameters:
+        fields (str): Comma separated category fields to return.
+        expand (str): Comma separated relationships to include (tasks, tasks.comments, ...).
+
     Returns:
         JSON: The category data or an error message.
         200: Category fetched successfully.
+        400: Unknown field or relationship requested.
         404: Category not found.
         500: Internal server error.
     """
+    schema = projected_schema(category_schema)
     try: 
-        stmt = db.select(Category).filter_by(id=category_id)
+        stmt = db.select(Category).filter_by(id=category_id).options(*loader_options(Category, schema))
         category = db.session.scalar(stmt)
         if category:
-            return jsonify(category_schema.dump(category))
+            return jsonify(fast_dump(schema, category))
         else:
             return {"error": f"Category with id {category_id} not found"}, 404
         
@@ -107,7 +152,7 @@ def create_category(task_id):
 
     try: 
         # Load the request data
-        category_data = category_schema.load(body_data, partial=True)
+        category_data = load_data(category_schema, body_data, partial=True)
 
         # Fetch the task by ID from the database
         stmt = db.select(Task).filter_by(id=task_id)
@@ -117,7 +162,7 @@ def create_category(task_id):
             return {"error": f"Task with ID {task_id} not found"}, 404
 
         # Check for unique label
-        existing_category = Category.query.filter_by(label=category_data.get("label")).first()
+        existing_category = Category.query.filter(db.func.lower(Category.label) == category_data.get("label", "").lower()).first()
         if existing_category:
             return {"error": "A category with this label already exists."}, 400
 
@@ -131,7 +176,7 @@ def create_category(task_id):
         task.category_id = category.id
         db.session.commit()
 
-        return task_schema.dump(task), 201
+        return fast_dump(task_schema, task), 201
     
     except SQLAlchemyError as e:
         db.session.rollback()
@@ -193,14 +238,14 @@ def edit_category(category_id):
         body_data = request.get_json()
 
         # Fetch the category by ID from the database
-        stmt = db.select(Category).filter_by(id=category_id)
+        stmt = db.select(Category).filter_by(id=category_id).options(*loader_options(Category, category_schema))
         category = db.session.scalar(stmt)
 
         if not category:
             return {"error": f"Category with id {category_id} not found"}, 404
 
         # Validate the unique label
-        existing_category = Category.query.filter_by(label=body_data['label']).first()
+        existing_category = Category.query.filter(db.func.lower(Category.label) == body_data['label'].lower()).first()
         if existing_category and existing_category.id != category_id:
             return {"error": "A category with this label already exists."}, 400
 
@@ -210,7 +255,7 @@ def edit_category(category_id):
 
         db.session.commit()
 
-        return category_schema.dump(category), 200
+        return fast_dump(category_schema, category), 200
 
     except SQLAlchemyError as e:
         db.session.rollback()
@@ -1,37 +1,105 @@
+import os
+import time
 from datetime import date, datetime
-from flask import Blueprint
+import click
+from flask import Blueprint, current_app
 from init import db, bcrypt
 from models.users import User
 from models.task import Task
 from models.comment import Comment
 from models.category import Category 
 from models.task_tracking import TaskTracking  
+from utils import counters, reminders, synthetic_data
 
 db_commands = Blueprint('db', __name__)
+job_commands = Blueprint('jobs', __name__)
+
+def migrations_config():
+    """Alembic configuration pointing at the migrations directory next to this package.
+
+    alembic is imported by the commands that use it rather than with the app, as it
+    takes longer to import than the rest of the CLI.
+    """
+    from alembic.config import Config
+    config = Config()
+    config.set_main_option("script_location", os.path.join(os.path.dirname(os.path.dirname(__file__)), "migrations"))
+    return config
 
 @db_commands.cli.command("create")
 def create_tables():
-    """Creates the database tables."""
+    """Creates the database tables and marks them as up to date with the latest migration."""
+    from alembic import command
     db.create_all()
+    command.stamp(migrations_config(), "head")
     print("Database tables created")
 
 @db_commands.cli.command("drop")
 def drop_tables():
-    """Drops the database tables."""
+    """Drops the database tables, including the migration version table."""
     db.drop_all()
+    with db.engine.begin() as connection:
+        connection.execute(db.text("DROP TABLE IF EXISTS alembic_version"))
     print("Database tables dropped")
 
+@db_commands.cli.command("upgrade")
+@click.argument("revision", default="head")
+def upgrade_database(revision):
+    """Applies migrations up to REVISION (default: the latest)."""
+    from alembic import command
+    command.upgrade(migrations_config(), revision)
+
+@db_commands.cli.command("downgrade")
+@click.argument("revision", default="-1")
+def downgrade_database(revision):
+    """Reverts migrations down to REVISION (default: the previous one)."""
+    from alembic import command
+    command.downgrade(migrations_config(), revision)
+
+@db_commands.cli.command("current")
+def current_revision():
+    """Shows the migration the database is at."""
+    from alembic import command
+    command.current(migrations_config())
+
+@db_commands.cli.command("revision")
+@click.option("-m", "--message", required=True, help="Short description of the change.")
+@click.option("--autogenerate", is_flag=True, help="Fill in the migration by comparing the models with the database.")
+def create_revision(message, autogenerate):
+    """Creates a new migration file in migrations/versions."""
+    from alembic import command
+    command.revision(migrations_config(), message=message, autogenerate=autogenerate)
+
+@db_commands.cli.command("recount")
+def recount_counters():
+    """Recomputes the comment counts of tasks and the task counts of categories, fixing any drift."""
+    with db.engine.begin() as connection:
+        tasks_fixed, categories_fixed = counters.recount(connection)
+    print(f"Corrected the comment count of {tasks_fixed} tasks and the task count of {categories_fixed} categories")
+
 @db_commands.cli.command("seed")
-def seed_tables():
+@click.option("--users", type=int, default=0, help="Generate this many synthetic users instead of the demo data.")
+@click.option("--tasks-per-user", type=int, default=10, show_default=True, help="Synthetic tasks per user.")
+@click.option("--comments-per-task", type=int, default=3, show_default=True, help="Synthetic comments per task.")
+@click.option("--seed", "random_seed", type=int, default=0, show_default=True, help="Random seed, for reproducible data.")
+@click.option("--batch-size", type=int, default=5000, show_default=True, help="Rows per insert and commit.")
+def seed_tables(users, tasks_per_user, comments_per_task, random_seed, batch_size):
     """Seeds the database tables.
 
-    Table values are specified and committed in the following order due to relationships:
+    Without --users, the demo data below is inserted. Table values are specified and
+    committed in the following order due to relationships:
         Users
         Category 
         Tasks
         Comments
         Task Tracking 
+
+    With --users, a synthetic dataset of that size is generated instead (see
+    utils.synthetic_data.generate) and the insert rate of each table is printed.
     """
+    if users:
+        seed_synthetic(users, tasks_per_user, comments_per_task, random_seed, batch_size)
+        return
+
     users = [
         User(
             name="Admin User",
@@ -181,4 +249,43 @@ def seed_tables():
     db.session.add_all(task_trackings)
     db.session.commit()
 
-    print("Database tables seeded")
\ No newline at end of file
+    print("Database tables seeded")
+
+def seed_synthetic(users, tasks_per_user, comments_per_task, random_seed, batch_size):
+    start = time.perf_counter()
+    counts, seconds = synthetic_data.generate(users, tasks_per_user, comments_per_task, random_seed, batch_size)
+    elapsed = time.perf_counter() - start
+
+    for table, count in counts.items():
+        print(f"{table:<16} {count:>12,} rows {seconds[table]:9.2f}s {count / max(seconds[table], 1e-9):>12,.0f} rows/sec")
+    total = sum(counts.values())
+    print(f"{'total':<16} {total:>12,} rows {elapsed:9.2f}s {total / elapsed:>12,.0f} rows/sec")
+    print(f"Synthetic users log in as user<id>@example.com with password '{synthetic_data.SYNTHETIC_PASSWORD}'")
+
+@job_commands.cli.command("run-reminders")
+@click.option("--hours", type=float, default=None, help="Remind about tasks due within this many hours (default: REMINDER_WINDOW_HOURS).")
+@click.option("--batch-size", type=int, default=1000, show_default=True, help="Tasks read, sent and recorded at a time.")
+@click.option("--every", type=float, default=0, help="Keep running, starting a new run this many seconds after the last one.")
+def run_reminders(hours, batch_size, every):
+    """Sends a reminder for every task due soon that has not had one for its due date.
+
+    Reminders go to the REMINDER_SINK sink (see utils.reminders). Without --every the
+    command makes one run and exits, for use from cron; with it, it runs as a scheduler
+    until interrupted. Only one scheduler should run against a database at a time.
+    """
+    hours = current_app.config["REMINDER_WINDOW_HOURS"] if hours is None else hours
+    sink = reminders.load_sink(current_app)
+    while True:
+        start = time.perf_counter()
+        try:
+            sent = reminders.send_reminders(sink, hours, batch_size)
+        except Exception as err:
+            if not every:
+                raise
+            db.session.rollback()
+            print(f"Reminder run failed: {err}")
+        else:
+            print(f"Sent {sent} reminders for tasks due within {hours:g} hours in {time.perf_counter() - start:.2f}s")
+        if not every:
+            return
+        time.sleep(every)
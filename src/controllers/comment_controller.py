@@ -1,14 +1,55 @@
 from datetime import datetime
 from flask import Blueprint, request
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, current_user
 from init import db
 from models.comment import Comment, comment_schema, comments_schema
 from models.task import Task
 from marshmallow import ValidationError
 from sqlalchemy.exc import SQLAlchemyError
+from utils.conditional import conditional
+from utils.loading import loader_options
+from utils.projection import projected_schema
+from utils.replicas import read_only
+from utils.serializer import fast_dump, load_data
+from utils.validators import task_version
 
 comments_bp = Blueprint("comments", __name__, url_prefix="/<int:task_id>/comments")
 
+# Endpoint to fetch the comments of a task
+@comments_bp.route("/", methods=["GET"])
+@read_only
+@conditional(task_version)
+def get_comments(task_id):
+    """Fetches the comments of a specific task, oldest first.
+
+    Args:
+        task_id (int): The ID of the task whose comments will be fetched.
+
+    Query Parameters:
+        fields (str): Comma separated comment fields to return.
+        expand (str): Comma separated relationships to include (user, task).
+
+    Returns:
+        JSON: A list of the task's comments or an error message.
+        200: Comments fetched successfully.
+        400: Unknown field or relationship requested.
+        404: Task not found.
+    """
+    schema = projected_schema(comments_schema)
+
+    task = db.session.scalar(db.select(Task.id).filter_by(id=task_id))
+    if not task:
+        return {"error": f"Task with ID {task_id} not found"}, 404
+
+    stmt = (
+        db.select(Comment)
+        .filter_by(task_idfi=task_id)
+        .order_by(Comment.timestamp, Comment.id)
+        .options(*loader_options(Comment, schema))
+    )
+    comments = db.session.scalars(stmt).all()
+    return fast_dump(schema, comments)
+
 # Endpoint to create a new comment for a task
 @comments_bp.route("/", methods=["POST"])
 @jwt_required()
@@ -22,6 +63,10 @@ def create_comment(task_id):
     Request JSON Body:
         content (str): The content of the comment.
 
+    Query Parameters:
+        fields (str): Comma separated comment fields to return.
+        expand (str): Comma separated relationships to include (user, task).
+
     Returns:
         JSON: The created comment's data or an error message.
         201: Comment created successfully.
@@ -29,13 +74,14 @@ def create_comment(task_id):
         404: Task not found.
         500: Internal server error.
     """
+    schema = projected_schema(comment_schema)
     try:
         # Get the request body data**
         body_data = request.get_json()
         
         # Validate the request data
         try:
-            comment_data = comment_schema.load(body_data, partial=True)
+            comment_data = load_data(comment_schema, body_data, partial=True)
         except ValidationError as err:
             return {"error": "Invalid data", "messages": err.messages}, 400
 
@@ -50,11 +96,11 @@ def create_comment(task_id):
             content=comment_data.get("content"),
             timestamp=datetime.now(),
             task=task,
-            user_id=get_jwt_identity()
+            user_id=current_user.id
         )
         db.session.add(comment)
         db.session.commit()
-        return comment_schema.dump(comment), 201
+        return fast_dump(schema, comment), 201
 
     except SQLAlchemyError as e:
         db.session.rollback()
@@ -114,6 +160,10 @@ def edit_comment(task_id, comment_id):
     Request JSON Body:
         content (str): The new content of the comment.
 
+    Query Parameters:
+        fields (str): Comma separated comment fields to return.
+        expand (str): Comma separated relationships to include (user, task).
+
     Returns:
         JSON: The updated comment's data or an error message.
         200: Comment updated successfully.
@@ -121,12 +171,13 @@ def edit_comment(task_id, comment_id):
         404: Task or comment not found.
         500: Internal server error.
     """
+    schema = projected_schema(comment_schema)
     try:
         body_data = request.get_json()
 
         # Validate the request data
         try:
-            comment_data = comment_schema.load(body_data, partial=True)
+            comment_data = load_data(comment_schema, body_data, partial=True)
         except ValidationError as err:
             return {"error": "Invalid data", "messages": err.messages}, 400
 
@@ -138,7 +189,7 @@ def edit_comment(task_id, comment_id):
             return {"error": f"Task with ID {task_id} not found"}, 404
 
         # Fetch the comment by ID from the database
-        stmt = db.select(Comment).filter_by(id=comment_id)
+        stmt = db.select(Comment).filter_by(id=comment_id).options(*loader_options(Comment, schema))
         comment = db.session.scalar(stmt)
 
         if not comment:
@@ -146,7 +197,7 @@ def edit_comment(task_id, comment_id):
 
         comment.content = comment_data.get("content", comment.content)
         db.session.commit()
-        return comment_schema.dump(comment), 200
+        return fast_dump(schema, comment), 200
 
     except SQLAlchemyError as e:
         db.session.rollback()
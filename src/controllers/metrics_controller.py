@@ -0,0 +1,24 @@
+from flask import Blueprint, request
+from utils import metrics
+
+metrics_bp = Blueprint("metrics", __name__)
+
+# Export Prometheus metrics - GET
+@metrics_bp.route("/metrics", methods=["GET"])
+def get_metrics():
+    """Export request, response size and connection pool metrics in the Prometheus text format.
+
+    Behind a pre-forking server with PROMETHEUS_MULTIPROC_DIR set, the values of all
+    worker processes are combined. The endpoint needs no token; it answers only clients
+    in METRICS_ALLOWED_NETWORKS. Behind a reverse proxy the client is the proxy, so block
+    /metrics at the proxy too.
+
+    Returns:
+        text/plain: The metrics exposition.
+        403: The client address is outside METRICS_ALLOWED_NETWORKS.
+    """
+    if not metrics.allowed(request.remote_addr):
+        return {"error": "Metrics are only available to the monitoring network"}, 403
+
+    body, content_type = metrics.render()
+    return body, 200, {"Content-Type": content_type}
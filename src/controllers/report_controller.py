@@ -0,0 +1,203 @@
+from datetime import date, timedelta
+from flask import Blueprint, request
+from flask_jwt_extended import current_user, jwt_required
+from sqlalchemy.dialects.postgresql import array
+from init import db
+from models.category import Category
+from models.task import Task
+from models.task_tracking import TaskTracking
+from models.users import User
+from utils.replicas import read_only
+
+reports_bp = Blueprint("reports", __name__, url_prefix="/reports")
+
+# Percentiles of the actual / estimated hours ratio reported for every group
+PERCENTILES = (50, 90, 95)
+
+# Dimensions accepted by ?group_by=, in the order their keys appear in each group
+DIMENSIONS = ("user", "category", "priority", "week")
+
+# Names of users and categories are joined in after grouping, so the grouped scan only
+# reads the tracking and task tables
+NAMES = {"user_id": (User, User.name, "user"), "category_id": (Category, Category.label, "category")}
+
+
+def _parse_date(name):
+    value = request.args.get(name)
+    return date.fromisoformat(value) if value else None
+
+
+def _key_columns(dimensions, dialect):
+    columns = []
+    for dimension in dimensions:
+        if dimension == "user":
+            columns.append(Task.user_id.label("user_id"))
+        elif dimension == "category":
+            columns.append(Task.category_id.label("category_id"))
+        elif dimension == "priority":
+            columns.append(Task.priority.label("priority"))
+        elif dialect == "postgresql":
+            columns.append(db.cast(db.func.date_trunc("week", TaskTracking.started_at), db.Date).label("week"))
+        else:
+            # Monday of the week: move forward to Sunday, then back six days
+            columns.append(db.func.date(TaskTracking.started_at, "weekday 0", "-6 days").label("week"))
+    return columns
+
+
+def _percentiles_by_window(tracked, keys):
+    """Nearest-rank percentiles of the overrun ratio per group, for databases without percentile_disc.
+
+    Each finished tracking record is numbered within its group in ratio order, and the
+    p-th percentile is the value at position ceil(p * count / 100), which is what
+    PostgreSQL's percentile_disc returns.
+    """
+    partition = [tracked.c[key] for key in keys] or None
+    ranked = (
+        db.select(
+            *[tracked.c[key] for key in keys],
+            tracked.c.ratio,
+            db.func.row_number().over(partition_by=partition, order_by=tracked.c.ratio).label("position"),
+            db.func.count().over(partition_by=partition).label("total")
+        )
+        .where(tracked.c.ratio.is_not(None))
+        .subquery("ranked")
+    )
+    stmt = db.select(
+        *[ranked.c[key] for key in keys],
+        *[
+            db.func.max(db.case(
+                (ranked.c.position == (ranked.c.total * percentile + 99) // 100, ranked.c.ratio)
+            )).label(f"overrun_p{percentile}")
+            for percentile in PERCENTILES
+        ]
+    ).group_by(*[ranked.c[key] for key in keys])
+    return {tuple(row[:len(keys)]): row[len(keys):] for row in db.session.execute(stmt)}
+
+
+def _round(value):
+    return None if value is None else round(value, 2)
+
+
+# Fetch time tracking report - GET
+@reports_bp.route("/tracking", methods=["GET"])
+@read_only
+@jwt_required()
+def get_tracking_report():
+    """
+    Compare estimated and actual hours of tracked tasks, grouped by user, category, priority or week.
+
+    Every aggregate is computed by the database with GROUP BY and window queries, so no
+    tracking record is loaded into Python. Hours only count finished tasks (those with
+    actual hours) in the overrun figures. Users see the records of their own tasks;
+    admins see every user's.
+
+    Query Parameters:
+        group_by (str): Comma separated dimensions to group by (user, category, priority, week).
+            Without it the report has a single group covering every record.
+        from (str): Only include records started on or after this date (YYYY-MM-DD).
+        to (str): Only include records started on or before this date (YYYY-MM-DD).
+        category (str): Only include tasks in the category with this label.
+
+    Returns:
+        JSON: The dimensions grouped by and one entry per group with its keys, the number of
+        tracked and finished tasks, total estimated and actual hours, the overrun ratio
+        (actual / estimated hours of finished tasks) and percentiles of the per-task ratio.
+        400: Unknown dimension or invalid date.
+        404: Category not found.
+    """
+    dimensions = [name.strip() for name in request.args.get("group_by", "").split(",") if name.strip()]
+    unknown = [name for name in dimensions if name not in DIMENSIONS]
+    if unknown:
+        return {"error": f"Unknown group_by dimension: {', '.join(unknown)}. Use {', '.join(DIMENSIONS)}"}, 400
+    dimensions = sorted(set(dimensions), key=DIMENSIONS.index)
+
+    try:
+        start, end = _parse_date("from"), _parse_date("to")
+    except ValueError:
+        return {"error": "Dates must use the YYYY-MM-DD format"}, 400
+
+    filters = []
+    # The report names users and their hours, so only admins see beyond their own tasks
+    if not current_user.is_admin:
+        filters.append(Task.user_id == current_user.id)
+    if start:
+        filters.append(TaskTracking.started_at >= start)
+    if end:
+        filters.append(TaskTracking.started_at < end + timedelta(days=1))
+
+    label = request.args.get("category")
+    if label:
+        stmt = db.select(Category.id).where(db.func.lower(Category.label) == label.strip().lower())
+        category_id = db.session.scalar(stmt)
+        if category_id is None:
+            return {"error": f"Category with label '{label}' does not exist."}, 404
+        filters.append(Task.category_id == category_id)
+
+    dialect = db.session.get_bind().dialect.name
+    key_columns = _key_columns(dimensions, dialect)
+    keys = [column.name for column in key_columns]
+
+    finished = TaskTracking.actual_hours.is_not(None)
+    tracked = db.select(
+        *key_columns,
+        TaskTracking.estimated_hours,
+        TaskTracking.actual_hours,
+        db.case((finished, TaskTracking.estimated_hours)).label("finished_estimate"),
+        db.case(
+            (db.and_(finished, TaskTracking.estimated_hours > 0), TaskTracking.actual_hours / TaskTracking.estimated_hours)
+        ).label("ratio")
+    ).where(*filters)
+    # Only join tasks when a dimension or filter needs their columns
+    if {"user", "category", "priority"} & set(dimensions) or label or not current_user.is_admin:
+        tracked = tracked.join(Task, Task.id == TaskTracking.task_id)
+    tracked = tracked.subquery("tracked")
+
+    aggregates = [
+        db.func.count().label("tracked"),
+        db.func.count(tracked.c.actual_hours).label("finished"),
+        db.func.sum(tracked.c.estimated_hours).label("estimated_hours"),
+        db.func.sum(tracked.c.actual_hours).label("actual_hours"),
+        db.func.sum(tracked.c.finished_estimate).label("finished_estimated_hours")
+    ]
+    if dialect == "postgresql":
+        # One ordered-set aggregate sorts each group once for every percentile
+        fractions = array([percentile / 100 for percentile in PERCENTILES])
+        aggregates.append(db.func.percentile_disc(fractions).within_group(tracked.c.ratio).label("overrun_percentiles"))
+    grouped = (
+        db.select(*[tracked.c[key] for key in keys], *aggregates)
+        .group_by(*[tracked.c[key] for key in keys])
+        .subquery("grouped")
+    )
+
+    stmt = db.select(grouped)
+    for key in keys:
+        if key in NAMES:
+            model, name, field = NAMES[key]
+            stmt = stmt.add_columns(name.label(field)).outerjoin(model, model.id == grouped.c[key])
+    stmt = stmt.order_by(*[grouped.c[key] for key in keys])
+    rows = db.session.execute(stmt).mappings().all()
+
+    percentiles = _percentiles_by_window(tracked, keys) if dialect != "postgresql" else None
+
+    groups = []
+    for row in rows:
+        group = {}
+        for key in keys:
+            group[key] = str(row[key]) if key == "week" and row[key] is not None else row[key]
+            if key in NAMES:
+                group[NAMES[key][2]] = row[NAMES[key][2]]
+        group["tracked"] = row["tracked"]
+        group["finished"] = row["finished"]
+        group["estimated_hours"] = _round(row["estimated_hours"])
+        group["actual_hours"] = _round(row["actual_hours"])
+        finished_estimate = row["finished_estimated_hours"]
+        group["overrun_ratio"] = _round(row["actual_hours"] / finished_estimate) if finished_estimate else None
+        if percentiles is None:
+            values = row["overrun_percentiles"] or (None,) * len(PERCENTILES)
+        else:
+            values = percentiles.get(tuple(row[key] for key in keys), (None,) * len(PERCENTILES))
+        for percentile, value in zip(PERCENTILES, values):
+            group[f"overrun_p{percentile}"] = _round(value)
+        groups.append(group)
+
+    return {"group_by": dimensions, "groups": groups}
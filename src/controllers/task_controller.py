@@ -1,30 +1,153 @@
 from datetime import datetime, date 
-from flask import Blueprint, request 
+from flask import Blueprint, current_app, request 
 from init import db 
-from models.task import Task, task_schema, tasks_schema 
+from marshmallow import ValidationError
+from models.task import Task, TaskSchema, task_schema, tasks_schema 
 from models.category import Category 
-from flask_jwt_extended import jwt_required, get_jwt_identity 
+from models.comment import Comment, CommentSchema
+from models.task_tracking import TaskTracking, TaskTrackingSchema
+from models.task_reminder import TaskReminder
+from flask_jwt_extended import jwt_required, current_user 
 from controllers.comment_controller import comments_bp 
 from controllers.task_tracking_controller import task_tracking_bp
+from utils.cache import cached, response_cache
+from utils.changes import read_changes
+from utils.conditional import conditional
+from utils.loading import loader_options
+from utils.pagination import get_page_limit, keyset_page
+from utils.projection import projected_schema
+from utils.replicas import read_only
+from utils.search import search_page
+from utils.serializer import fast_dump, load_data
+from utils.streaming import stream_json, wants_stream
+from utils.timestamps import utc_now
+from utils.validators import tasks_version, task_version
 
 tasks_bp = Blueprint("tasks", __name__, url_prefix="/tasks")
 tasks_bp.register_blueprint(comments_bp, url_prefix="/<int:task_id>/comments")
 tasks_bp.register_blueprint(task_tracking_bp, url_prefix="/<int:task_id>/task_trackings")
 
+# Records in the change feed hold their own fields and their parent's id; the comments
+# and tracking record of a task arrive as changes of their own
+CHANGE_SCHEMAS = {
+    "tasks": (Task, TaskSchema(many=True, only=("id", "title", "description", "due_date", "priority", "comment_count", "user", "category"))),
+    "comments": (Comment, CommentSchema(many=True, only=("id", "content", "timestamp", "user", "task.id"))),
+    "task_trackings": (TaskTracking, TaskTrackingSchema(many=True, only=("id", "task.id", "estimated_hours", "actual_hours", "started_at", "finished_at"))),
+}
+
 # fetch all tasks - GET 
 @tasks_bp.route("/")
+@read_only
+@conditional(tasks_version)
 def get_all_tasks():
     """
-    Fetch all tasks and return them in descending order of due date.
+    Fetch a page of tasks in descending order of due date.
+
+    Query Parameters:
+        limit (int): Number of tasks per page, up to the configured maximum page size.
+        after (str): Cursor returned as next_cursor by the previous page.
+        fields (str): Comma separated task fields to return.
+        expand (str): Comma separated relationships to include (user, comments, category, task_tracking).
+        stream (bool): Stream every task as one chunked JSON array instead of returning a page.
+
+    Returns:
+        JSON: Serialized page of tasks and the cursor of the next page (null on the last page).
+    """
+    schema = projected_schema(tasks_schema)
+    if wants_stream():
+        stmt = (
+            db.select(Task)
+            .order_by(Task.due_date.desc().nulls_last(), Task.id.desc())
+            .options(*loader_options(Task, schema))
+        )
+        return stream_json(stmt, schema)
+
+    limit = get_page_limit()
+    stmt = db.select(Task).options(*loader_options(Task, schema, keep=(Task.due_date,)))
+    tasks, next_cursor = keyset_page(stmt, Task, limit, request.args.get("after"))
+    return {"tasks": fast_dump(schema, tasks), "next_cursor": next_cursor}
+
+# search tasks - GET
+@tasks_bp.route("/search")
+@read_only
+def search_tasks():
+    """
+    Search task titles, descriptions and comments, best matches first.
+
+    Query Parameters:
+        q (str): Words to search for; a task matches when it contains all of them.
+        limit (int): Number of tasks per page, up to the configured maximum page size.
+        after (str): Cursor returned as next_cursor by the previous page.
+        fields (str): Comma separated task fields to return.
+        expand (str): Comma separated relationships to include (user, comments, category, task_tracking).
+
+    Returns:
+        JSON: Serialized page of matching tasks, the cursor of the next page (null on the last page)
+        and whether older matches were left out because of SEARCH_MAX_CANDIDATES.
+        400: Query without words, invalid limit or cursor, or unknown field or relationship.
+    """
+    schema = projected_schema(tasks_schema)
+    limit = get_page_limit()
+    task_ids, next_cursor, truncated = search_page(request.args.get("q", ""), limit, request.args.get("after"))
+
+    stmt = db.select(Task).where(Task.id.in_(task_ids)).options(*loader_options(Task, schema))
+    tasks = {task.id: task for task in db.session.scalars(stmt)}
+    ranked = [tasks[task_id] for task_id in task_ids if task_id in tasks]
+    return {"tasks": fast_dump(schema, ranked), "next_cursor": next_cursor, "truncated": truncated}
+
+# fetch changes since a token - GET
+# Served by the primary: a lagging replica would hand out tokens past changes it has not
+# applied yet, and a client reading elsewhere next would skip them for good
+@tasks_bp.route("/changes")
+@jwt_required()
+def get_task_changes():
+    """
+    Fetch the tasks, comments and tracking records created, updated or deleted since a token.
+
+    Each changed record appears once, with its current fields, however often it changed.
+    Deleted records are listed by id as tombstones. A client keeps the returned token and
+    sends it with its next request, so each sync reads only what changed since the last one.
+    Users see the changes of their own tasks and of those tasks' comments and tracking
+    records; admins see every change.
+
+    Query Parameters:
+        since (str): Token returned as next_token by the previous request; omit it to read every record.
+        limit (int): Number of changes per page, up to the configured maximum page size.
 
     Returns:
-        JSON: Serialized list of all tasks.
+        JSON: Changed records and tombstones by type, the next_token and whether more changes follow.
+        400: Invalid token or limit.
     """
-    stmt = db.select(Task).order_by(Task.due_date.desc())
-    tasks = db.session.scalars(stmt).all()
-    return tasks_schema.dump(tasks)
+    owner = None if current_user.is_admin else current_user.id
+    changes, next_token, has_more = read_changes(request.args.get("since"), get_page_limit(), owner)
+
+    changed = {table: [] for table in CHANGE_SCHEMAS}
+    deleted = {table: [] for table in CHANGE_SCHEMAS}
+    for change in changes:
+        (deleted if change.deleted else changed)[change.table_name].append(change.row_id)
+
+    response = {}
+    for table, (model, schema) in CHANGE_SCHEMAS.items():
+        records = []
+        if changed[table]:
+            stmt = (
+                db.select(model)
+                .where(model.id.in_(changed[table]))
+                .order_by(model.id)
+                .options(*loader_options(model, schema))
+            )
+            # A record deleted since its change was read is left to the tombstone that follows
+            records = db.session.scalars(stmt).all()
+        response[table] = fast_dump(schema, records)
+    response["deleted"] = deleted
+    response["next_token"] = next_token
+    response["has_more"] = has_more
+    return response
 
 @tasks_bp.route("/<int:task_id>")
+@read_only
+@conditional(task_version)
+@cached
 def get_one_task(task_id):
     """
     Fetch a single task by its ID.
@@ -32,14 +155,19 @@ def get_one_task(task_id):
     Args:
         task_id (int): ID of the task to fetch.
 
+    Query Parameters:
+        fields (str): Comma separated task fields to return.
+        expand (str): Comma separated relationships to include (user, comments, category, task_tracking).
+
     Returns:
         JSON: Serialized task data if found.
         dict: Error message if task not found.
     """
-    stmt = db.select(Task).filter_by(id=task_id).options(db.joinedload(Task.task_tracking))
+    schema = projected_schema(task_schema)
+    stmt = db.select(Task).filter_by(id=task_id).options(*loader_options(Task, schema))
     task = db.session.scalar(stmt)
     if task:
-        task_data = task_schema.dump(task)
+        task_data = fast_dump(schema, task)
         return task_data 
     else:
         return {"error": f"Task with id {task_id} not found"}, 404
@@ -55,7 +183,7 @@ def create_task():
         JSON: Serialized task data if created successfully.
         dict: Error message if category label is missing or invalid.
     """
-    body_data = task_schema.load(request.get_json())
+    body_data = load_data(task_schema, request.get_json())
 
     # Extract and validate category label
     try:
@@ -63,7 +191,7 @@ def create_task():
     except KeyError:
         return {"error": "Category label is required."}, 400
 
-    category = Category.query.filter(Category.label.ilike(label.strip())).first()
+    category = Category.query.filter(db.func.lower(Category.label) == label.strip().lower()).first()
     if not category:
         return {"error": f"Category with label '{label}' does not exist."}, 404
     
@@ -74,12 +202,12 @@ def create_task():
         due_date=date.today(),  
         priority=body_data.get("priority"), 
         category_id=category.id, 
-        user_id=get_jwt_identity() 
+        user_id=current_user.id 
     )
     db.session.add(task)
     db.session.commit()
 
-    return task_schema.dump(task)
+    return fast_dump(task_schema, task)
 
 # delete task - DELETE 
 @tasks_bp.route("/<int:task_id>", methods=["DELETE"])
@@ -98,7 +226,7 @@ def delete_card(task_id):
     stmt = db.select(Task).filter_by(id=task_id)
     task = db.session.scalar(stmt)
     if task: 
-        if str(task.user_id) != get_jwt_identity():
+        if task.user_id != current_user.id:
             return {"error": "It seems like you are not the owner of this task"}, 403
         
         db.session.delete(task)
@@ -121,11 +249,11 @@ def update_task(task_id):
         JSON: Serialized task data if updated successfully.
         dict: Error message if task not found or unauthorized.
     """
-    body_data = task_schema.load(request.get_json(), partial=True)
-    stmt = db.select(Task).filter_by(id=task_id)
+    body_data = load_data(task_schema, request.get_json(), partial=True)
+    stmt = db.select(Task).filter_by(id=task_id).options(*loader_options(Task, task_schema))
     task = db.session.scalar(stmt)
     if task:
-        if str(task.user_id) != get_jwt_identity():
+        if task.user_id != current_user.id:
             return {"error": "It seems like you are not the owner of this task"}, 403
 
         task.title = body_data.get("title") or task.title
@@ -133,10 +261,232 @@ def update_task(task_id):
         task.priority = body_data.get("priority") or task.priority 
 
         db.session.commit()
-        return task_schema.dump(task)
+        return fast_dump(task_schema, task)
     
     else: 
         return {"error": f"Task with id {task_id} not found"}, 404
+
+def _load_bulk_items(partial=False):
+    """Validate a JSON array of tasks in one load, keeping per-item errors.
+
+    Returns:
+        tuple: The loaded items (None where an item failed) and a dict of errors by index.
+    """
+    body = request.get_json()
+    if not isinstance(body, list) or not body:
+        return None, {"error": "Request body must be a non-empty JSON array"}
+
+    max_items = current_app.config["BULK_MAX_ITEMS"]
+    if len(body) > max_items:
+        return None, {"error": f"A bulk request can contain at most {max_items} items"}
+
+    try:
+        return load_data(task_schema, body, many=True, partial=partial), {}
+    except ValidationError as err:
+        items = [None if index in err.messages else data for index, data in enumerate(err.valid_data)]
+        return items, err.messages
+
+
+def _bulk_response(results, success_status):
+    """Wrap per-item results, answering 207 when only some of the items succeeded."""
+    succeeded = sum(1 for result in results if result["status"] == success_status)
+    if succeeded == len(results):
+        status = success_status
+    elif succeeded:
+        status = 207
+    else:
+        status = 400
+    return {"results": results}, status
+
+
+# create many tasks - POST
+@tasks_bp.route("/bulk", methods=["POST"])
+@jwt_required()
+def create_tasks_bulk():
+    """
+    Create many tasks in a single transaction.
+
+    Request JSON Body:
+        list: Task objects in the same format as POST /tasks/.
+
+    Returns:
+        JSON: A result per item, in request order, with the new task's id or the item's errors.
+        201: Every task was created.
+        207: Some tasks were created and some were rejected.
+        400: No task was created.
+    """
+    items, errors = _load_bulk_items()
+    if items is None:
+        return errors, 400
+
+    results = [None] * len(items)
+    for index, message in errors.items():
+        results[index] = {"index": index, "status": 400, "error": message}
+
+    labels = {}
+    for index, item in enumerate(items):
+        if item is None:
+            continue
+        label = (item.get("category") or {}).get("label")
+        if not label:
+            results[index] = {"index": index, "status": 400, "error": "Category label is required."}
+        else:
+            labels[index] = label.strip()
+
+    # Resolve every label with one case-insensitive query
+    wanted = {label.lower() for label in labels.values()}
+    stmt = db.select(db.func.lower(Category.label), Category.id).where(db.func.lower(Category.label).in_(wanted))
+    category_ids = dict(db.session.execute(stmt).all()) if wanted else {}
+
+    user_id = current_user.id
+    rows, row_indexes = [], []
+    for index, label in labels.items():
+        category_id = category_ids.get(label.lower())
+        if category_id is None:
+            results[index] = {"index": index, "status": 404, "error": f"Category with label '{label}' does not exist."}
+            continue
+        item = items[index]
+        rows.append({
+            "title": item.get("title"),
+            "description": item.get("description"),
+            "due_date": date.today(),
+            "priority": item.get("priority"),
+            "category_id": category_id,
+            "user_id": user_id
+        })
+        row_indexes.append(index)
+
+    if rows:
+        stmt = db.insert(Task).returning(Task.id, sort_by_parameter_order=True)
+        task_ids = db.session.scalars(stmt, rows).all()
+        db.session.commit()
+        response_cache.invalidate({("categories", (row["category_id"],)) for row in rows})
+
+        for index, task_id in zip(row_indexes, task_ids):
+            results[index] = {"index": index, "status": 201, "id": task_id}
+
+    return _bulk_response(results, 201)
+
+# edit many tasks - PATCH
+@tasks_bp.route("/bulk", methods=["PATCH"])
+@jwt_required()
+def update_tasks_bulk():
+    """
+    Update many tasks in a single transaction.
+
+    Only the owner of a task can update it, as with PATCH /tasks/<id>.
+
+    Request JSON Body:
+        list: Objects with the task "id" and any of "title", "description" and "priority".
+
+    Returns:
+        JSON: A result per item, in request order, with the item's status and any errors.
+        200: Every task was updated.
+        207: Some tasks were updated and some were rejected.
+        400: No task was updated.
+    """
+    items, errors = _load_bulk_items(partial=True)
+    if items is None:
+        return errors, 400
+
+    results = [None] * len(items)
+    for index, message in errors.items():
+        results[index] = {"index": index, "status": 400, "error": message}
+
+    ids = {}
+    for index, item in enumerate(items):
+        if item is None:
+            continue
+        task_id = item.get("id")
+        if not isinstance(task_id, int) or isinstance(task_id, bool):
+            results[index] = {"index": index, "status": 400, "error": "Each item needs an integer task id."}
+        else:
+            ids[index] = task_id
+
+    # Check existence and ownership of every task with one query
+    stmt = db.select(Task.id, Task.user_id).where(Task.id.in_(set(ids.values())))
+    owners = dict(db.session.execute(stmt).all()) if ids else {}
+
+    identity = current_user.id
+    rows = []
+    for index, task_id in ids.items():
+        if task_id not in owners:
+            results[index] = {"index": index, "status": 404, "error": f"Task with id {task_id} not found"}
+        elif owners[task_id] != identity:
+            results[index] = {"index": index, "status": 403, "error": "It seems like you are not the owner of this task"}
+        else:
+            # Same rule as update_task: empty values leave the column unchanged
+            row = {"id": task_id, "updated_at": utc_now()}
+            for column in ("title", "description", "priority"):
+                if items[index].get(column):
+                    row[column] = items[index][column]
+            rows.append(row)
+            results[index] = {"index": index, "status": 200, "id": task_id}
+
+    if rows:
+        db.session.execute(db.update(Task), rows)
+        db.session.commit()
+        response_cache.invalidate({("tasks", (row["id"],)) for row in rows})
+
+    return _bulk_response(results, 200)
+
+# delete many tasks - DELETE
+@tasks_bp.route("/bulk", methods=["DELETE"])
+@jwt_required()
+def delete_tasks_bulk():
+    """
+    Delete many tasks, with their comments and tracking records, in a single transaction.
+
+    Only the owner of a task can delete it, as with DELETE /tasks/<id>. An id listed
+    again is rejected, so each task is reported deleted once.
+
+    Request JSON Body:
+        list: The ids of the tasks to delete.
+
+    Returns:
+        JSON: A result per id, in request order, with its status and any error.
+        200: Every task was deleted.
+        207: Some tasks were deleted and some were rejected.
+        400: No task was deleted.
+    """
+    body = request.get_json()
+    if not isinstance(body, list) or not body:
+        return {"error": "Request body must be a non-empty JSON array of task ids"}, 400
+    if len(body) > current_app.config["BULK_MAX_ITEMS"]:
+        return {"error": f"A bulk request can contain at most {current_app.config['BULK_MAX_ITEMS']} items"}, 400
+
+    # type() rather than isinstance: true and false are ints too, and 1.0 == 1
+    valid_ids = {task_id for task_id in body if type(task_id) is int}
+    stmt = db.select(Task.id, Task.user_id).where(Task.id.in_(valid_ids))
+    owners = dict(db.session.execute(stmt).all()) if valid_ids else {}
+
+    identity = current_user.id
+    results, seen, deleted = [], set(), set()
+    for index, task_id in enumerate(body):
+        if type(task_id) is not int:
+            results.append({"index": index, "status": 400, "error": "Task ids must be integers."})
+        elif task_id in seen:
+            results.append({"index": index, "status": 400, "error": f"Task id {task_id} is listed more than once"})
+        elif task_id not in owners:
+            results.append({"index": index, "status": 404, "error": f"Task with id {task_id} not found"})
+        elif owners[task_id] != identity:
+            results.append({"index": index, "status": 403, "error": "It seems like you are not the owner of this task"})
+        else:
+            results.append({"index": index, "status": 200, "id": task_id})
+            deleted.add(task_id)
+        if type(task_id) is int:
+            seen.add(task_id)
+
+    if deleted:
+        # Core deletes skip the ORM cascade, so remove the children explicitly
+        db.session.execute(db.delete(Comment).where(Comment.task_idfi.in_(deleted)))
+        db.session.execute(db.delete(TaskTracking).where(TaskTracking.task_id.in_(deleted)))
+        db.session.execute(db.delete(TaskReminder).where(TaskReminder.task_id.in_(deleted)))
+        db.session.execute(db.delete(Task).where(Task.id.in_(deleted)))
+        db.session.commit()
+        response_cache.invalidate({("tasks", (task_id,)) for task_id in deleted})
+
+    return _bulk_response(results, 200)
     
 
 
@@ -4,6 +4,11 @@ from flask_jwt_extended import jwt_required
 from init import db
 from models.task_tracking import TaskTracking, task_tracking_schema, task_trackings_schema
 from models.task import Task
+from utils.conditional import conditional
+from utils.loading import loader_options
+from utils.replicas import read_only
+from utils.serializer import fast_dump, load_data
+from utils.validators import task_version
 
 task_tracking_bp = Blueprint("task_trackings", __name__, url_prefix="/tasks/<int:task_id>/task_trackings")
 
@@ -32,7 +37,7 @@ def create_task_tracking(task_id):
     body_data = request.get_json()
 
     # Load the request data
-    tracking_data = task_tracking_schema.load(body_data)
+    tracking_data = load_data(task_tracking_schema, body_data)
 
     # Fetch the task by ID from the database
     stmt = db.select(Task).filter_by(id=task_id)
@@ -65,7 +70,7 @@ def create_task_tracking(task_id):
     db.session.add(task_tracking)
     db.session.commit()
 
-    return task_tracking_schema.dump(task_tracking), 201
+    return fast_dump(task_tracking_schema, task_tracking), 201
 
 # Update the task tracking record - PATCH
 @task_tracking_bp.route("/<int:tracking_id>", methods=["PATCH", "PUT"])
@@ -105,11 +110,13 @@ def update_task_tracking(task_id, tracking_id):
 
     db.session.commit()
 
-    return task_tracking_schema.dump(task_tracking), 200
+    return fast_dump(task_tracking_schema, task_tracking), 200
 
 # Fetch all tracking records for a specific task - GET
 @task_tracking_bp.route("/", methods=["GET"])
+@read_only
 @jwt_required()
+@conditional(task_version)
 def get_task_trackings(task_id):
     """
     Fetch all task tracking records for a specific task.
@@ -120,11 +127,11 @@ def get_task_trackings(task_id):
     Returns:
         JSON: List of task tracking records or an error message.
     """
-    stmt = db.select(TaskTracking).filter_by(task_id=task_id)
+    stmt = db.select(TaskTracking).filter_by(task_id=task_id).options(*loader_options(TaskTracking, task_trackings_schema))
     task_trackings = db.session.scalars(stmt).all()
 
     if task_trackings:
-        return jsonify(task_trackings_schema.dump(task_trackings))
+        return jsonify(fast_dump(task_trackings_schema, task_trackings))
     else:
         return {"error": f"No task tracking records found for task with id {task_id}"}, 404
     
@@ -3,8 +3,36 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_marshmallow import Marshmallow 
 from flask_bcrypt import Bcrypt 
 from flask_jwt_extended import JWTManager 
+from utils.asgi import async_engine
+from utils.replicas import RoutingSession
 
-db = SQLAlchemy()
+
+class AppSQLAlchemy(SQLAlchemy):
+    def _make_engine(self, bind_key, options, app):
+        # create_async_app builds every engine on an asyncio driver
+        if app.config.get("SQLALCHEMY_ASYNC"):
+            return async_engine(options)
+        return super()._make_engine(bind_key, options, app)
+
+
+db = AppSQLAlchemy(session_options={"class_": RoutingSession})
 ma = Marshmallow()
 bcrypt = Bcrypt()
-jwt = JWTManager()
\ No newline at end of file
+jwt = JWTManager()
+
+
+@jwt.user_lookup_loader
+def load_current_user(_jwt_header, jwt_data):
+    # Resolve the token's identity through the identity cache, so current_user costs no query
+    # (imported here because the models import this module)
+    from utils.identity import identity_cache
+    from utils.timing import auth_checked
+    user = identity_cache.get(jwt_data["sub"])
+    auth_checked()
+    return user
+
+
+@jwt.user_lookup_error_loader
+def current_user_not_found(_jwt_header, jwt_data):
+    # The account behind a valid token has been deleted
+    return {"error": "User not found"}, 401
@@ -1,30 +1,195 @@
+import ipaddress
 import os 
 from flask import Flask 
 from marshmallow.exceptions import ValidationError 
 from init import db, ma, bcrypt, jwt 
+from utils.pagination import PaginationError
+from utils.projection import ProjectionError
+from utils import serializer
+from utils import json_provider
+from utils import negotiation
+from utils.cache import response_cache
+from utils.passwords import PasswordPoolFull, password_hasher
+from utils.identity import identity_cache
+from utils import timing
+from utils import compression
+from utils.replicas import replica_router
+from utils.search import SearchError
+from utils.asgi import GreenletASGI, async_url
+from utils import startup
+from utils import versioning  # registers the listener that bumps parent tasks' updated_at
+from utils import triggers  # registers the search index, counter and change triggers with db.create_all
 
-def create_app(): 
+def _env(name, default=None):
+    """Read a setting from the environment; an empty value (KEY= in .env) counts as unset."""
+    return os.environ.get(name) or default
+
+def _env_flag(name, default=False):
+    """Read an on/off setting: 1, true or yes turn it on, an empty or unset value keeps the default."""
+    value = _env(name)
+    if value is None:
+        return default
+    return value.lower() in ("1", "true", "yes")
+
+def create_app(asynchronous=False): 
     app = Flask(__name__)
 
+    app.config["SQLALCHEMY_DATABASE_URI"] = _env("DATABASE_URL")
+
+    app.config["JWT_SECRET_KEY"] = _env("JWT_SECRET_KEY")
+
+    app.config["TASKS_PAGE_SIZE"] = int(_env("TASKS_PAGE_SIZE", 50))
+    app.config["TASKS_MAX_PAGE_SIZE"] = int(_env("TASKS_MAX_PAGE_SIZE", 200))
+
+    # Raise instead of lazy loading relationships a query did not eagerly load (use in tests)
+    app.config["STRICT_LOADING"] = _env_flag("STRICT_LOADING")
+
+    # Dump responses with the compiled serializer instead of marshmallow's per-field dispatch
+    app.config["FAST_SERIALIZER"] = _env_flag("FAST_SERIALIZER", True)
+
+    # Encoder behind app.json: orjson, default (Flask's, on the json module) or module:attribute of a provider class.
+    # Clients sending Accept: application/msgpack get MessagePack instead, and may send MessagePack bodies.
+    app.config["JSON_PROVIDER"] = _env("JSON_PROVIDER", "orjson")
+    app.config["MSGPACK_ENABLED"] = _env_flag("MSGPACK_ENABLED", True)
+
+    # Number of rows fetched, dumped and written per chunk of a ?stream=true response
+    app.config["STREAM_CHUNK_SIZE"] = int(_env("STREAM_CHUNK_SIZE", 500))
+
+    # In-process cache of serialized task and category documents
+    app.config["RESPONSE_CACHE_ENABLED"] = _env_flag("RESPONSE_CACHE_ENABLED", True)
+    app.config["RESPONSE_CACHE_MAX_ENTRIES"] = int(_env("RESPONSE_CACHE_MAX_ENTRIES", 1024))
+    app.config["RESPONSE_CACHE_MAX_BYTES"] = int(_env("RESPONSE_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+    app.config["RESPONSE_CACHE_TTL"] = int(_env("RESPONSE_CACHE_TTL", 300))
+
+    # Compress responses of at least COMPRESSION_MIN_SIZE bytes with zstd, br (when the brotli
+    # package is installed) or gzip, whichever the client's Accept-Encoding prefers
+    app.config["COMPRESSION_ENABLED"] = _env_flag("COMPRESSION_ENABLED", True)
+    app.config["COMPRESSION_MIN_SIZE"] = int(_env("COMPRESSION_MIN_SIZE", 1024))
+    app.config["COMPRESSION_GZIP_LEVEL"] = int(_env("COMPRESSION_GZIP_LEVEL", 6))
+    app.config["COMPRESSION_ZSTD_LEVEL"] = int(_env("COMPRESSION_ZSTD_LEVEL", 3))
+    app.config["COMPRESSION_BROTLI_LEVEL"] = int(_env("COMPRESSION_BROTLI_LEVEL", 4))
+
+    # Largest array accepted by the /tasks/bulk endpoints
+    app.config["BULK_MAX_ITEMS"] = int(_env("BULK_MAX_ITEMS", 1000))
+
+    # Threads hashing passwords at once, and how many may run or wait before returning 503
+    # (defaults: one per CPU, four queued per thread)
+    app.config["PASSWORD_POOL_SIZE"] = int(_env("PASSWORD_POOL_SIZE", 0))
+    app.config["PASSWORD_QUEUE_LIMIT"] = int(_env("PASSWORD_QUEUE_LIMIT", 0))
+
+    # Cache of the users behind JWT identities, used for identity and admin checks
+    app.config["IDENTITY_CACHE_MAX_ENTRIES"] = int(_env("IDENTITY_CACHE_MAX_ENTRIES", 10000))
+    app.config["IDENTITY_CACHE_TTL"] = int(_env("IDENTITY_CACHE_TTL", 60))
+
+    # Add a Server-Timing header (db, serialize, json, auth) and a timing log line to every response
+    app.config["SERVER_TIMING"] = _env_flag("SERVER_TIMING")
+
+    # Prometheus metrics at /metrics (set PROMETHEUS_MULTIPROC_DIR when running several worker processes)
+    app.config["METRICS_ENABLED"] = _env_flag("METRICS_ENABLED", True)
+    # Client networks (comma separated) allowed to read /metrics: loopback and private ranges unless set
+    app.config["METRICS_ALLOWED_NETWORKS"] = [
+        ipaddress.ip_network(network.strip())
+        for network in _env("METRICS_ALLOWED_NETWORKS", "127.0.0.0/8,::1/128,10.0.0.0/8,172.16.0.0/12,192.168.0.0/16,fc00::/7").split(",")
+        if network.strip()
+    ]
+
+    # Read-only endpoints query these replicas (comma separated URLs) while writes stay on the primary.
+    # Users that just wrote keep reading from the primary for READ_YOUR_WRITES_SECONDS (see utils.replicas).
+    app.config["DATABASE_REPLICA_URLS"] = [url.strip() for url in _env("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+    app.config["DATABASE_REPLICA_SELECTION"] = _env("DATABASE_REPLICA_SELECTION", "round_robin")
+    app.config["READ_YOUR_WRITES_SECONDS"] = float(_env("READ_YOUR_WRITES_SECONDS", 5))
+
+    # Connections kept open per database and extra ones opened under load (empty: SQLAlchemy's 5 and 10)
+    for name, option in (("DATABASE_POOL_SIZE", "pool_size"), ("DATABASE_MAX_OVERFLOW", "max_overflow")):
+        if _env(name):
+            app.config.setdefault("SQLALCHEMY_ENGINE_OPTIONS", {})[option] = int(_env(name))
+
+    # Served by create_async_app: every database is reached through its asyncio driver
+    app.config["SQLALCHEMY_ASYNC"] = asynchronous
+    if asynchronous:
+        app.config["SQLALCHEMY_DATABASE_URI"] = async_url(app.config["SQLALCHEMY_DATABASE_URI"])
+        app.config["DATABASE_REPLICA_URLS"] = [async_url(url) for url in app.config["DATABASE_REPLICA_URLS"]]
+
+    # Full-text search ranks only this many of the newest matching tasks, or every match with 0;
+    # results say "truncated": true when older matches were left out
+    app.config["SEARCH_MAX_CANDIDATES"] = int(_env("SEARCH_MAX_CANDIDATES", 10000))
+
+    # flask jobs run-reminders: how far ahead to look for due tasks, and where reminders go
+    # (log, file to append JSON lines to REMINDER_FILE, or module:attribute of a custom sink)
+    app.config["REMINDER_WINDOW_HOURS"] = float(_env("REMINDER_WINDOW_HOURS", 24))
+    app.config["REMINDER_SINK"] = _env("REMINDER_SINK", "log")
+    app.config["REMINDER_FILE"] = _env("REMINDER_FILE", "reminders.jsonl")
+
+    # STARTUP_LAZY defers importing the controllers and compiling the serializers to the first request.
+    # STARTUP_PREWARM does that, configures the mappers and opens the pool connections in the background;
+    # GET /ready answers 503 until it is done.
+    app.config["STARTUP_LAZY"] = _env_flag("STARTUP_LAZY")
+    app.config["STARTUP_PREWARM"] = _env_flag("STARTUP_PREWARM")
+
+    app.json = json_provider.load_provider(app)
     app.json.sort_keys = False
+    negotiation.init_app(app)
 
-    app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DATABASE_URL")
+    triggers.check_dialects(app)
 
-    app.config["JWT_SECRET_KEY"] = os.environ.get("JWT_SECRET_KEY")
+    # Metrics must come first: it sets the engine's pool class and times the whole request.
+    # prometheus_client is only imported when they are enabled.
+    if app.config["METRICS_ENABLED"]:
+        from utils import metrics
+        metrics.init_app(app)
+    replica_router.init_app(app)
 
     db.init_app(app)
+    if app.config["METRICS_ENABLED"]:
+        metrics.watch_pools(app)
     ma.init_app(app)
     bcrypt.init_app(app)
     jwt.init_app(app)
+    response_cache.init_app(app)
+    password_hasher.init_app(app)
+    identity_cache.init_app(app)
+    timing.init_app(app)
+    # Last, so responses are compressed before the timing and metrics hooks see them
+    compression.init_app(app)
 
     @app.errorhandler(ValidationError)
     def validation_error(err):
         # Handle Marshmallow validation errors and return a 400 response with error details
         return {"error": err.messages}, 400 
 
-    from controllers.cli_controller import db_commands
+    @app.errorhandler(PaginationError)
+    def pagination_error(err):
+        # Handle invalid limit or cursor query parameters
+        return {"error": str(err)}, 400
+
+    @app.errorhandler(SearchError)
+    def search_error(err):
+        # Handle search queries without any words
+        return {"error": str(err)}, 400
+
+    @app.errorhandler(PasswordPoolFull)
+    def password_pool_full(err):
+        # Shed password work when the hashing queue is full instead of tying up workers
+        return {"error": str(err)}, 503, {"Retry-After": "1"}
+
+    @app.errorhandler(ProjectionError)
+    def projection_error(err):
+        # Handle unknown names in the fields or expand query parameters
+        return {"error": str(err)}, 400
+
+    # Imports the controllers now, or on the first request with STARTUP_LAZY
+    startup.init_app(app, register_views, register_commands, precompile_serializers)
+
+    return app 
+
+def register_commands(app):
+    """Register the flask db and flask jobs CLI commands."""
+    from controllers.cli_controller import db_commands, job_commands
     app.register_blueprint(db_commands)
+    app.register_blueprint(job_commands)
 
+def register_views(app):
+    """Register the HTTP blueprints."""
     from controllers.auth_controller import auth_bp
     app.register_blueprint(auth_bp)
 
@@ -37,7 +202,37 @@ def create_app():
     from controllers.task_tracking_controller import task_tracking_bp
     app.register_blueprint(task_tracking_bp)
 
-    return app 
+    from controllers.report_controller import reports_bp
+    app.register_blueprint(reports_bp)
+
+    from controllers.cache_controller import cache_bp
+    app.register_blueprint(cache_bp)
+
+    if app.config["METRICS_ENABLED"]:
+        from controllers.metrics_controller import metrics_bp
+        app.register_blueprint(metrics_bp)
+
+def precompile_serializers(app):
+    """Compile the serializers of the response schemas, which otherwise happens on their first use."""
+    from models.users import user_schema, users_schema
+    from models.task import task_schema, tasks_schema
+    from models.category import category_schema, categories_schema
+    from models.comment import comment_schema, comments_schema
+    from models.task_tracking import task_tracking_schema, task_trackings_schema
+    serializer.precompile(
+        user_schema, users_schema, task_schema, tasks_schema, category_schema, categories_schema,
+        comment_schema, comments_schema, task_tracking_schema, task_trackings_schema
+    )
+
+def create_async_app():
+    """The app of create_app as an ASGI application on asyncio database drivers.
+
+    Serves the same routes with the same responses, running every request in a greenlet
+    on one event loop (see utils.asgi.GreenletASGI), so one process handles as many
+    concurrent requests as its connection pool allows. Run it with an ASGI server:
+        uvicorn --factory main:create_async_app
+    """
+    return GreenletASGI(create_app(asynchronous=True))
 
 if __name__ == "__main__":
     app = create_app()
@@ -0,0 +1,46 @@
+"""Alembic environment, run by the flask db upgrade/downgrade/current/revision commands.
+
+It runs inside the Flask app context, so it uses the app's engine and the models'
+metadata instead of settings from an alembic.ini file.
+"""
+from alembic import context
+from init import db
+# Import every model so autogenerate compares against the full schema
+from models import users, category, task, comment, task_tracking, task_reminder, change  # noqa: F401
+from utils.search import is_search_table
+
+config = context.config
+target_metadata = db.metadata
+
+
+def include_name(name, type_, parent_names):
+    # The search index is created by raw DDL, not the models, so autogenerate must not drop it
+    return not (type_ == "table" and is_search_table(name))
+
+
+def run_migrations_offline():
+    context.configure(
+        url=db.engine.url.render_as_string(hide_password=False),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        render_as_batch=True,
+        include_name=include_name
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    with db.engine.connect() as connection:
+        # Batch mode lets the same migrations alter tables on SQLite
+        context.configure(
+            connection=connection, target_metadata=target_metadata, render_as_batch=True, include_name=include_name
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
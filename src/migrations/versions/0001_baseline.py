@@ -0,0 +1,79 @@
+"""Baseline schema, as created by flask db create before migrations existed
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-18 10:00:00
+
+Databases created with db.create_all() already have these tables, so only the missing
+ones are created and an existing database can be upgraded in place.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001_baseline"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "users" not in existing:
+        op.create_table(
+            "users",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("name", sa.String(), nullable=False),
+            sa.Column("email", sa.String(length=100), nullable=False, unique=True),
+            sa.Column("password", sa.String(), nullable=False),
+            sa.Column("is_admin", sa.Boolean())
+        )
+
+    if "categories" not in existing:
+        op.create_table(
+            "categories",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("label", sa.String(), nullable=False)
+        )
+
+    if "tasks" not in existing:
+        op.create_table(
+            "tasks",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("title", sa.String(), nullable=False),
+            sa.Column("description", sa.String()),
+            sa.Column("due_date", sa.Date()),
+            sa.Column("priority", sa.String()),
+            sa.Column("category_id", sa.Integer(), sa.ForeignKey("categories.id"), nullable=False),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False)
+        )
+
+    if "comments" not in existing:
+        op.create_table(
+            "comments",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("content", sa.String(), nullable=False),
+            sa.Column("timestamp", sa.DateTime(), nullable=False),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("task_idfi", sa.Integer(), sa.ForeignKey("tasks.id"), nullable=False)
+        )
+
+    if "task_trackings" not in existing:
+        op.create_table(
+            "task_trackings",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("task_id", sa.Integer(), sa.ForeignKey("tasks.id"), nullable=False),
+            sa.Column("estimated_hours", sa.Float(), nullable=False),
+            sa.Column("started_at", sa.DateTime(), nullable=True),
+            sa.Column("finished_at", sa.DateTime(), nullable=True),
+            sa.Column("actual_hours", sa.Float())
+        )
+
+
+def downgrade():
+    op.drop_table("task_trackings")
+    op.drop_table("comments")
+    op.drop_table("tasks")
+    op.drop_table("categories")
+    op.drop_table("users")
@@ -0,0 +1,41 @@
+"""Add updated_at to tasks, categories, comments and task trackings
+
+Revision ID: 0002_add_updated_at
+Revises: 0001_baseline
+Create Date: 2026-10-18 10:05:00
+
+Existing rows are stamped with the time of the upgrade. Tables that already have the
+column (created by db.create_all() after it was added to the models) are left alone.
+"""
+from alembic import op
+import sqlalchemy as sa
+from utils.timestamps import utc_now
+
+
+revision = "0002_add_updated_at"
+down_revision = "0001_baseline"
+branch_labels = None
+depends_on = None
+
+TABLES = ("tasks", "categories", "comments", "task_trackings")
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    now = utc_now()
+    for table in TABLES:
+        if any(column["name"] == "updated_at" for column in inspector.get_columns(table)):
+            continue
+
+        # Add the column as nullable, fill it in, then make it required
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.add_column(sa.Column("updated_at", sa.DateTime(), nullable=True))
+        op.execute(sa.table(table, sa.column("updated_at")).update().values(updated_at=now))
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column("updated_at", existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade():
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column("updated_at")
@@ -0,0 +1,60 @@
+"""Index foreign keys, the task pagination order and category labels
+
+Revision ID: 0003_add_indexes
+Revises: 0002_add_updated_at
+Create Date: 2026-10-18 10:10:00
+
+Adds indexes on tasks.category_id, tasks.user_id, task_trackings.task_id and the task
+foreign key of comments (a column named task_idfi in the Comment model), and a unique
+index on lower(categories.label) for case-insensitive label lookups.
+
+On PostgreSQL it also adds the (due_date DESC NULLS LAST, id DESC) index in the order
+used to page through tasks. NULLS LAST is PostgreSQL syntax, so SQLite gets its plain
+(due_date, id) index in 0007_task_reminders instead.
+
+The label index fails if existing labels differ only in case, so the upgrade checks for
+them first and stops with a list to merge by hand rather than touching the data.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003_add_indexes"
+down_revision = "0002_add_updated_at"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+
+    duplicates = bind.execute(sa.text(
+        "SELECT lower(label) FROM categories GROUP BY lower(label) HAVING count(*) > 1"
+    )).scalars().all()
+    if duplicates:
+        raise RuntimeError(
+            "Merge the categories whose labels differ only in case before upgrading: "
+            + ", ".join(sorted(duplicates))
+        )
+
+    op.create_index("ix_tasks_category_id", "tasks", ["category_id"])
+    op.create_index("ix_tasks_user_id", "tasks", ["user_id"])
+    op.create_index("ix_comments_task_idfi", "comments", ["task_idfi"])
+    op.create_index("ix_task_trackings_task_id", "task_trackings", ["task_id"])
+    # NULLS LAST in an index is PostgreSQL syntax; SQLite gets a plain index in 0007
+    if bind.dialect.name == "postgresql":
+        op.create_index(
+            "ix_tasks_due_date_id", "tasks",
+            [sa.text("due_date DESC NULLS LAST"), sa.text("id DESC")]
+        )
+    op.create_index("uq_categories_label_lower", "categories", [sa.text("lower(label)")], unique=True)
+
+
+def downgrade():
+    op.drop_index("uq_categories_label_lower", table_name="categories")
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_index("ix_tasks_due_date_id", table_name="tasks")
+    op.drop_index("ix_task_trackings_task_id", table_name="task_trackings")
+    op.drop_index("ix_comments_task_idfi", table_name="comments")
+    op.drop_index("ix_tasks_user_id", table_name="tasks")
+    op.drop_index("ix_tasks_category_id", table_name="tasks")
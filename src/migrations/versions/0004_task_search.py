@@ -0,0 +1,26 @@
+"""Full-text search index over task titles, descriptions and comments
+
+Revision ID: 0004_task_search
+Revises: 0003_add_indexes
+Create Date: 2026-10-18 12:40:00
+
+Creates the task_search index (an FTS5 table on SQLite, a tsvector column with a GIN
+index on PostgreSQL) and the triggers that keep it up to date, then indexes every
+existing task. See utils.search.
+"""
+from alembic import op
+from utils import search
+
+
+revision = "0004_task_search"
+down_revision = "0003_add_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    search.install(op.get_bind())
+
+
+def downgrade():
+    search.uninstall(op.get_bind())
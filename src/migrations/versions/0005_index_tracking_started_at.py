@@ -0,0 +1,24 @@
+"""Index task_trackings.started_at
+
+Revision ID: 0005_index_tracking_started_at
+Revises: 0004_task_search
+Create Date: 2026-10-18 13:10:00
+
+The tracking report filters records by the date they were started, so date ranges
+read only the matching rows instead of scanning every tracking record.
+"""
+from alembic import op
+
+
+revision = "0005_index_tracking_started_at"
+down_revision = "0004_task_search"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_task_trackings_started_at", "task_trackings", ["started_at"])
+
+
+def downgrade():
+    op.drop_index("ix_task_trackings_started_at", table_name="task_trackings")
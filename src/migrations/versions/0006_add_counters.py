@@ -0,0 +1,43 @@
+"""Add maintained comment_count to tasks and task_count to categories
+
+Revision ID: 0006_add_counters
+Revises: 0005_index_tracking_started_at
+Create Date: 2026-10-18 13:40:00
+
+The columns are filled from the existing comments and tasks, then kept up to date by
+the triggers in utils.counters.
+"""
+from alembic import op
+import sqlalchemy as sa
+from utils import counters, search
+
+
+revision = "0006_add_counters"
+down_revision = "0005_index_tracking_started_at"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("tasks") as batch_op:
+        batch_op.add_column(sa.Column("comment_count", sa.Integer(), nullable=False, server_default="0"))
+    with op.batch_alter_table("categories") as batch_op:
+        batch_op.add_column(sa.Column("task_count", sa.Integer(), nullable=False, server_default="0"))
+
+    bind = op.get_bind()
+    counters.recount(bind)
+    counters.install(bind)
+
+
+def downgrade():
+    bind = op.get_bind()
+    counters.uninstall(bind)
+    with op.batch_alter_table("categories") as batch_op:
+        batch_op.drop_column("task_count")
+    with op.batch_alter_table("tasks") as batch_op:
+        batch_op.drop_column("comment_count")
+    # SQLite drops columns by copying the table, which loses the triggers on tasks and
+    # the expression index on categories added in 0003
+    search.install(bind)
+    if bind.dialect.name == "sqlite":
+        op.create_index("uq_categories_label_lower", "categories", [sa.text("lower(label)")], unique=True)
@@ -0,0 +1,37 @@
+"""Record sent due-date reminders and index tasks by due date on SQLite
+
+Revision ID: 0007_task_reminders
+Revises: 0006_add_counters
+Create Date: 2026-10-18 14:20:00
+
+Adds the task_reminders table read by flask jobs run-reminders (see utils.reminders).
+The reminder window is scanned in (due_date, id) order: PostgreSQL reads the index
+added in 0003 backwards, and SQLite gets a plain (due_date, id) index here.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0007_task_reminders"
+down_revision = "0006_add_counters"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "task_reminders",
+        sa.Column("task_id", sa.Integer(), sa.ForeignKey("tasks.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("due_date", sa.Date(), primary_key=True),
+        sa.Column("sent_at", sa.DateTime(), nullable=False)
+    )
+    op.create_index("ix_task_reminders_due_date", "task_reminders", ["due_date"])
+    if op.get_bind().dialect.name == "sqlite":
+        op.create_index("ix_tasks_due_date_id", "tasks", ["due_date", "id"])
+
+
+def downgrade():
+    if op.get_bind().dialect.name == "sqlite":
+        op.drop_index("ix_tasks_due_date_id", table_name="tasks")
+    op.drop_index("ix_task_reminders_due_date", table_name="task_reminders")
+    op.drop_table("task_reminders")
@@ -0,0 +1,47 @@
+"""Record the latest change to every task, comment and tracking record
+
+Revision ID: 0008_task_changes
+Revises: 0007_task_reminders
+Create Date: 2026-10-18 15:10:00
+
+Adds the changes table read by GET /tasks/changes and the triggers in utils.changes that
+write it. Existing records are recorded as changed, so a client syncing from the start of
+the feed receives them.
+"""
+from alembic import op
+import sqlalchemy as sa
+from utils import changes
+
+
+revision = "0008_task_changes"
+down_revision = "0007_task_reminders"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        op.execute(sa.schema.CreateSequence(sa.Sequence("changes_seq")))
+    op.create_table(
+        "changes",
+        sa.Column("table_name", sa.String(), primary_key=True),
+        sa.Column("row_id", sa.Integer(), primary_key=True),
+        sa.Column("transaction_id", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("seq", sa.BigInteger(), nullable=False),
+        sa.Column("deleted", sa.Boolean(), nullable=False)
+    )
+    op.create_index("ix_changes_position", "changes", ["transaction_id", "seq"], unique=True)
+
+    changes.backfill(bind)
+    # The triggers as they were before 0010_change_owners added changes.user_id
+    changes.install(bind, owners=False)
+
+
+def downgrade():
+    bind = op.get_bind()
+    changes.uninstall(bind)
+    op.drop_index("ix_changes_position", table_name="changes")
+    op.drop_table("changes")
+    if bind.dialect.name == "postgresql":
+        op.execute(sa.schema.DropSequence(sa.Sequence("changes_seq")))
@@ -0,0 +1,44 @@
+"""Add updated_at to users and index the updated_at columns the validators read
+
+Revision ID: 0009_cheap_validators
+Revises: 0008_task_changes
+Create Date: 2026-10-18 16:00:00
+
+Task and category responses embed their users' name and email, so the validators in
+utils.validators include the newest users.updated_at. Existing users are stamped with the
+time of the upgrade. The indexes on tasks.updated_at, users.updated_at and (category_id,
+updated_at) of tasks turn the validators' max() into a single index lookup instead of a
+scan of the table.
+"""
+from alembic import op
+import sqlalchemy as sa
+from utils.timestamps import utc_now
+
+
+revision = "0009_cheap_validators"
+down_revision = "0008_task_changes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if not any(column["name"] == "updated_at" for column in inspector.get_columns("users")):
+        # Add the column as nullable, fill it in, then make it required
+        with op.batch_alter_table("users") as batch_op:
+            batch_op.add_column(sa.Column("updated_at", sa.DateTime(), nullable=True))
+        op.execute(sa.table("users", sa.column("updated_at")).update().values(updated_at=utc_now()))
+        with op.batch_alter_table("users") as batch_op:
+            batch_op.alter_column("updated_at", existing_type=sa.DateTime(), nullable=False)
+
+    op.create_index("ix_users_updated_at", "users", ["updated_at"])
+    op.create_index("ix_tasks_updated_at", "tasks", ["updated_at"])
+    op.create_index("ix_tasks_category_id_updated_at", "tasks", ["category_id", "updated_at"])
+
+
+def downgrade():
+    op.drop_index("ix_tasks_category_id_updated_at", table_name="tasks")
+    op.drop_index("ix_tasks_updated_at", table_name="tasks")
+    op.drop_index("ix_users_updated_at", table_name="users")
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.drop_column("updated_at")
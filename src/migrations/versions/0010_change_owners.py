@@ -0,0 +1,40 @@
+"""Record the owner of every change so each user reads only their own feed
+
+Revision ID: 0010_change_owners
+Revises: 0009_cheap_validators
+Create Date: 2026-10-18 17:00:00
+
+Adds changes.user_id, the owner of the changed record's task, and an index on it
+followed by the feed's position, so GET /tasks/changes returns a user only the changes
+of their own tasks. The triggers in utils.changes are replaced by ones that write the
+owner, and existing changes are given theirs. Tombstones of records deleted before this
+revision have no owner left to find, so only admins see them.
+"""
+from alembic import op
+import sqlalchemy as sa
+from utils import changes
+
+
+revision = "0010_change_owners"
+down_revision = "0009_cheap_validators"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    changes.uninstall(bind)
+    with op.batch_alter_table("changes") as batch_op:
+        batch_op.add_column(sa.Column("user_id", sa.Integer(), nullable=True))
+    op.create_index("ix_changes_user_id_position", "changes", ["user_id", "transaction_id", "seq"])
+    changes.assign_owners(bind)
+    changes.install(bind)
+
+
+def downgrade():
+    bind = op.get_bind()
+    changes.uninstall(bind)
+    op.drop_index("ix_changes_user_id_position", table_name="changes")
+    with op.batch_alter_table("changes") as batch_op:
+        batch_op.drop_column("user_id")
+    changes.install(bind, owners=False)
@@ -1,5 +1,6 @@
 from init import db, ma
 from marshmallow import fields
+from utils.timestamps import utc_now
 
 class Category(db.Model):
     """Defines the Category model with the following attributes:
@@ -7,6 +8,8 @@ class Category(db.Model):
     Attributes:
         id (int): Primary key, auto-incremented.
         label (str): The name of the category.
+        updated_at (datetime): When the category last changed.
+        task_count (int): Number of tasks in the category, maintained by database triggers (see utils.counters).
     
     Relationships:
         tasks: One-to-many relationship with the Task model.
@@ -15,6 +18,13 @@ class Category(db.Model):
 
     id = db.Column(db.Integer, primary_key=True)
     label = db.Column(db.String, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False, default=utc_now, onupdate=utc_now)
+    task_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
+    __table_args__ = (
+        # Labels are unique regardless of case, and looked up with lower(label)
+        db.Index("uq_categories_label_lower", db.func.lower(label), unique=True),
+    )
 
     tasks = db.relationship("Task", back_populates='category', cascade='all, delete')
 
@@ -24,7 +34,7 @@ class CategorySchema(ma.Schema):
     tasks = fields.Nested('TaskSchema', many=True, exclude=['category'])
 
     class Meta:
-        fields = ('id', 'label', 'tasks')
+        fields = ('id', 'label', 'task_count', 'tasks')
         ordered = True
 
 category_schema = CategorySchema()
@@ -0,0 +1,35 @@
+from init import db
+
+# Numbers the changes on PostgreSQL; SQLite takes the next number from the table itself
+change_sequence = db.Sequence("changes_seq", metadata=db.metadata)
+
+class Change(db.Model):
+    """The latest change to a task, comment or tracking record, read by GET /tasks/changes.
+
+    Rows are written by the triggers in utils.changes, in the same transaction as the
+    change itself. Each record has one row, moved to a new position whenever the record
+    is written again, so the table never holds more rows than records ever created.
+
+    Attributes:
+        table_name (str): Table of the changed record (tasks, comments or task_trackings).
+        row_id (int): ID of the changed record.
+        transaction_id (int): PostgreSQL transaction that made the change; always 0 on SQLite.
+        seq (int): Number of the change, increasing with every change.
+        deleted (bool): Whether the change deleted the record, making the row its tombstone.
+        user_id (int): Owner of the record's task, whose feed the change belongs to; kept in tombstones.
+    """
+    __tablename__ = "changes"
+
+    table_name = db.Column(db.String, primary_key=True)
+    row_id = db.Column(db.Integer, primary_key=True)
+    transaction_id = db.Column(db.BigInteger, nullable=False, default=0, server_default="0")
+    seq = db.Column(db.BigInteger, nullable=False)
+    deleted = db.Column(db.Boolean, nullable=False, default=False)
+    user_id = db.Column(db.Integer)
+
+    __table_args__ = (
+        # The feed's order; a client's token is a position in it
+        db.Index("ix_changes_position", transaction_id, seq, unique=True),
+        # The same order within one owner's feed
+        db.Index("ix_changes_user_id_position", user_id, transaction_id, seq),
+    )
@@ -1,5 +1,6 @@
 from init import db, ma
 from marshmallow import fields 
+from utils.timestamps import utc_now
 
 class Comment(db.Model): 
     """Defines the Comment model with the following attributes:
@@ -10,6 +11,7 @@ class Comment(db.Model):
         timestamp (datetime): The timestamp when the comment was created, not nullable.
         user_id (int): Foreign key referencing the User model, not nullable.
         task_id (int): Foreign key referencing the Task model, not nullable.
+        updated_at (datetime): When the comment last changed.
     
     Relationships:
         user: Many-to-one relationship with the User model.
@@ -21,7 +23,8 @@ class Comment(db.Model):
     content = db.Column(db.String, nullable=False)
     timestamp = db.Column(db.DateTime, nullable=False) 
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
-    task_idfi = db.Column(db.Integer, db.ForeignKey("tasks.id"), nullable=False)
+    task_idfi = db.Column(db.Integer, db.ForeignKey("tasks.id"), nullable=False, index=True)
+    updated_at = db.Column(db.DateTime, nullable=False, default=utc_now, onupdate=utc_now)
 
     user = db.relationship("User", back_populates ="comments")
     task = db.relationship("Task", back_populates="comments")
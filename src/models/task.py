@@ -1,6 +1,8 @@
 from init import db, ma 
 from marshmallow import fields, validates 
 from marshmallow.validate import Length, And, Regexp, OneOf 
+from models.task_reminder import TaskReminder  # noqa: F401  mapped before Task.reminders resolves it
+from utils.timestamps import utc_now
 
 # Define valid priorities as a constant
 VALID_PRIORITIES = ("Low", "Medium", "High", "Critical", "Routine", "Optional") 
@@ -16,12 +18,15 @@ class Task(db.Model):
         priority (str): The priority of the task.
         category_id (int): Foreign key referencing the Category model, not nullable.
         user_id (int): Foreign key referencing the User model, not nullable.
+        updated_at (datetime): When the task, its comments or its tracking record last changed.
+        comment_count (int): Number of comments on the task, maintained by database triggers (see utils.counters).
     
     Relationships:
         user: Many-to-one relationship with the User model.
         comments: One-to-many relationship with the Comment model.
         category: Many-to-one relationship with the Category model.
         task_tracking: One-to-one relationship with the TaskTracking model.
+        reminders: One-to-many relationship with the TaskReminder model, deleted with the task.
     """
     __tablename__ = "tasks"
 
@@ -30,13 +35,26 @@ class Task(db.Model):
     description = db.Column(db.String)
     due_date = db.Column(db.Date)
     priority = db.Column(db.String)
-    category_id = db.Column(db.Integer, db.ForeignKey("categories.id"), nullable=False)
-    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    category_id = db.Column(db.Integer, db.ForeignKey("categories.id"), nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False, index=True)
+    updated_at = db.Column(db.DateTime, nullable=False, default=utc_now, onupdate=utc_now, index=True)
+    comment_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
+    __table_args__ = (
+        # Matches the order tasks are paged in; NULLS LAST in an index is PostgreSQL only
+        db.Index("ix_tasks_due_date_id", due_date.desc().nulls_last(), id.desc()).ddl_if(dialect="postgresql"),
+        # SQLite sorts NULLs first, so the plain index read backwards is the same order
+        db.Index("ix_tasks_due_date_id", due_date, id).ddl_if(dialect="sqlite"),
+        # Newest change of a category's tasks, read by its validator
+        db.Index("ix_tasks_category_id_updated_at", category_id, updated_at),
+    )
 
     user = db.relationship("User", back_populates="tasks")
     comments = db.relationship("Comment", back_populates="task", cascade="all, delete")
     category = db.relationship("Category", back_populates="tasks")
     task_tracking = db.relationship("TaskTracking", back_populates="task", uselist=False) 
+    # Deleted by the ORM rather than ON DELETE CASCADE, which SQLite skips without PRAGMA foreign_keys
+    reminders = db.relationship("TaskReminder", cascade="all, delete")
 
 class TaskSchema(ma.Schema): 
     """Schema for serializing and deserializing Task objects."""
@@ -57,7 +75,7 @@ class TaskSchema(ma.Schema):
     priority = fields.String(validate=OneOf(VALID_PRIORITIES, error="Invalid Priority"))
 
     class Meta:
-        fields = ("id","title", "description", "due_date", "priority", "user", "comments", "category","task_tracking")
+        fields = ("id","title", "description", "due_date", "priority", "comment_count", "user", "comments", "category","task_tracking")
         ordered = True 
 
 task_schema = TaskSchema()
@@ -0,0 +1,17 @@
+from init import db
+from utils.timestamps import utc_now
+
+class TaskReminder(db.Model):
+    """Records that a reminder was sent for a task's due date, so later runs skip the task.
+
+    Attributes:
+        task_id (int): Foreign key referencing the Task model. Deleting the task deletes its records,
+            through the Task.reminders cascade and the bulk delete endpoint (and ON DELETE CASCADE on PostgreSQL).
+        due_date (date): The due date the reminder was about. Moving the due date makes the task due a new reminder.
+        sent_at (datetime): When the reminder was handed to the sink.
+    """
+    __tablename__ = "task_reminders"
+
+    task_id = db.Column(db.Integer, db.ForeignKey("tasks.id", ondelete="CASCADE"), primary_key=True)
+    due_date = db.Column(db.Date, primary_key=True, index=True)
+    sent_at = db.Column(db.DateTime, nullable=False, default=utc_now)
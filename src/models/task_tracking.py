@@ -1,6 +1,7 @@
 from datetime import datetime 
 from init import db, ma
 from marshmallow import fields 
+from utils.timestamps import utc_now
 
 class TaskTracking(db.Model):
     """
@@ -13,15 +14,17 @@ class TaskTracking(db.Model):
         started_at (datetime): Timestamp indicating when the task was started.
         finished_at (datetime): Timestamp indicating when the task was finished.
         actual_hours (float): Actual hours spent on the task, calculated based on start and finish times.
+        updated_at (datetime): When the tracking record last changed.
     """
     __tablename__ = "task_trackings"
 
     id = db.Column(db.Integer, primary_key=True)
-    task_id = db.Column(db.Integer, db.ForeignKey("tasks.id"), nullable=False)
+    task_id = db.Column(db.Integer, db.ForeignKey("tasks.id"), nullable=False, index=True)
     estimated_hours = db.Column(db.Float, nullable=False)
-    started_at = db.Column(db.DateTime, nullable=True)
+    started_at = db.Column(db.DateTime, nullable=True, index=True)
     finished_at = db.Column(db.DateTime, nullable=True)
     actual_hours = db.Column(db.Float)
+    updated_at = db.Column(db.DateTime, nullable=False, default=utc_now, onupdate=utc_now)
 
     task = db.relationship("Task", back_populates="task_tracking")
 
@@ -1,6 +1,7 @@
 from init import db, ma
 from marshmallow import fields
 from marshmallow.validate import Length, Regexp
+from utils.timestamps import utc_now
 
 class User(db.Model):
     """Defines the User model with the following attributes:
@@ -11,6 +12,7 @@ class User(db.Model):
         email (str): Unique, required for user login.
         password (str): Encrypted password for user authentication.
         is_admin (bool): Flag indicating whether the user has admin privileges.
+        updated_at (datetime): When the user last changed; tasks and comments embed the name and email.
     
     Relationships:
         tasks: One-to-many relationship with the Task model.
@@ -23,6 +25,7 @@ class User(db.Model):
     email = db.Column(db.String(100), unique=True, nullable=False)
     password = db.Column(db.String, nullable=False)
     is_admin = db.Column(db.Boolean, default=False)
+    updated_at = db.Column(db.DateTime, nullable=False, default=utc_now, onupdate=utc_now, index=True)
 
     tasks = db.relationship('Task', back_populates='user', cascade="all, delete")
     comments = db.relationship('Comment', back_populates='user', cascade="all, delete")
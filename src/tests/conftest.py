@@ -0,0 +1,75 @@
+"""Fixtures for the endpoint tests: an app on a fresh SQLite database, a client and rows to read.
+
+Run from the src directory, after installing requirements-dev.txt:
+    python -m pytest tests
+"""
+import pytest
+
+
+@pytest.fixture
+def app_env():
+    """Extra settings for the app, as environment variables; override it in a module to change them."""
+    return {}
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch, app_env):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'app.db'}")
+    monkeypatch.setenv("JWT_SECRET_KEY", "endpoint-test-secret-key-that-is-long-enough")
+    for name, value in app_env.items():
+        monkeypatch.setenv(name, value)
+    from main import create_app
+    from init import db
+    app = create_app()
+    with app.app_context():
+        # Only the primary: db.metadatas keeps the replica binds of apps made by earlier tests
+        db.create_all(bind_key=None)
+    yield app
+    with app.app_context():
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def user(app):
+    """A user who owns the tasks made by make_tasks, and a category to put them in."""
+    from init import db
+    from models.users import User
+    from models.category import Category
+    with app.app_context():
+        owner = User(name="Test User", email="test@example.com", password="not-a-hash")
+        db.session.add_all([owner, Category(label="Work")])
+        db.session.commit()
+        return owner.id
+
+
+@pytest.fixture
+def auth_header(app, user):
+    from flask_jwt_extended import create_access_token
+    with app.app_context():
+        return {"Authorization": f"Bearer {create_access_token(identity=str(user))}"}
+
+
+@pytest.fixture
+def make_tasks(app, user):
+    """Insert tasks with the given due dates, returning their ids in insertion order."""
+    def make(due_dates):
+        from init import db
+        from models.category import Category
+        from models.task import Task
+        with app.app_context():
+            category_id = db.session.scalar(db.select(Category.id))
+            tasks = [
+                Task(title=f"Task {index}", due_date=due_date, category_id=category_id, user_id=user)
+                for index, due_date in enumerate(due_dates)
+            ]
+            db.session.add_all(tasks)
+            db.session.commit()
+            return [task.id for task in tasks]
+    return make
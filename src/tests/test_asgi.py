@@ -0,0 +1,113 @@
+"""create_async_app serves the same responses as the WSGI app, on aiosqlite, one greenlet per request."""
+import asyncio
+import json
+import pytest
+
+
+@pytest.fixture
+def asgi(app):
+    """The ASGI app, on the same database as app."""
+    from main import create_async_app
+    return create_async_app()
+
+
+def _serve(asgi, scenario):
+    """Run the coroutine scenario on one event loop, between the lifespan startup and shutdown."""
+    lifespan = asyncio.Queue()
+    events = []
+
+    async def send(message):
+        events.append(message["type"])
+
+    async def main():
+        served = asyncio.ensure_future(asgi({"type": "lifespan"}, lifespan.get, send))
+        await lifespan.put({"type": "lifespan.startup"})
+        while not events:
+            await asyncio.sleep(0)
+        try:
+            return await scenario
+        finally:
+            # Shutting down disposes of the engines while their connections' loop still runs
+            await lifespan.put({"type": "lifespan.shutdown"})
+            await served
+            assert events == ["lifespan.startup.complete", "lifespan.shutdown.complete"]
+
+    return asyncio.run(main())
+
+
+async def _request(asgi, method, path, body=b"", headers=()):
+    """Send one request, the body in two messages, and return the status, headers and body messages."""
+    path, _, query = path.partition("?")
+    scope = {
+        "type": "http", "http_version": "1.1", "method": method, "scheme": "http",
+        "path": path, "root_path": "", "query_string": query.encode(),
+        "headers": [(name.lower().encode(), value.encode()) for name, value in headers],
+        "client": ("127.0.0.1", 50000), "server": ("testserver", 80),
+    }
+    middle = len(body) // 2
+    incoming = [
+        {"type": "http.request", "body": body[:middle], "more_body": True},
+        {"type": "http.request", "body": body[middle:], "more_body": False},
+    ]
+    sent = []
+
+    async def receive():
+        return incoming.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    await asgi(scope, receive, send)
+    start, *chunks = sent
+    assert start["type"] == "http.response.start"
+    assert [chunk.get("more_body", False) for chunk in chunks] == [True] * (len(chunks) - 1) + [False]
+    return start["status"], dict(start["headers"]), [chunk["body"] for chunk in chunks]
+
+
+def test_responses_match_the_wsgi_app(client, asgi, make_tasks):
+    from init import db
+    with asgi.app.app_context():
+        assert db.engine.url.drivername == "sqlite+aiosqlite"
+    (task_id,) = make_tasks([None])
+    status, headers, chunks = _serve(asgi, _request(asgi, "GET", f"/tasks/{task_id}"))
+    expected = client.get(f"/tasks/{task_id}")
+    assert status == 200
+    assert headers[b"content-type"] == expected.headers["Content-Type"].encode()
+    assert headers[b"etag"] == expected.headers["ETag"].encode()
+    assert b"".join(chunks) == expected.get_data()
+
+
+def test_a_write_round_trips(client, asgi, user, auth_header):
+    body = json.dumps({"title": "Async task", "category": {"label": "Work"}}).encode()
+    headers = [("Content-Type", "application/json"), *auth_header.items()]
+    status, _, chunks = _serve(asgi, _request(asgi, "POST", "/tasks/", body, headers))
+    assert status == 200
+    task = json.loads(b"".join(chunks))
+    assert task["title"] == "Async task"
+    # Committed through aiosqlite, read back through the blocking driver
+    assert client.get(f"/tasks/{task['id']}").get_json()["title"] == "Async task"
+
+
+def test_streamed_bodies_arrive_in_several_messages(asgi, make_tasks, monkeypatch):
+    ids = make_tasks([None] * 5)
+    monkeypatch.setitem(asgi.app.config, "STREAM_CHUNK_SIZE", 2)
+    status, _, chunks = _serve(asgi, _request(asgi, "GET", "/tasks/?stream=true&fields=id"))
+    assert status == 200
+    assert len(chunks) > 1
+    assert sorted(task["id"] for task in json.loads(b"".join(chunks))) == ids
+
+
+def test_concurrent_requests_share_the_event_loop(asgi, make_tasks):
+    ids = make_tasks([None] * 4)
+
+    async def fetch_all():
+        return await asyncio.gather(*(_request(asgi, "GET", f"/tasks/{task_id}?fields=id") for task_id in ids))
+
+    responses = _serve(asgi, fetch_all())
+    assert [(status, json.loads(b"".join(chunks))["id"]) for status, _, chunks in responses] == [(200, task_id) for task_id in ids]
+
+
+def test_errors_keep_their_status(asgi):
+    status, _, chunks = _serve(asgi, _request(asgi, "GET", "/tasks/1"))
+    assert status == 404
+    assert json.loads(b"".join(chunks)) == {"error": "Task with id 1 not found"}
@@ -0,0 +1,83 @@
+"""The /tasks/bulk endpoints answer one result per item, in request order."""
+import pytest
+
+
+@pytest.fixture
+def other_task(app, make_tasks):
+    """A task owned by another user."""
+    from init import db
+    from models.task import Task
+    from models.users import User
+    (task_id,) = make_tasks([None])
+    with app.app_context():
+        other = User(name="Other User", email="other@example.com", password="not-a-hash")
+        db.session.add(other)
+        db.session.flush()
+        db.session.get(Task, task_id).user_id = other.id
+        db.session.commit()
+    return task_id
+
+
+def _statuses(response):
+    return [result["status"] for result in response.get_json()["results"]]
+
+
+def _titles(app, ids):
+    from init import db
+    from models.task import Task
+    with app.app_context():
+        return [db.session.get(Task, task_id).title for task_id in ids]
+
+
+def test_bulk_create(app, client, auth_header):
+    items = [
+        {"title": "First", "category": {"label": "work"}},
+        {"title": "x", "category": {"label": "Work"}},
+        {"title": "Third", "category": {"label": "Missing"}},
+        {"title": "Fourth", "category": {"label": "Work"}, "priority": "High"},
+    ]
+    response = client.post("/tasks/bulk", json=items, headers=auth_header)
+    assert response.status_code == 207
+    results = response.get_json()["results"]
+    assert [result["index"] for result in results] == [0, 1, 2, 3]
+    assert _statuses(response) == [201, 400, 404, 201]
+    assert _titles(app, [results[0]["id"], results[3]["id"]]) == ["First", "Fourth"]
+
+    response = client.post("/tasks/bulk", json=[{"title": "Alone", "category": {"label": "Work"}}], headers=auth_header)
+    assert response.status_code == 201
+
+
+def test_bulk_update(app, client, auth_header, make_tasks, other_task):
+    ids = make_tasks([None, None])
+    items = [
+        {"id": ids[0], "title": "Renamed"},
+        {"id": other_task, "title": "Not mine"},
+        {"id": 999999, "title": "Missing"},
+        {"id": True, "title": "Boolean"},
+        {"id": ids[1], "priority": "Urgent"},
+    ]
+    response = client.patch("/tasks/bulk", json=items, headers=auth_header)
+    assert response.status_code == 207
+    assert _statuses(response) == [200, 403, 404, 400, 400]
+    assert _titles(app, [ids[0], ids[1], other_task]) == ["Renamed", "Task 1", "Task 0"]
+
+
+def test_bulk_delete(app, client, auth_header, make_tasks, other_task):
+    from init import db
+    from models.task import Task
+    ids = make_tasks([None, None])
+    body = [ids[0], ids[0], True, 1.0, "1", other_task, 999999, ids[1]]
+    response = client.delete("/tasks/bulk", json=body, headers=auth_header)
+    assert response.status_code == 207
+    assert _statuses(response) == [200, 400, 400, 400, 400, 403, 404, 200]
+    deleted = [result["id"] for result in response.get_json()["results"] if result["status"] == 200]
+    assert deleted == ids
+    with app.app_context():
+        assert db.session.scalars(db.select(Task.id)).all() == [other_task]
+
+
+def test_bulk_rejects_bodies_that_are_not_arrays_or_too_long(app, client, auth_header):
+    assert client.delete("/tasks/bulk", json={"ids": [1]}, headers=auth_header).status_code == 400
+    assert client.post("/tasks/bulk", json=[], headers=auth_header).status_code == 400
+    app.config["BULK_MAX_ITEMS"] = 1
+    assert client.delete("/tasks/bulk", json=[1, 2], headers=auth_header).status_code == 400
@@ -0,0 +1,62 @@
+"""The response cache serves repeated reads of a document and drops the entry when its rows are written."""
+import pytest
+
+
+@pytest.fixture
+def task_id(make_tasks):
+    (task_id,) = make_tasks([None])
+    return task_id
+
+
+def _get(client, task_id, expected):
+    response = client.get(f"/tasks/{task_id}")
+    assert response.status_code == 200
+    assert response.headers["X-Cache"] == expected
+    return response.get_json()
+
+
+def _stats():
+    from utils.cache import response_cache
+    return response_cache.stats()
+
+
+def test_a_repeated_read_is_a_hit(client, task_id):
+    first = _get(client, task_id, "MISS")
+    assert _get(client, task_id, "HIT") == first
+
+
+def test_updating_the_task_invalidates_its_entry(app, client, auth_header, task_id):
+    _get(client, task_id, "MISS")
+    assert _stats()["entries"] == 1
+    response = client.patch(f"/tasks/{task_id}", json={"title": "Renamed"}, headers=auth_header)
+    assert response.status_code == 200
+    # The entry goes when the write commits, not when its key stops being asked for
+    assert _stats()["entries"] == 0
+    assert _stats()["invalidations"] == 1
+    assert _get(client, task_id, "MISS")["title"] == "Renamed"
+    _get(client, task_id, "HIT")
+
+
+def test_a_new_comment_invalidates_the_task_it_belongs_to(client, auth_header, task_id):
+    assert _get(client, task_id, "MISS")["comments"] == []
+    response = client.post(f"/tasks/{task_id}/comments/", json={"content": "A comment"}, headers=auth_header)
+    assert response.status_code == 201
+    (comment,) = _get(client, task_id, "MISS")["comments"]
+    assert comment["content"] == "A comment"
+
+
+def test_a_write_that_keeps_the_version_still_invalidates(app, client, task_id):
+    from sqlalchemy.orm.attributes import flag_modified
+    from init import db
+    from models.task import Task
+    _get(client, task_id, "MISS")
+    with app.app_context():
+        # Writing updated_at back unchanged keeps onupdate from moving it, and with it the
+        # cache key: only the tag can drop the entry
+        task = db.session.get(Task, task_id)
+        updated_at = task.updated_at
+        task.title = "Renamed"
+        flag_modified(task, "updated_at")
+        db.session.commit()
+        assert task.updated_at == updated_at
+    assert _get(client, task_id, "MISS")["title"] == "Renamed"
@@ -0,0 +1,73 @@
+"""The change feed returns each user the changes of their own tasks, and every change to admins."""
+from datetime import date, datetime
+import pytest
+
+
+@pytest.fixture
+def other_user(app):
+    from init import db
+    from models.users import User
+    with app.app_context():
+        users = [
+            User(name="Other User", email="other@example.com", password="not-a-hash"),
+            User(name="Admin User", email="admin@example.com", password="not-a-hash", is_admin=True),
+        ]
+        db.session.add_all(users)
+        db.session.commit()
+        return [user.id for user in users]
+
+
+def _header(app, user_id):
+    from flask_jwt_extended import create_access_token
+    with app.app_context():
+        return {"Authorization": f"Bearer {create_access_token(identity=str(user_id))}"}
+
+
+def _feed(client, headers):
+    body = client.get("/tasks/changes", headers=headers).get_json()
+    return {
+        "tasks": [task["id"] for task in body["tasks"]],
+        "comments": [comment["id"] for comment in body["comments"]],
+        "deleted": body["deleted"]["tasks"],
+    }
+
+
+def test_feed_is_scoped_to_the_owner_of_each_task(app, client, user, auth_header, other_user):
+    from init import db
+    from models.category import Category
+    from models.comment import Comment
+    from models.task import Task
+    other, admin = other_user
+    with app.app_context():
+        category_id = db.session.scalar(db.select(Category.id))
+        mine, theirs, gone = (
+            Task(title=title, due_date=date(2026, 1, 1), category_id=category_id, user_id=owner)
+            for title, owner in (("Mine", user), ("Theirs", other), ("Gone", user))
+        )
+        db.session.add_all([mine, theirs, gone])
+        db.session.flush()
+        # Another user's comment on my task belongs to my feed
+        comment = Comment(content="On my task", timestamp=datetime(2026, 1, 1), user_id=other, task_idfi=mine.id)
+        db.session.add(comment)
+        db.session.commit()
+        mine, theirs, gone, comment = mine.id, theirs.id, gone.id, comment.id
+
+    assert client.delete(f"/tasks/{gone}", headers=auth_header).status_code == 200
+
+    assert _feed(client, auth_header) == {"tasks": [mine], "comments": [comment], "deleted": [gone]}
+    assert _feed(client, _header(app, other)) == {"tasks": [theirs], "comments": [], "deleted": []}
+    assert _feed(client, _header(app, admin)) == {"tasks": [mine, theirs], "comments": [comment], "deleted": [gone]}
+
+
+def test_tokens_page_through_the_owners_feed(app, client, auth_header, make_tasks, other_user):
+    ids = make_tasks([date(2026, 1, 1)] * 3)
+
+    first = client.get("/tasks/changes?limit=2", headers=auth_header).get_json()
+    assert [task["id"] for task in first["tasks"]] == ids[:2]
+    assert first["has_more"] is True
+
+    rest = client.get(f"/tasks/changes?since={first['next_token']}", headers=auth_header).get_json()
+    assert [task["id"] for task in rest["tasks"]] == ids[2:]
+    assert rest["has_more"] is False
+
+    assert _feed(client, _header(app, other_user[0]))["tasks"] == []
@@ -0,0 +1,90 @@
+"""Responses are compressed with the best encoding the client accepts, once they are big enough."""
+import gzip
+import json
+import pytest
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DECODERS = {"gzip": gzip.decompress}
+if zstandard is not None:
+    DECODERS["zstd"] = lambda data: zstandard.ZstdDecompressor().decompressobj().decompress(data)
+if brotli is not None:
+    DECODERS["br"] = brotli.decompress
+
+
+@pytest.fixture
+def tasks(make_tasks):
+    # Enough tasks for the list to pass COMPRESSION_MIN_SIZE
+    return make_tasks([None] * 20)
+
+
+def _get(client, url="/tasks/", accept_encoding=None):
+    headers = {"Accept-Encoding": accept_encoding} if accept_encoding is not None else {}
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200
+    assert "Accept-Encoding" in response.vary
+    return response
+
+
+def _decoded(response):
+    data = response.get_data()
+    encoding = response.headers.get("Content-Encoding")
+    return json.loads(DECODERS[encoding](data) if encoding else data)
+
+
+@pytest.mark.parametrize("encoding", list(DECODERS))
+def test_each_installed_encoding_round_trips(client, tasks, encoding):
+    plain = _get(client)
+    response = _get(client, accept_encoding=encoding)
+    assert response.headers["Content-Encoding"] == encoding
+    assert len(response.get_data()) < len(plain.get_data())
+    assert _decoded(response) == plain.get_json()
+
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    # Ties go to the preferred codec installed: zstd, then br, then gzip
+    ("gzip, br, zstd", "zstd" if zstandard else "br" if brotli else "gzip"),
+    ("gzip, br", "br" if brotli else "gzip"),
+    # Quality values win over the preference order
+    ("zstd;q=0.1, gzip", "gzip"),
+    ("*", "zstd" if zstandard else "br" if brotli else "gzip"),
+    ("*, gzip;q=0", "zstd" if zstandard else "br" if brotli else None),
+    ("gzip;q=0", None),
+    ("identity", None),
+    ("compress, deflate", None),
+    ("", None),
+    (None, None),
+])
+def test_the_best_accepted_encoding_is_used(client, tasks, accept_encoding, expected):
+    response = _get(client, accept_encoding=accept_encoding)
+    assert response.headers.get("Content-Encoding") == expected
+
+
+def test_small_responses_are_sent_as_they_are(client, tasks):
+    response = _get(client, f"/tasks/{tasks[0]}?fields=id", accept_encoding="gzip")
+    assert "Content-Encoding" not in response.headers
+    assert response.get_json() == {"id": tasks[0]}
+
+
+def test_streamed_responses_are_compressed_as_they_go(client, tasks):
+    response = _get(client, "/tasks/?stream=true&fields=id", accept_encoding="gzip")
+    assert response.is_streamed
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in response.headers
+    assert sorted(task["id"] for task in _decoded(response)) == tasks
+
+
+def test_compression_can_be_switched_off(app, tasks, monkeypatch):
+    from main import create_app
+    monkeypatch.setenv("COMPRESSION_ENABLED", "0")
+    response = create_app().test_client().get("/tasks/", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert "Content-Encoding" not in response.headers
@@ -0,0 +1,58 @@
+"""Conditional GETs: every negotiated representation of a resource has its own ETag."""
+from datetime import date
+import pytest
+
+
+@pytest.fixture
+def tasks(make_tasks):
+    return make_tasks([date(2026, 1, 1 + index) for index in range(3)])
+
+
+def _etag(response):
+    assert response.status_code == 200
+    return response.headers["ETag"]
+
+
+def test_json_and_msgpack_have_different_etags(client, tasks):
+    json_etag = _etag(client.get("/tasks/"))
+    msgpack_etag = _etag(client.get("/tasks/", headers={"Accept": "application/msgpack"}))
+    assert json_etag != msgpack_etag
+
+    response = client.get("/tasks/", headers={"Accept": "application/msgpack", "If-None-Match": json_etag})
+    assert response.status_code == 200
+    assert response.mimetype == "application/msgpack"
+
+    response = client.get("/tasks/", headers={"Accept": "application/msgpack", "If-None-Match": msgpack_etag})
+    assert response.status_code == 304
+
+
+@pytest.fixture
+def compress_all(app):
+    app.config["COMPRESSION_MIN_SIZE"] = 1
+
+
+@pytest.mark.parametrize("url", ["/tasks/", "/tasks/{task_id}"])
+def test_compressed_responses_have_their_own_etag(client, tasks, compress_all, url):
+    url = url.format(task_id=tasks[0])
+    plain = client.get(url)
+    gzipped = client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert gzipped.headers["Content-Encoding"] == "gzip"
+    assert _etag(gzipped) != _etag(plain)
+
+    # A client that cannot decode gzip never revalidates the gzip variant
+    assert client.get(url, headers={"If-None-Match": _etag(gzipped)}).status_code == 200
+
+    for etag in (_etag(gzipped), _etag(plain)):
+        response = client.get(url, headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.headers["ETag"] == etag
+
+
+def test_cached_compressed_variant_keeps_its_etag(client, tasks, compress_all):
+    url = f"/tasks/{tasks[0]}"
+    first = client.get(url, headers={"Accept-Encoding": "gzip"})
+    second = client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert first.headers["X-Cache"] == "MISS"
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.headers["Content-Encoding"] == first.headers["Content-Encoding"] == "gzip"
+    assert _etag(second) == _etag(first)
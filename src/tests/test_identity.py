@@ -0,0 +1,49 @@
+"""The identity cache keeps the users tokens resolve to and forgets a user as soon as they change."""
+
+
+def _update_user(app, user_id, **values):
+    from init import db
+    from models.users import User
+    with app.app_context():
+        user = db.session.get(User, user_id)
+        for name, value in values.items():
+            setattr(user, name, value)
+        db.session.commit()
+
+
+def test_a_rolled_back_change_keeps_the_cached_user(app, client, user, auth_header):
+    from init import db
+    from models.users import User
+    from utils.identity import identity_cache
+    assert client.get("/cache/stats", headers=auth_header).status_code == 403
+    assert identity_cache._entries[user][0].email == "test@example.com"
+    with app.app_context():
+        db.session.get(User, user).is_admin = True
+        db.session.flush()
+        db.session.rollback()
+    assert user in identity_cache._entries
+
+
+def test_promoting_a_user_takes_effect_on_the_next_request(app, client, user, auth_header):
+    from utils.identity import identity_cache
+    assert client.get("/cache/stats", headers=auth_header).status_code == 403
+    _update_user(app, user, is_admin=True)
+    assert user not in identity_cache._entries
+    assert client.get("/cache/stats", headers=auth_header).status_code == 200
+
+
+def test_updating_through_the_api_evicts_the_user(app, client, user, auth_header):
+    from utils.identity import identity_cache
+    response = client.patch("/auth/users", json={"name": "Renamed User"}, headers=auth_header)
+    assert response.status_code == 200
+    assert user not in identity_cache._entries
+
+
+def test_a_deleted_users_token_stops_working(app, client, user, auth_header):
+    from init import db
+    from models.users import User
+    assert client.get("/cache/stats", headers=auth_header).status_code == 403
+    with app.app_context():
+        db.session.delete(db.session.get(User, user))
+        db.session.commit()
+    assert client.get("/cache/stats", headers=auth_header).status_code == 401
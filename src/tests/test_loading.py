@@ -0,0 +1,99 @@
+"""Eager loading of serialized relationships: strict mode and a constant number of queries per page."""
+from datetime import date, datetime
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import InvalidRequestError
+
+
+@pytest.fixture
+def app_env():
+    # Any relationship the loader options missed raises instead of lazy loading
+    return {"STRICT_LOADING": "1"}
+
+
+@pytest.fixture
+def make_full_tasks(app, user, make_tasks):
+    """Tasks with two comments and a tracking record each, so every nested field has rows to dump."""
+    def make(count):
+        from init import db
+        from models.comment import Comment
+        from models.task_tracking import TaskTracking
+        task_ids = make_tasks([date(2026, 1, 1 + index % 28) for index in range(count)])
+        with app.app_context():
+            for task_id in task_ids:
+                db.session.add_all([
+                    Comment(content="First", timestamp=datetime(2026, 1, 1), user_id=user, task_idfi=task_id),
+                    Comment(content="Second", timestamp=datetime(2026, 1, 2), user_id=user, task_idfi=task_id),
+                    TaskTracking(task_id=task_id, estimated_hours=2.0),
+                ])
+            db.session.commit()
+        return task_ids
+    return make
+
+
+def _count_statements(app):
+    from init import db
+    statements = []
+    with app.app_context():
+        engine = db.engine
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(engine, "before_cursor_execute", record)
+    return statements, lambda: event.remove(engine, "before_cursor_execute", record)
+
+
+def test_strict_mode_dumps_the_task_list_and_detail(app, make_full_tasks):
+    from init import db
+    from models.task import Task, task_schema, tasks_schema
+    from utils.loading import loader_options
+    from utils.serializer import fast_dump
+    (task_id, *_rest) = make_full_tasks(3)
+
+    with app.test_request_context():
+        tasks = db.session.scalars(db.select(Task).options(*loader_options(Task, tasks_schema))).unique().all()
+        dumped = fast_dump(tasks_schema, tasks)
+        assert [len(task["comments"]) for task in dumped] == [2, 2, 2]
+        assert all(task["task_tracking"]["estimated_hours"] == 2.0 for task in dumped)
+
+        db.session.expunge_all()
+        stmt = db.select(Task).filter_by(id=task_id).options(*loader_options(Task, task_schema))
+        task = fast_dump(task_schema, db.session.scalar(stmt))
+        assert task["user"]["name"] == "Test User"
+        assert [comment["user"]["email"] for comment in task["comments"]] == ["test@example.com"] * 2
+
+
+def test_strict_mode_fails_on_a_missing_eager_load(app, make_full_tasks):
+    from init import db
+    from models.task import Task, TaskSchema, tasks_schema
+    from utils.loading import loader_options
+    from utils.serializer import fast_dump
+    make_full_tasks(1)
+
+    with app.test_request_context():
+        options = loader_options(Task, TaskSchema(many=True, exclude=("comments",)))
+        tasks = db.session.scalars(db.select(Task).options(*options)).all()
+        with pytest.raises(InvalidRequestError):
+            fast_dump(tasks_schema, tasks)
+
+
+def test_strict_mode_serves_the_task_endpoints(client, make_full_tasks):
+    (task_id, *_rest) = make_full_tasks(3)
+    assert client.get("/tasks/").status_code == 200
+    assert client.get(f"/tasks/{task_id}").status_code == 200
+
+
+def test_task_list_queries_do_not_grow_with_the_page(app, client, make_full_tasks):
+    # More tasks than either page holds, so both pages end in the same phase of keyset_page
+    make_full_tasks(30)
+
+    counts = []
+    for limit in (2, 20):
+        statements, stop = _count_statements(app)
+        try:
+            body = client.get(f"/tasks/?limit={limit}").get_json()
+        finally:
+            stop()
+        assert len(body["tasks"]) == limit
+        counts.append(len(statements))
+    assert counts[0] == counts[1]
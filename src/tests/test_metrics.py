@@ -0,0 +1,58 @@
+"""/metrics counts requests by endpoint and status, and only answers the monitoring network."""
+import pytest
+from prometheus_client.parser import text_string_to_metric_families
+
+
+def _requests_total(client, endpoint, status):
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    for family in text_string_to_metric_families(response.get_data(as_text=True)):
+        for sample in family.samples:
+            labels = sample.labels
+            if sample.name == "http_requests_total" and (labels["endpoint"], labels["status"]) == (endpoint, status):
+                return sample.value
+    return 0
+
+
+def test_requests_are_counted_by_endpoint_and_status(client, make_tasks):
+    (task_id,) = make_tasks([None])
+    # The counters live in the process-wide registry, so compare with the count before
+    found, missing = _requests_total(client, "tasks.get_one_task", "200"), _requests_total(client, "tasks.get_one_task", "404")
+    for _ in range(3):
+        assert client.get(f"/tasks/{task_id}").status_code == 200
+    assert client.get(f"/tasks/{task_id + 1}").status_code == 404
+    assert _requests_total(client, "tasks.get_one_task", "200") == found + 3
+    assert _requests_total(client, "tasks.get_one_task", "404") == missing + 1
+
+
+@pytest.mark.parametrize("address, status", [
+    ("127.0.0.1", 200),
+    ("10.1.2.3", 200),
+    ("::ffff:192.168.0.9", 200),
+    ("203.0.113.5", 403),
+    ("2001:db8::1", 403),
+])
+def test_only_the_allowed_networks_can_scrape(client, address, status):
+    response = client.get("/metrics", environ_base={"REMOTE_ADDR": address})
+    assert response.status_code == status
+
+
+def test_the_allowed_networks_can_be_set(app, monkeypatch):
+    from main import create_app
+    monkeypatch.setenv("METRICS_ALLOWED_NETWORKS", "203.0.113.0/24")
+    client = create_app().test_client()
+    assert client.get("/metrics", environ_base={"REMOTE_ADDR": "203.0.113.5"}).status_code == 200
+    assert client.get("/metrics").status_code == 403
+
+
+def test_a_malformed_network_stops_startup(app, monkeypatch):
+    from main import create_app
+    monkeypatch.setenv("METRICS_ALLOWED_NETWORKS", "10.0.0.0/8,monitoring")
+    with pytest.raises(ValueError):
+        create_app()
+
+
+def test_metrics_can_be_switched_off(app, monkeypatch):
+    from main import create_app
+    monkeypatch.setenv("METRICS_ENABLED", "0")
+    assert create_app().test_client().get("/metrics").status_code == 404
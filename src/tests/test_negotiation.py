@@ -0,0 +1,69 @@
+"""Responses are MessagePack when the Accept header prefers it, JSON otherwise, and write endpoints read both."""
+from datetime import date
+import msgpack
+import pytest
+
+MSGPACK = "application/msgpack"
+
+
+@pytest.fixture
+def tasks(make_tasks):
+    return make_tasks([date(2026, 1, 1), None])
+
+
+def _get(client, url, accept=None):
+    response = client.get(url, headers={"Accept": accept} if accept is not None else {})
+    assert "Accept" in response.vary
+    return response
+
+
+@pytest.mark.parametrize("url", ["/tasks/", "/tasks/{task_id}", "/categories/"])
+def test_msgpack_carries_the_json_document(client, tasks, url):
+    url = url.format(task_id=tasks[0])
+    as_json = _get(client, url)
+    as_msgpack = _get(client, url, MSGPACK)
+    assert as_msgpack.status_code == 200
+    assert as_msgpack.mimetype == MSGPACK
+    # Dates travel as the same ISO 8601 strings as in JSON
+    assert msgpack.unpackb(as_msgpack.get_data()) == as_json.get_json()
+
+
+@pytest.mark.parametrize("accept, mimetype", [
+    (None, "application/json"),
+    ("*/*", "application/json"),
+    ("application/json, application/msgpack", "application/json"),
+    ("application/json;q=0.5, application/msgpack", MSGPACK),
+    ("application/*, application/msgpack", MSGPACK),
+    ("text/html, */*;q=0.1", "application/json"),
+    # Nothing acceptable is offered: JSON anyway rather than a 406
+    ("text/html", "application/json"),
+])
+def test_the_preferred_type_is_sent(client, tasks, accept, mimetype):
+    response = _get(client, f"/tasks/{tasks[0]}", accept)
+    assert response.status_code == 200
+    assert response.mimetype == mimetype
+
+
+def test_errors_are_negotiated_too(client, tasks):
+    response = _get(client, f"/tasks/{tasks[-1] + 1}", MSGPACK)
+    assert response.status_code == 404
+    assert msgpack.unpackb(response.get_data()) == {"error": f"Task with id {tasks[-1] + 1} not found"}
+
+
+def test_write_endpoints_accept_msgpack_bodies(client, auth_header):
+    body = msgpack.packb({"title": "Packed task", "category": {"label": "Work"}})
+    response = client.post("/tasks/", data=body, content_type=MSGPACK, headers={**auth_header, "Accept": MSGPACK})
+    assert response.status_code == 200
+    assert msgpack.unpackb(response.get_data())["title"] == "Packed task"
+
+    response = client.post("/tasks/", data=b"\xc1", content_type=MSGPACK, headers=auth_header)
+    assert response.status_code == 400
+
+
+def test_msgpack_can_be_switched_off(app, tasks, monkeypatch):
+    from main import create_app
+    monkeypatch.setenv("MSGPACK_ENABLED", "0")
+    response = create_app().test_client().get(f"/tasks/{tasks[0]}", headers={"Accept": MSGPACK})
+    assert response.status_code == 200
+    assert response.mimetype == "application/json"
+    assert "Accept" not in response.vary
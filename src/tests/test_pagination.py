@@ -0,0 +1,93 @@
+"""Keyset pagination of GET /tasks/: walking every page, page size limits and cursors."""
+import base64
+from datetime import date
+import pytest
+
+
+def _walk(client, limit, first_after=None):
+    """Follow next_cursor from the first page to the last, returning every page's task ids."""
+    pages = []
+    url = f"/tasks/?limit={limit}&fields=id,due_date"
+    if first_after is not None:
+        url += f"&after={first_after}"
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        body = response.get_json()
+        pages.append([task["id"] for task in body["tasks"]])
+        cursor = body["next_cursor"]
+        url = f"/tasks/?limit={limit}&fields=id,due_date&after={cursor}" if cursor else None
+    return pages
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 4, 7, 50])
+@pytest.mark.parametrize("first_after", [None, ""])
+def test_pages_cover_every_task_once_in_order(client, make_tasks, limit, first_after):
+    due_dates = [
+        date(2026, 1, 5), None, date(2026, 1, 3), date(2026, 1, 5), None,
+        date(2026, 1, 3), date(2026, 1, 9), None, date(2026, 1, 5), date(2026, 1, 1),
+    ]
+    ids = make_tasks(due_dates)
+
+    # due_date descending, then id descending, with undated tasks last
+    dated = sorted((task for task in zip(due_dates, ids) if task[0]), reverse=True)
+    undated = sorted((task_id for due_date, task_id in zip(due_dates, ids) if due_date is None), reverse=True)
+    expected = [task_id for _due_date, task_id in dated] + undated
+
+    pages = _walk(client, limit, first_after)
+    assert [task_id for page in pages for task_id in page] == expected
+    assert all(len(page) == limit for page in pages[:-1])
+
+
+def test_empty_after_returns_the_first_page(client, make_tasks):
+    make_tasks([date(2026, 1, 2), None, date(2026, 1, 1)])
+    assert client.get("/tasks/?after=").get_json() == client.get("/tasks/").get_json()
+
+
+def test_limit_is_clamped_to_the_maximum_page_size(app, client, make_tasks):
+    app.config["TASKS_MAX_PAGE_SIZE"] = 3
+    make_tasks([date(2026, 1, day) for day in range(1, 6)])
+
+    body = client.get("/tasks/?limit=1000").get_json()
+    assert len(body["tasks"]) == 3
+    assert body["next_cursor"] is not None
+
+
+@pytest.mark.parametrize("limit", ["0", "-1", "ten"])
+def test_invalid_limit_is_rejected(client, make_tasks, limit):
+    make_tasks([date(2026, 1, 1)])
+    assert client.get(f"/tasks/?limit={limit}").status_code == 400
+
+
+def _tampered(cursor):
+    padded = cursor + "=" * (-len(cursor) % 4)
+    payload = base64.urlsafe_b64decode(padded).replace(b'"2026-01-02"', b'"yesterday"')
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+
+@pytest.mark.parametrize("make_cursor", [
+    lambda cursor: "not a cursor",
+    lambda cursor: cursor[:-3],
+    lambda cursor: base64.urlsafe_b64encode(b'{"due":1}').decode("ascii"),
+    lambda cursor: base64.urlsafe_b64encode(b'["2026-01-02","7"]').decode("ascii"),
+    _tampered,
+])
+def test_malformed_or_tampered_cursor_is_rejected(client, make_tasks, make_cursor):
+    make_tasks([date(2026, 1, 3), date(2026, 1, 2), date(2026, 1, 1)])
+    cursor = client.get("/tasks/?limit=2").get_json()["next_cursor"]
+
+    response = client.get(f"/tasks/?after={make_cursor(cursor)}")
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "Invalid cursor"}
+
+
+def test_last_page_has_no_next_cursor(client, make_tasks):
+    make_tasks([date(2026, 1, 3), None, date(2026, 1, 1), None])
+
+    first = client.get("/tasks/?limit=2").get_json()
+    assert first["next_cursor"] is not None
+    last = client.get(f"/tasks/?limit=2&after={first['next_cursor']}").get_json()
+    assert len(last["tasks"]) == 2
+    assert last["next_cursor"] is None
+
+    assert client.get("/tasks/?limit=5").get_json()["next_cursor"] is None
@@ -0,0 +1,56 @@
+"""Password hashing runs on a bounded pool and sheds work with a 503 once its queue is full."""
+import threading
+import time
+import pytest
+
+
+@pytest.fixture
+def app_env():
+    return {"PASSWORD_POOL_SIZE": "1", "PASSWORD_QUEUE_LIMIT": "1"}
+
+
+@pytest.fixture
+def credentials(client):
+    body = {"name": "Hashed User", "email": "hashed@example.com", "password": "a-long-password"}
+    assert client.post("/auth/register", json=body).status_code == 201
+    return {"email": body["email"], "password": body["password"]}
+
+
+@pytest.fixture
+def occupied():
+    """Hold the pool's only slot with an operation that runs until released."""
+    from utils.passwords import password_hasher
+    release = threading.Event()
+    holder = threading.Thread(target=password_hasher._run, args=(release.wait,))
+    holder.start()
+    while password_hasher.stats()["in_flight"] == 0:
+        time.sleep(0.001)
+    yield release
+    release.set()
+    holder.join()
+
+
+def test_login_is_shed_while_the_pool_is_full(client, credentials, occupied):
+    from utils.passwords import password_hasher
+    rejected = password_hasher.stats()["rejected"]
+    response = client.post("/auth/login", json=credentials)
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert response.get_json() == {"error": "Too many password operations in progress, please retry shortly"}
+    assert password_hasher.stats()["rejected"] == rejected + 1
+
+    occupied.set()
+    while password_hasher.stats()["in_flight"]:
+        time.sleep(0.001)
+    response = client.post("/auth/login", json=credentials)
+    assert response.status_code == 200
+    assert response.get_json()["email"] == "hashed@example.com"
+
+
+def test_registration_is_shed_without_creating_the_user(app, client, occupied):
+    from init import db
+    from models.users import User
+    body = {"name": "Shed User", "email": "shed@example.com", "password": "a-long-password"}
+    assert client.post("/auth/register", json=body).status_code == 503
+    with app.app_context():
+        assert db.session.scalar(db.select(User).filter_by(email="shed@example.com")) is None
@@ -0,0 +1,64 @@
+"""?fields= picks the fields of a response and ?expand= the relationships it includes."""
+from datetime import date, datetime
+import pytest
+
+
+@pytest.fixture
+def task_id(app, user, make_tasks):
+    """A task with one comment."""
+    from init import db
+    from models.comment import Comment
+    (task_id,) = make_tasks([date(2026, 1, 1)])
+    with app.app_context():
+        db.session.add(Comment(content="A comment", timestamp=datetime(2026, 1, 2), user_id=user, task_idfi=task_id))
+        db.session.commit()
+    return task_id
+
+
+def test_fields_picks_top_level_fields_in_schema_order(client, task_id):
+    (task,) = client.get("/tasks/?fields=title,id").get_json()["tasks"]
+    assert list(task) == ["id", "title"]
+
+    task = client.get(f"/tasks/{task_id}?fields=id,comment_count").get_json()
+    assert task == {"id": task_id, "comment_count": 1}
+
+
+def test_a_relationship_in_fields_comes_with_its_plain_fields(client, task_id):
+    task = client.get(f"/tasks/{task_id}?fields=id,user").get_json()
+    assert task == {"id": task_id, "user": {"name": "Test User", "email": "test@example.com"}}
+
+
+def test_expand_adds_relationships_to_every_plain_field(client, task_id):
+    task = client.get(f"/tasks/{task_id}?expand=comments").get_json()
+    assert list(task) == ["id", "title", "description", "due_date", "priority", "comment_count", "comments"]
+    # The comment's own relationships stay out unless expanded too
+    (comment,) = task["comments"]
+    assert list(comment) == ["id", "content", "timestamp"]
+
+    task = client.get(f"/tasks/{task_id}?expand=comments.user").get_json()
+    assert task["comments"][0]["user"] == {"name": "Test User", "email": "test@example.com"}
+
+
+def test_expand_follows_dotted_paths(client, task_id):
+    (category,) = client.get("/categories/?expand=tasks.comments&fields=label").get_json()
+    assert list(category) == ["label", "tasks"]
+    (task,) = category["tasks"]
+    assert task["id"] == task_id
+    assert [comment["content"] for comment in task["comments"]] == ["A comment"]
+    assert "user" not in task
+
+
+def test_without_either_parameter_every_relationship_is_included(client, task_id):
+    task = client.get(f"/tasks/{task_id}").get_json()
+    assert {"user", "comments", "category", "task_tracking"} <= set(task)
+
+
+@pytest.mark.parametrize("query, error", [
+    ("fields=id,colour", "Unknown field 'colour'"),
+    ("expand=owner", "Cannot expand 'owner'"),
+    ("expand=comments.author", "Cannot expand 'author'"),
+])
+def test_unknown_names_are_rejected(client, task_id, query, error):
+    response = client.get(f"/tasks/{task_id}?{query}")
+    assert response.status_code == 400
+    assert response.get_json() == {"error": error}
@@ -0,0 +1,45 @@
+"""Reminder records are removed with their task, which SQLite's ignored ON DELETE CASCADE does not do."""
+from datetime import date
+
+
+def _remind(app, task_ids):
+    from init import db
+    from models.task_reminder import TaskReminder
+    with app.app_context():
+        db.session.add_all(TaskReminder(task_id=task_id, due_date=date(2026, 1, 1)) for task_id in task_ids)
+        db.session.commit()
+
+
+def _reminded(app):
+    from init import db
+    from models.task_reminder import TaskReminder
+    with app.app_context():
+        return set(db.session.scalars(db.select(TaskReminder.task_id)))
+
+
+def test_deleting_a_task_deletes_its_reminders(app, client, auth_header, make_tasks):
+    first, second = make_tasks([date(2026, 1, 1)] * 2)
+    _remind(app, [first, second])
+
+    assert client.delete(f"/tasks/{first}", headers=auth_header).status_code == 200
+    assert _reminded(app) == {second}
+
+
+def test_bulk_deleting_tasks_deletes_their_reminders(app, client, auth_header, make_tasks):
+    first, second, third = make_tasks([date(2026, 1, 1)] * 3)
+    _remind(app, [first, second, third])
+
+    assert client.delete("/tasks/bulk", json=[first, third], headers=auth_header).status_code == 200
+    assert _reminded(app) == {second}
+
+
+def test_deleting_a_category_deletes_its_tasks_reminders(app, client, auth_header, make_tasks):
+    from init import db
+    from models.category import Category
+    (task_id,) = make_tasks([date(2026, 1, 1)])
+    _remind(app, [task_id])
+    with app.app_context():
+        category_id = db.session.scalar(db.select(Category.id))
+
+    assert client.delete(f"/categories/{category_id}", headers=auth_header).status_code == 200
+    assert _reminded(app) == set()
@@ -0,0 +1,84 @@
+"""Read-replica routing with two SQLite files standing in for the primary and a replica.
+
+The replica is never written to, so a task created through the API is found only when
+the read goes to the primary.
+"""
+import time
+import pytest
+from utils import replicas
+
+
+@pytest.fixture
+def app_env(tmp_path):
+    return {
+        "DATABASE_REPLICA_URLS": f"sqlite:///{tmp_path / 'replica.db'}",
+        "READ_YOUR_WRITES_SECONDS": "5",
+    }
+
+
+@pytest.fixture
+def client(app):
+    # API clients holding a Bearer token usually keep no cookies
+    from init import db
+    with app.app_context():
+        db.metadata.create_all(db.engines["replica_0"])
+    return app.test_client(use_cookies=False)
+
+
+@pytest.fixture
+def later(monkeypatch):
+    """Move the replica router's clock past the read-your-writes window."""
+    class Clock:
+        @staticmethod
+        def time():
+            return time.time() + 10
+    return lambda: monkeypatch.setattr(replicas, "time", Clock)
+
+
+def _create_task(client, auth_header):
+    response = client.post("/tasks/", json={"title": "Replica test", "category": {"label": "Work"}}, headers=auth_header)
+    assert response.status_code == 200
+    return response
+
+
+def test_reads_go_to_the_replica_without_a_write(client, make_tasks):
+    (task_id,) = make_tasks([None])
+    assert client.get(f"/tasks/{task_id}").status_code == 404
+
+
+def test_the_writer_reads_from_the_primary_within_the_window(client, auth_header, later):
+    task_id = _create_task(client, auth_header).get_json()["id"]
+
+    assert client.get(f"/tasks/{task_id}", headers=auth_header).status_code == 200
+    # Without the token, nothing ties the request to the write
+    assert client.get(f"/tasks/{task_id}").status_code == 404
+
+    later()
+    assert client.get(f"/tasks/{task_id}", headers=auth_header).status_code == 404
+
+
+def test_the_deadline_header_keeps_reads_on_the_primary(client, auth_header, later):
+    response = _create_task(client, auth_header)
+    task_id = response.get_json()["id"]
+    until = response.headers[replicas.PRIMARY_HEADER]
+
+    assert client.get(f"/tasks/{task_id}", headers={replicas.PRIMARY_HEADER: until}).status_code == 200
+
+    later()
+    assert client.get(f"/tasks/{task_id}", headers={replicas.PRIMARY_HEADER: until}).status_code == 404
+
+
+def test_a_deadline_beyond_the_window_is_ignored(client, make_tasks):
+    # Nothing the app sent, so a client cannot keep every read of theirs on the primary
+    (task_id,) = make_tasks([None])
+    until = f"{time.time() + 3600:.3f}"
+    assert client.get(f"/tasks/{task_id}", headers={replicas.PRIMARY_HEADER: until}).status_code == 404
+    cookie = {"Cookie": f"{replicas.PRIMARY_COOKIE}={until}"}
+    assert client.get(f"/tasks/{task_id}", headers=cookie).status_code == 404
+
+
+def test_the_change_feed_reads_from_the_primary(client, auth_header, make_tasks):
+    # A replica behind the primary would hand out a token past changes it has not applied
+    (task_id,) = make_tasks([None])
+    body = client.get("/tasks/changes", headers=auth_header).get_json()
+    assert [task["id"] for task in body["tasks"]] == [task_id]
@@ -0,0 +1,99 @@
+"""The tracking report groups and ranks overrun ratios in SQL, over the caller's own tasks unless they are an admin."""
+from datetime import datetime
+import pytest
+
+
+@pytest.fixture
+def tracked(app, user):
+    """Tracking records for the test user's tasks and one for another user's task.
+
+    The user's finished records overrun by 0.5, 1.0, 1.5 and 4.0 times their estimate,
+    over two weeks; the fifth is unfinished.
+    """
+    from init import db
+    from models.category import Category
+    from models.task import Task
+    from models.task_tracking import TaskTracking
+    from models.users import User
+    records = [
+        # owner, priority, started, estimated, actual
+        (user, "High", datetime(2026, 1, 5, 9), 2, 1),
+        (user, "High", datetime(2026, 1, 6, 9), 2, 2),
+        (user, "Low", datetime(2026, 1, 14, 9), 2, 3),
+        (user, "Low", datetime(2026, 1, 15, 9), 1, 4),
+        (user, "Low", datetime(2026, 1, 16, 9), 5, None),
+        ("other", "High", datetime(2026, 1, 5, 9), 1, 10),
+    ]
+    with app.app_context():
+        other = User(name="Other User", email="other@example.com", password="not-a-hash")
+        admin = User(name="Admin User", email="admin@example.com", password="not-a-hash", is_admin=True)
+        db.session.add_all([other, admin])
+        db.session.flush()
+        category_id = db.session.scalar(db.select(Category.id))
+        for owner, priority, started, estimated, actual in records:
+            task = Task(
+                title="Tracked", due_date=started.date(), priority=priority, category_id=category_id,
+                user_id=other.id if owner == "other" else owner
+            )
+            task.task_tracking = TaskTracking(estimated_hours=estimated, actual_hours=actual, started_at=started)
+            db.session.add(task)
+        db.session.commit()
+        return {"other": other.id, "admin": admin.id}
+
+
+def _report(app, client, user_id, query=""):
+    from flask_jwt_extended import create_access_token
+    with app.app_context():
+        headers = {"Authorization": f"Bearer {create_access_token(identity=str(user_id))}"}
+    response = client.get(f"/reports/tracking{query}", headers=headers)
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def _figures(group):
+    return {key: group[key] for key in ("tracked", "finished", "overrun_ratio", "overrun_p50", "overrun_p90", "overrun_p95")}
+
+
+def test_report_covers_the_callers_own_tasks(app, client, user, tracked):
+    (mine,) = _report(app, client, user)["groups"]
+    assert mine["estimated_hours"] == 12
+    assert mine["actual_hours"] == 10
+    # Nearest-rank percentiles of 0.5, 1.0, 1.5 and 4.0
+    assert _figures(mine) == {
+        "tracked": 5, "finished": 4, "overrun_ratio": 1.43, "overrun_p50": 1.0, "overrun_p90": 4.0, "overrun_p95": 4.0
+    }
+
+    (theirs,) = _report(app, client, tracked["other"])["groups"]
+    assert _figures(theirs) == {
+        "tracked": 1, "finished": 1, "overrun_ratio": 10.0, "overrun_p50": 10.0, "overrun_p90": 10.0, "overrun_p95": 10.0
+    }
+
+
+def test_admins_see_every_user(app, client, user, tracked):
+    report = _report(app, client, tracked["admin"], "?group_by=user")
+    assert report["group_by"] == ["user"]
+    assert [(group["user"], group["tracked"]) for group in report["groups"]] == [("Test User", 5), ("Other User", 1)]
+
+
+def test_report_groups_by_priority_and_week(app, client, user, tracked):
+    report = _report(app, client, user, "?group_by=week,priority")
+    assert report["group_by"] == ["priority", "week"]
+    groups = [(group["priority"], group["week"], _figures(group)) for group in report["groups"]]
+    assert groups == [
+        ("High", "2026-01-05", {
+            "tracked": 2, "finished": 2, "overrun_ratio": 0.75, "overrun_p50": 0.5, "overrun_p90": 1.0, "overrun_p95": 1.0
+        }),
+        ("Low", "2026-01-12", {
+            "tracked": 3, "finished": 2, "overrun_ratio": 2.33, "overrun_p50": 1.5, "overrun_p90": 4.0, "overrun_p95": 4.0
+        }),
+    ]
+
+
+def test_report_filters_by_date(app, client, user, tracked):
+    (group,) = _report(app, client, user, "?from=2026-01-14&to=2026-01-15")["groups"]
+    assert (group["tracked"], group["finished"]) == (2, 2)
+
+
+def test_report_rejects_unknown_dimensions(app, client, auth_header):
+    response = client.get("/reports/tracking?group_by=colour", headers=auth_header)
+    assert response.status_code == 400
@@ -0,0 +1,40 @@
+"""Full-text search ranks a bounded number of the newest candidates, fixed for every page of a search."""
+
+
+def _search(client, query):
+    body = client.get(f"/tasks/search?{query}").get_json()
+    return [task["id"] for task in body["tasks"]], body["next_cursor"], body["truncated"]
+
+
+def test_search_ranks_only_the_newest_candidates(app, client, make_tasks):
+    ids = make_tasks([None] * 3)
+
+    app.config["SEARCH_MAX_CANDIDATES"] = 2
+    found, _, truncated = _search(client, "q=task&fields=id")
+    assert sorted(found) == ids[1:]
+    assert truncated is True
+
+    app.config["SEARCH_MAX_CANDIDATES"] = 0
+    found, _, truncated = _search(client, "q=task&fields=id")
+    assert sorted(found) == ids
+    assert truncated is False
+
+
+def test_search_pages_keep_the_candidates_of_the_first_page(app, client, make_tasks):
+    ids = make_tasks([None] * 4)
+    app.config["SEARCH_MAX_CANDIDATES"] = 2
+
+    first, cursor, truncated = _search(client, "q=task&fields=id&limit=1")
+    assert truncated is True
+
+    # A newer match would move the window of the newest candidates if it were not pinned
+    (added,) = make_tasks([None])
+    rest, cursor, truncated = _search(client, f"q=task&fields=id&limit=1&after={cursor}")
+    assert cursor is None
+    assert truncated is True
+    assert sorted(first + rest) == ids[2:]
+    assert added not in first + rest
+
+    # A new search starts a new window
+    found, _, _ = _search(client, "q=task&fields=id")
+    assert sorted(found) == [ids[3], added]
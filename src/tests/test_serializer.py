@@ -0,0 +1,78 @@
+"""The compiled serializer dumps exactly what marshmallow does, key order included."""
+import json
+from datetime import date, datetime
+import pytest
+from models.category import CategorySchema, categories_schema, category_schema
+from models.comment import CommentSchema, comment_schema, comments_schema
+from models.task import TaskSchema, task_schema, tasks_schema
+from models.task_tracking import task_tracking_schema, task_trackings_schema
+from models.users import user_schema, users_schema
+from utils.serializer import compile_schema
+
+# Each schema with the kind of object it dumps
+SCHEMAS = {
+    "task": (task_schema, "tasks"),
+    "tasks": (tasks_schema, "tasks"),
+    "task projected": (TaskSchema(only=("id", "title", "user", "category")), "tasks"),
+    "category": (category_schema, "categories"),
+    "categories": (categories_schema, "categories"),
+    "category without tasks": (CategorySchema(exclude=("tasks",)), "categories"),
+    "comment": (comment_schema, "comments"),
+    "comments": (comments_schema, "comments"),
+    "comments without task": (CommentSchema(many=True, exclude=("task",)), "comments"),
+    "task_tracking": (task_tracking_schema, "trackings"),
+    "task_trackings": (task_trackings_schema, "trackings"),
+    "user": (user_schema, "users"),
+    "users": (users_schema, "users"),
+}
+
+
+@pytest.fixture
+def graph(app, user):
+    """A task with every field and relationship set, and one with nulls and no children."""
+    from init import db
+    from models.category import Category
+    from models.comment import Comment
+    from models.task import Task
+    from models.task_tracking import TaskTracking
+    from models.users import User
+    with app.app_context():
+        owner = db.session.get(User, user)
+        full = Task(
+            title="Full", description="Every field", due_date=date(2026, 1, 1), priority="High",
+            category_id=db.session.scalar(db.select(Category.id)), user=owner
+        )
+        full.comments = [
+            Comment(content="First", timestamp=datetime(2026, 1, 2, 3, 4, 5), user=owner),
+            Comment(content="Second", timestamp=datetime(2026, 1, 3), user=owner),
+        ]
+        full.task_tracking = TaskTracking(
+            estimated_hours=2.5, actual_hours=None, started_at=datetime(2026, 1, 2, 9, 30), finished_at=None
+        )
+        empty = Task(title="Empty", description=None, due_date=None, priority=None, category_id=full.category_id, user=owner)
+        db.session.add_all([full, empty])
+        db.session.commit()
+        yield {
+            "tasks": [full, empty], "categories": [full.category], "comments": full.comments,
+            "trackings": [full.task_tracking], "users": [owner]
+        }
+
+
+@pytest.mark.parametrize("name", SCHEMAS)
+def test_compiled_dump_matches_marshmallow(graph, name):
+    schema, kind = SCHEMAS[name]
+    objects = graph[kind]
+    # compile_schema rather than fast_dump, which would quietly fall back to schema.dump
+    dump = compile_schema(schema)
+    for obj in [objects] if schema.many else objects:
+        expected = schema.dump(obj)
+        assert json.dumps(dump(obj)) == json.dumps(expected)
+
+
+def test_schemas_that_differ_below_the_top_level_are_compiled_separately(graph):
+    from utils.serializer import fast_dump
+    task = graph["tasks"][0]
+    ids = TaskSchema(only=("id", "comments.id"))
+    with_user = TaskSchema(only=("id", "comments.id", "comments.user"))
+    assert fast_dump(ids, task)["comments"][0] == {"id": task.comments[0].id}
+    assert fast_dump(with_user, task)["comments"][0] == {"id": task.comments[0].id, "user": {"name": "Test User", "email": "test@example.com"}}
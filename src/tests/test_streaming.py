@@ -0,0 +1,51 @@
+"""?stream=true sends every row as one chunked JSON array, a few rows at a time."""
+import json
+from datetime import date
+import msgpack
+import pytest
+
+
+@pytest.fixture
+def app_env():
+    return {"STREAM_CHUNK_SIZE": "2"}
+
+
+def _stream(client, url, **kwargs):
+    response = client.get(url, **kwargs)
+    assert response.status_code == 200
+    assert response.is_streamed
+    return response
+
+
+def test_streamed_tasks_parse_as_one_json_array(client, make_tasks):
+    # Five rows in chunks of two: the separators between chunks must still make one array
+    ids = make_tasks([date(2026, 1, day) for day in range(1, 5)] + [None])
+    response = _stream(client, "/tasks/?stream=true&fields=id,due_date")
+    assert response.mimetype == "application/json"
+    body = json.loads(response.get_data())
+    # Due date descending, undated tasks last, as in the paged list
+    assert [task["id"] for task in body] == [ids[3], ids[2], ids[1], ids[0], ids[4]]
+    assert body[0] == {"id": ids[3], "due_date": "2026-01-04"}
+
+
+@pytest.mark.parametrize("count", [0, 1, 2])
+def test_short_streams_are_valid_json(client, make_tasks, count):
+    ids = make_tasks([None] * count)
+    body = json.loads(_stream(client, "/tasks/?stream=true&fields=id").get_data())
+    assert sorted(task["id"] for task in body) == ids
+
+
+def test_streamed_categories_include_their_tasks(client, make_tasks):
+    ids = make_tasks([None, None, None])
+    (category,) = json.loads(_stream(client, "/categories/?stream=true&expand=tasks").get_data())
+    assert category["label"] == "Work"
+    assert sorted(task["id"] for task in category["tasks"]) == ids
+
+
+def test_msgpack_streams_one_map_per_row(client, make_tasks):
+    ids = make_tasks([None] * 3)
+    response = _stream(client, "/tasks/?stream=true&fields=id", headers={"Accept": "application/msgpack"})
+    assert response.mimetype == "application/msgpack"
+    unpacker = msgpack.Unpacker()
+    unpacker.feed(response.get_data())
+    assert sorted(task["id"] for task in unpacker) == ids
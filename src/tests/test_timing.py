@@ -0,0 +1,41 @@
+"""Server-Timing: only apps with SERVER_TIMING time their requests, and failed statements leave nothing behind."""
+import pytest
+
+
+@pytest.fixture
+def app_env():
+    return {"SERVER_TIMING": "1"}
+
+
+def test_responses_carry_the_timing_breakdown(client, make_tasks):
+    make_tasks([None])
+    header = client.get("/tasks/").headers["Server-Timing"]
+    names = [metric.split(";")[0] for metric in header.split(", ")]
+    assert names == ["db", "db-count", "serialize", "json", "auth", "total"]
+    assert 'db-count;desc="0"' not in header
+
+
+def test_an_app_without_server_timing_is_not_timed(app, monkeypatch):
+    from main import create_app
+    monkeypatch.setenv("SERVER_TIMING", "0")
+    untimed = create_app()
+    # Creating a timed app first must not switch timing on for this one
+    response = untimed.test_client().get("/ready")
+    assert response.status_code == 200
+    assert "Server-Timing" not in response.headers
+    with untimed.test_request_context():
+        from utils.timing import span, _null_span
+        assert span("db") is _null_span
+
+
+def test_a_failed_statement_does_not_leave_its_start_time(app):
+    from sqlalchemy.exc import OperationalError
+    from init import db
+    with app.test_request_context():
+        app.preprocess_request()
+        with db.engine.connect() as connection:
+            with pytest.raises(OperationalError):
+                connection.exec_driver_sql("SELECT * FROM no_such_table")
+            assert connection.info.get("query_started") == []
+            connection.exec_driver_sql("SELECT 1")
+            assert connection.info.get("query_started") == []
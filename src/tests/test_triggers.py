@@ -0,0 +1,45 @@
+"""db.create_all installs the search index, counter and change triggers however the app was loaded."""
+import os
+import subprocess
+import sys
+import pytest
+
+# A fresh interpreter, so no controller imported by another test registers anything
+LAZY_CREATE_ALL = """
+from main import create_app
+from init import db
+from models import category, change, comment, task, task_reminder, task_tracking, users
+
+app = create_app()
+with app.app_context():
+    db.create_all()
+    print("\\n".join(sorted(db.session.execute(db.text("SELECT name FROM sqlite_master WHERE type = 'trigger'")).scalars())))
+"""
+
+
+def _triggers(app):
+    from init import db
+    with app.app_context():
+        return set(db.session.execute(db.text("SELECT name FROM sqlite_master WHERE type = 'trigger'")).scalars())
+
+
+def test_create_all_installs_the_triggers_without_the_cli(app, tmp_path):
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{tmp_path / 'lazy.db'}", "STARTUP_LAZY": "1"}
+    src = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [sys.executable, "-c", LAZY_CREATE_ALL], cwd=src, env=env, capture_output=True, text=True, check=True
+    )
+    lazy = set(result.stdout.split())
+
+    assert any(name.startswith("comment_count") for name in lazy)
+    assert any(name.startswith("task_search") for name in lazy)
+    assert lazy == _triggers(app)
+
+
+@pytest.mark.parametrize("setting", ["DATABASE_URL", "DATABASE_REPLICA_URLS"])
+def test_unsupported_databases_are_rejected_at_startup(monkeypatch, setting):
+    from main import create_app
+    monkeypatch.setenv("DATABASE_URL", "sqlite://")
+    monkeypatch.setenv(setting, "mysql://user@localhost/tasks")
+    with pytest.raises(ValueError, match=f"{setting} must be a SQLite or PostgreSQL database, not mysql"):
+        create_app()
@@ -0,0 +1,157 @@
+import asyncio
+import io
+import sys
+from sqlalchemy import make_url
+from sqlalchemy.util.concurrency import await_only, greenlet_spawn, in_greenlet
+
+# asyncio drivers replacing the blocking ones when the app is served by create_async_app
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+
+def async_url(url):
+    """Return url with its blocking driver swapped for the asyncio driver of the same database."""
+    url = make_url(url)
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None or url.get_dialect().is_async:
+        return url.render_as_string(hide_password=False)
+    return url.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def async_engine(options):
+    """Create the engine described by Flask-SQLAlchemy's options on an asyncio driver.
+
+    Returns the async engine's sync_engine, the one AsyncSession drives: the ORM API stays
+    the same, and each statement awaits the driver. That only works inside greenlet_spawn,
+    as every request served by GreenletASGI is.
+    """
+    # Imported here so that the sync app, which never calls this, doesn't load it
+    from sqlalchemy.ext.asyncio import create_async_engine
+    options = dict(options)
+    return create_async_engine(options.pop("url"), **options).sync_engine
+
+
+def wait(future):
+    """Return the result of a concurrent.futures future.
+
+    Inside a request served by GreenletASGI the event loop keeps serving other requests
+    while it waits; elsewhere the thread blocks as usual.
+    """
+    if in_greenlet():
+        return await_only(asyncio.wrap_future(future))
+    return future.result()
+
+
+class GreenletASGI:
+    """ASGI application serving a Flask app's requests concurrently on one event loop.
+
+    Each request runs the unchanged WSGI app, from routing to the last chunk of a streamed
+    body, in its own greenlet. Whenever the code waits for the database (or for wait())
+    the greenlet switches back to the event loop, which runs other requests meanwhile, so
+    a single thread serves as many requests at once as the connection pool allows.
+    Responses are the ones the WSGI app produces, byte for byte.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            body = bytearray()
+            while True:
+                message = await receive()
+                body += message.get("body", b"")
+                if not message.get("more_body"):
+                    break
+            await greenlet_spawn(self._respond, _environ(scope, bytes(body)), send)
+        else:
+            raise NotImplementedError(f"Unsupported ASGI scope type {scope['type']}")
+
+    async def _lifespan(self, receive, send):
+        warming = None
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                if self.app.config.get("STARTUP_PREWARM"):
+                    # Warm up while serving, as the WSGI app's thread does; GET /ready answers 503 until then
+                    warming = asyncio.ensure_future(greenlet_spawn(self.app.extensions["startup"].warm))
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                if warming is not None and not warming.done():
+                    warming.cancel()
+                with self.app.app_context():
+                    from init import db
+                    for engine in db.engines.values():
+                        await greenlet_spawn(engine.dispose)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    def _respond(self, environ, send):
+        started = {}
+
+        def start_response(status, headers, exc_info=None):
+            started["status"] = int(status.split(" ", 1)[0])
+            started["headers"] = [
+                (name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers
+            ]
+
+        chunks = self.app(environ, start_response)
+        try:
+            # Hold each chunk back until the next one arrives, so the last is sent as the end of the body
+            previous = None
+            for chunk in chunks:
+                if not chunk:
+                    continue
+                if previous is None:
+                    await_only(send({"type": "http.response.start", **started}))
+                else:
+                    await_only(send({"type": "http.response.body", "body": previous, "more_body": True}))
+                previous = chunk
+            if previous is None:
+                await_only(send({"type": "http.response.start", **started}))
+            await_only(send({"type": "http.response.body", "body": previous or b""}))
+        finally:
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                close()
+
+
+def _environ(scope, body):
+    """Build the WSGI environ of an ASGI HTTP request."""
+    script_name = scope.get("root_path", "")
+    path = scope["path"]
+    if script_name and path.startswith(script_name):
+        path = path[len(script_name):]
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": script_name.encode("utf-8").decode("latin-1"),
+        "PATH_INFO": path.encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope["query_string"].decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope['http_version']}",
+        "REMOTE_ADDR": client[0],
+        "REMOTE_PORT": str(client[1]),
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    for name, value in scope["headers"]:
+        name = name.decode("latin-1").upper().replace("-", "_")
+        value = value.decode("latin-1")
+        if name == "CONTENT_LENGTH":
+            continue
+        if name != "CONTENT_TYPE":
+            name = "HTTP_" + name
+        if name in environ:
+            value = environ[name] + ("; " if name == "HTTP_COOKIE" else ",") + value
+        environ[name] = value
+    return environ
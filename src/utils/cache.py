@@ -0,0 +1,296 @@
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, g, has_request_context, make_response, request
+from sqlalchemy import event, inspect
+from init import db
+from utils import compression, negotiation
+
+
+class CacheBackend:
+    """Interface for a store of serialized responses.
+
+    Entries carry tags naming the rows they were built from, as (table, primary key)
+    pairs. Invalidating a tag removes every entry built from that row. A shared backend
+    (Redis, memcached) implements the same methods so all workers see one cache.
+    """
+
+    def get(self, key):
+        """Return the cached value for key, or None."""
+        raise NotImplementedError
+
+    def set(self, key, value, tags=(), generation=None):
+        """Store value under key. Skipped if an invalidation happened after generation was read."""
+        raise NotImplementedError
+
+    def invalidate(self, tags):
+        """Remove every entry tagged with any of tags."""
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    @property
+    def generation(self):
+        """A counter that moves on every invalidation, read before building a value."""
+        raise NotImplementedError
+
+    def stats(self):
+        """Return a dict of counters such as hits, misses and evictions."""
+        raise NotImplementedError
+
+
+class LRUCache(CacheBackend):
+    """Bounded in-process cache with least-recently-used eviction and a time to live.
+
+    Args:
+        max_entries (int): Maximum number of entries kept.
+        max_bytes (int): Maximum total size of the cached values, measured with len().
+        ttl (float): Seconds an entry stays valid, or None to keep entries until evicted.
+    """
+
+    def __init__(self, max_entries=1024, max_bytes=64 * 1024 * 1024, ttl=300):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._tags = {}
+        self._bytes = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+
+    def _remove(self, key):
+        value, _expires, tags = self._entries.pop(key)
+        self._bytes -= len(value)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+            if entry[1] is not None and entry[1] < time.monotonic():
+                self._remove(key)
+                self._counters["expirations"] += 1
+                self._counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counters["hits"] += 1
+            return entry[0]
+
+    def set(self, key, value, tags=(), generation=None):
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+
+            expires = time.monotonic() + self.ttl if self.ttl else None
+            tags = frozenset(tags)
+            self._entries[key] = (value, expires, tags)
+            self._bytes += len(value)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._counters["evictions"] += 1
+
+    def invalidate(self, tags):
+        with self._lock:
+            self._generation += 1
+            for tag in tags:
+                for key in list(self._tags.get(tag, ())):
+                    self._remove(key)
+                    self._counters["invalidations"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._tags.clear()
+            self._bytes = 0
+
+    @property
+    def generation(self):
+        return self._generation
+
+    def stats(self):
+        with self._lock:
+            return {**self._counters, "entries": len(self._entries), "bytes": self._bytes}
+
+
+def _identity_tag(mapper, identity):
+    return (mapper.local_table.name, identity)
+
+
+def _write_tags(obj):
+    """Tags touched by writing obj: the row itself and every row it references.
+
+    A new or deleted comment is not part of any cached task document yet (or any more),
+    so the task it points at has to be invalidated through the foreign key.
+    """
+    state = inspect(obj)
+    mapper = state.mapper
+    tags = set()
+    identity = tuple(mapper.primary_key_from_instance(obj))
+    if all(value is not None for value in identity):
+        tags.add(_identity_tag(mapper, identity))
+
+    for rel in mapper.relationships:
+        if rel.direction.name != "MANYTOONE":
+            continue
+        identity = tuple(getattr(obj, column.key, None) for column in rel.local_columns)
+        if all(value is not None for value in identity):
+            tags.add(_identity_tag(rel.mapper, identity))
+        elif rel.key not in state.unloaded:
+            # Pending rows attached through the relationship get their foreign key at flush
+            related = state.attrs[rel.key].loaded_value
+            related_state = inspect(related, raiseerr=False)
+            if related_state is not None and related_state.identity is not None:
+                tags.add(_identity_tag(related_state.mapper, related_state.identity))
+    return tags
+
+
+class ResponseCache:
+    """Caches the serialized JSON of single task and category documents.
+
+    Cache keys combine the request path and query string with the resource version
+    computed by the conditional GET validator. The version covers the updated_at columns
+    of the task or category, its category and tasks and the users they embed (see
+    utils.validators), so a change another worker makes through the app moves the key.
+    A write that leaves updated_at alone, such as hand-written SQL, is only picked up
+    here when this worker writes the same rows or the entry's TTL expires. Entries are
+    tagged with every row loaded while the document was built, and SQLAlchemy
+    flush/commit events invalidate those tags when the rows are written, which also
+    frees the memory straight away.
+    """
+
+    def __init__(self):
+        self.backend = None
+
+    def init_app(self, app, backend=None):
+        """Set up the backend from the RESPONSE_CACHE_* settings and register the session events.
+
+        Args:
+            app: The Flask application.
+            backend (CacheBackend): A shared backend to use instead of the in-process LRU.
+        """
+        self.backend = backend or LRUCache(
+            max_entries=app.config["RESPONSE_CACHE_MAX_ENTRIES"],
+            max_bytes=app.config["RESPONSE_CACHE_MAX_BYTES"],
+            ttl=app.config["RESPONSE_CACHE_TTL"]
+        )
+        app.extensions["response_cache"] = self
+
+        if not event.contains(db.session, "after_flush", _collect_written):
+            event.listen(db.session, "after_flush", _collect_written)
+            event.listen(db.session, "after_commit", _invalidate_written)
+            event.listen(db.session, "after_soft_rollback", _discard_written)
+            event.listen(db.session, "loaded_as_persistent", _record_loaded)
+
+    def invalidate(self, tags):
+        """Invalidate tags directly, for writes made with Core statements that skip the ORM events."""
+        if self.backend is not None:
+            self.backend.invalidate(tags)
+
+    def stats(self):
+        return self.backend.stats() if self.backend is not None else {}
+
+
+response_cache = ResponseCache()
+
+
+def _collect_written(session, flush_context):
+    pending = session.info.setdefault("cache_tags", set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        pending |= _write_tags(obj)
+
+
+def _invalidate_written(session):
+    tags = session.info.pop("cache_tags", None)
+    if tags:
+        response_cache.invalidate(tags)
+
+
+def _discard_written(session, previous_transaction):
+    if not session.in_transaction():
+        session.info.pop("cache_tags", None)
+
+
+def _record_loaded(session, instance):
+    if has_request_context() and "cache_loaded" in g:
+        state = inspect(instance)
+        g.cache_loaded.add(_identity_tag(state.mapper, state.identity))
+
+
+def cached(view):
+    """Serve a GET view's 200 responses from the response cache.
+
+    Place it below @conditional so the key can include the resource version; it also
+    includes the negotiated format, JSON or MessagePack. The response carries an X-Cache header saying whether it was a HIT or a MISS.
+
+    The body compressed with the encoding the client accepts (see utils.compression)
+    is cached next to it under (*key, encoding), so a hit is served without compressing
+    again. Variants compressed on a hit have no tags: their key holds the resource
+    version, so they can never be served for a changed document and simply age out.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        backend = response_cache.backend
+        if backend is None or not current_app.config["RESPONSE_CACHE_ENABLED"]:
+            return view(*args, **kwargs)
+
+        key = (request.full_path, g.get("resource_version"), negotiation.response_mimetype())
+        encoding = compression.negotiate()
+        if encoding is not None:
+            body = backend.get((*key, encoding))
+            if body is not None:
+                return _cached_response(body, "HIT", encoding)
+
+        generation = backend.generation
+        body = backend.get(key)
+        if body is not None:
+            return _cached_variant(backend, key, body, encoding, (), generation, "HIT")
+
+        g.cache_loaded = set()
+        response = make_response(view(*args, **kwargs))
+        tags = g.pop("cache_loaded")
+        if response.status_code == 200 and not response.is_streamed:
+            body = response.get_data()
+            backend.set(key, body, tags, generation)
+            if encoding is not None:
+                return _cached_variant(backend, key, body, encoding, tags, generation, "MISS", response)
+        response.headers["X-Cache"] = "MISS"
+        return response
+    return wrapper
+
+
+def _cached_response(body, status, encoding=None, response=None):
+    if response is None:
+        response = current_app.response_class(body, mimetype=negotiation.response_mimetype())
+    else:
+        response.set_data(body)
+    if encoding is not None:
+        response.headers["Content-Encoding"] = encoding
+    response.headers["X-Cache"] = status
+    return response
+
+
+def _cached_variant(backend, key, body, encoding, tags, generation, status, response=None):
+    """Respond with body compressed with encoding, caching the result, or with body itself when too small to compress."""
+    data = compression.compress(body, encoding) if encoding is not None else None
+    if data is None:
+        return _cached_response(body, status, response=response)
+    backend.set((*key, encoding), data, tags, generation)
+    return _cached_response(data, status, encoding, response)
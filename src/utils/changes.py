@@ -0,0 +1,220 @@
+from init import db
+from models.change import Change
+from utils.pagination import decode_change_token, encode_change_token
+
+# Tables whose writes are recorded for GET /tasks/changes
+TRACKED_TABLES = ("tasks", "comments", "task_trackings")
+
+# The user whose task a record belongs to, written with each change so the feed can be
+# read per owner; tombstones keep it after the record is gone
+_OWNERS = {
+    "tasks": "{record}.user_id",
+    "comments": "(SELECT user_id FROM tasks WHERE id = {record}.task_idfi)",
+    "task_trackings": "(SELECT user_id FROM tasks WHERE id = {record}.task_id)",
+}
+
+# SQLite runs one write transaction at a time, so numbering changes from the table's
+# highest seq gives them in commit order and a reader never sees a later change without
+# the earlier ones. INSERT OR REPLACE moves the record's row to its new position.
+_SQLITE_RECORD = """INSERT OR REPLACE INTO changes (table_name, row_id, transaction_id, seq, deleted{owner_column})
+            VALUES ('{table}', {record}.id, 0, (SELECT coalesce(max(seq), 0) + 1 FROM changes), {deleted}{owner});"""
+
+
+def _sqlite_record(table, record, deleted, owners):
+    if not owners:
+        return _SQLITE_RECORD.format(table=table, record=record, deleted=deleted, owner_column="", owner="")
+    owner = ", " + _OWNERS[table].format(record=record)
+    return _SQLITE_RECORD.format(table=table, record=record, deleted=deleted, owner_column=", user_id", owner=owner)
+
+
+def _sqlite_ddl(owners):
+    return tuple(
+        statement
+        for table in TRACKED_TABLES
+        for statement in (
+            f"""CREATE TRIGGER IF NOT EXISTS {table}_change_insert AFTER INSERT ON {table} BEGIN
+            {_sqlite_record(table, "NEW", 0, owners)}
+        END""",
+            f"""CREATE TRIGGER IF NOT EXISTS {table}_change_update AFTER UPDATE ON {table} BEGIN
+            {_sqlite_record(table, "NEW", 0, owners)}
+        END""",
+            f"""CREATE TRIGGER IF NOT EXISTS {table}_change_delete AFTER DELETE ON {table} BEGIN
+            {_sqlite_record(table, "OLD", 1, owners)}
+        END""",
+        )
+    )
+
+
+SQLITE_DROP = tuple(
+    f"DROP TRIGGER IF EXISTS {table}_change_{operation}"
+    for table in TRACKED_TABLES
+    for operation in ("insert", "update", "delete")
+)
+
+# Concurrent PostgreSQL transactions commit in any order, so the seq of a change alone
+# could be passed by a reader before an earlier number commits. Each row also records
+# its transaction, and the feed only returns the changes of transactions older than the
+# oldest one still running (see read_changes).
+_POSTGRESQL_FUNCTION = """CREATE OR REPLACE FUNCTION record_change() RETURNS trigger LANGUAGE plpgsql AS $$
+    DECLARE
+        changed_id integer;
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            changed_id := OLD.id;
+        ELSE
+            changed_id := NEW.id;
+        END IF;
+        INSERT INTO changes (table_name, row_id, transaction_id, seq, deleted)
+        VALUES (TG_TABLE_NAME, changed_id, txid_current(), nextval('changes_seq'), TG_OP = 'DELETE')
+        ON CONFLICT (table_name, row_id) DO UPDATE SET
+            transaction_id = EXCLUDED.transaction_id, seq = EXCLUDED.seq, deleted = EXCLUDED.deleted;
+        RETURN NULL;
+    END $$"""
+
+# The same function, also recording the owner; a record's fields are looked up by name
+# when the statement runs, so each table only reads the columns it has
+_POSTGRESQL_OWNER_FUNCTION = """CREATE OR REPLACE FUNCTION record_change() RETURNS trigger LANGUAGE plpgsql AS $$
+    DECLARE
+        changed record;
+        owner_id integer;
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            changed := OLD;
+        ELSE
+            changed := NEW;
+        END IF;
+        IF TG_TABLE_NAME = 'tasks' THEN
+            owner_id := changed.user_id;
+        ELSIF TG_TABLE_NAME = 'comments' THEN
+            SELECT user_id INTO owner_id FROM tasks WHERE id = changed.task_idfi;
+        ELSE
+            SELECT user_id INTO owner_id FROM tasks WHERE id = changed.task_id;
+        END IF;
+        INSERT INTO changes (table_name, row_id, transaction_id, seq, deleted, user_id)
+        VALUES (TG_TABLE_NAME, changed.id, txid_current(), nextval('changes_seq'), TG_OP = 'DELETE', owner_id)
+        ON CONFLICT (table_name, row_id) DO UPDATE SET
+            transaction_id = EXCLUDED.transaction_id, seq = EXCLUDED.seq, deleted = EXCLUDED.deleted,
+            user_id = EXCLUDED.user_id;
+        RETURN NULL;
+    END $$"""
+
+
+def _postgresql_ddl(owners):
+    return (
+        _POSTGRESQL_OWNER_FUNCTION if owners else _POSTGRESQL_FUNCTION,
+        *(
+            statement
+            for table in TRACKED_TABLES
+            for statement in (
+                f"DROP TRIGGER IF EXISTS {table}_change ON {table}",
+                f"""CREATE TRIGGER {table}_change AFTER INSERT OR UPDATE OR DELETE ON {table}
+                FOR EACH ROW EXECUTE FUNCTION record_change()""",
+            )
+        ),
+    )
+
+
+POSTGRESQL_DROP = (
+    "DROP FUNCTION IF EXISTS record_change() CASCADE",
+)
+
+
+def _statements(connection, sqlite, postgresql):
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        return sqlite
+    if dialect == "postgresql":
+        return postgresql
+    raise NotImplementedError(f"Change tracking is not supported on {dialect}")
+
+
+def install(connection, owners=True):
+    """Create the triggers that record every write to tasks, comments and tracking records.
+
+    Like the counter triggers, they see the ORM, the bulk endpoints' Core statements and
+    the synthetic data generator alike, and write to the changes table in the same
+    transaction, so a change is visible in the feed exactly when it is committed.
+
+    Args:
+        connection: The connection to create the triggers on.
+        owners (bool): Record the owner of each change's task in changes.user_id. False
+            installs the triggers of 0008_task_changes, from before that column existed.
+    """
+    for statement in _statements(connection, _sqlite_ddl(owners), _postgresql_ddl(owners)):
+        connection.exec_driver_sql(statement)
+
+
+def uninstall(connection):
+    """Drop the change triggers."""
+    for statement in _statements(connection, SQLITE_DROP, POSTGRESQL_DROP):
+        connection.exec_driver_sql(statement)
+
+
+def assign_owners(connection):
+    """Fill in changes.user_id for the changes recorded before it existed.
+
+    Tombstones of records deleted before then have no owner left to find; they stay
+    NULL and only admins see them.
+    """
+    owners = {
+        "tasks": "SELECT user_id FROM tasks WHERE tasks.id = changes.row_id",
+        "comments": "SELECT tasks.user_id FROM comments JOIN tasks ON tasks.id = comments.task_idfi WHERE comments.id = changes.row_id",
+        "task_trackings": "SELECT tasks.user_id FROM task_trackings JOIN tasks ON tasks.id = task_trackings.task_id WHERE task_trackings.id = changes.row_id",
+    }
+    for table, owner in owners.items():
+        connection.exec_driver_sql(f"UPDATE changes SET user_id = ({owner}) WHERE table_name = '{table}'")
+
+
+def backfill(connection):
+    """Record every existing task, comment and tracking record as changed.
+
+    Used when the changes table is added to a database that already has records, so a
+    client syncing from the start of the feed receives them.
+    """
+    postgresql = connection.dialect.name == "postgresql"
+    for table in TRACKED_TABLES:
+        if postgresql:
+            connection.exec_driver_sql(
+                f"INSERT INTO changes (table_name, row_id, transaction_id, seq, deleted) "
+                f"SELECT '{table}', id, txid_current(), nextval('changes_seq'), false FROM {table} ORDER BY id"
+            )
+        else:
+            offset = connection.execute(db.select(db.func.coalesce(db.func.max(Change.seq), 0))).scalar()
+            connection.exec_driver_sql(
+                f"INSERT INTO changes (table_name, row_id, transaction_id, seq, deleted) "
+                f"SELECT '{table}', id, 0, id + {int(offset)}, 0 FROM {table}"
+            )
+
+
+def read_changes(since, limit, user_id=None):
+    """Read the changes made after a position in the feed, oldest first.
+
+    Args:
+        since (str): Token returned as next_token by the previous read; None to read from the start.
+        limit (int): Maximum number of changes to return.
+        user_id (int): Only read the changes of this user's tasks and their comments and
+            tracking records; None reads every change.
+
+    Returns:
+        tuple: The Change rows, the token of the position after the last of them (the
+        same position when there are none) and whether more changes follow.
+
+    Raises:
+        PaginationError: If the token is malformed.
+    """
+    position = decode_change_token(since) if since else (0, 0)
+    stmt = db.select(Change).where(db.tuple_(Change.transaction_id, Change.seq) > position)
+    if user_id is not None:
+        stmt = stmt.where(Change.user_id == user_id)
+    if db.session.get_bind().dialect.name == "postgresql":
+        # Every transaction before the snapshot's xmin has ended, so no change can still
+        # commit behind a position handed out from this range
+        stmt = stmt.where(Change.transaction_id < db.func.txid_snapshot_xmin(db.func.txid_current_snapshot()))
+    stmt = stmt.order_by(Change.transaction_id, Change.seq).limit(limit + 1)
+
+    rows = db.session.scalars(stmt).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if rows:
+        position = (rows[-1].transaction_id, rows[-1].seq)
+    return rows, encode_change_token(*position), has_more
@@ -0,0 +1,143 @@
+import zlib
+from flask import current_app, g, request
+
+try:
+    import zstandard
+except ImportError:  # zstd is offered only when zstandard is installed
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:  # br is offered only when brotli is installed
+    brotli = None
+
+# Media types worth compressing; images and archives are compressed already
+COMPRESSIBLE_MIMETYPES = {"application/json", "application/msgpack", "text/plain", "text/html", "text/csv"}
+
+
+class _Gzip:
+    name = "gzip"
+    config = "COMPRESSION_GZIP_LEVEL"
+
+    @staticmethod
+    def compress(data, level):
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        return compressor.compress(data) + compressor.flush()
+
+    @staticmethod
+    def stream(chunks, level):
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        for chunk in chunks:
+            yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield compressor.flush()
+
+
+class _Zstd:
+    name = "zstd"
+    config = "COMPRESSION_ZSTD_LEVEL"
+
+    @staticmethod
+    def compress(data, level):
+        return zstandard.ZstdCompressor(level=level).compress(data)
+
+    @staticmethod
+    def stream(chunks, level):
+        compressor = zstandard.ZstdCompressor(level=level).compressobj()
+        for chunk in chunks:
+            yield compressor.compress(chunk) + compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        yield compressor.flush()
+
+
+class _Brotli:
+    name = "br"
+    config = "COMPRESSION_BROTLI_LEVEL"
+
+    @staticmethod
+    def compress(data, level):
+        return brotli.compress(data, quality=level)
+
+    @staticmethod
+    def stream(chunks, level):
+        compressor = brotli.Compressor(quality=level)
+        for chunk in chunks:
+            yield compressor.process(chunk) + compressor.flush()
+        yield compressor.finish()
+
+
+# Encodings in order of preference when the client accepts several equally
+CODECS = {
+    codec.name: codec
+    for codec, available in ((_Zstd, zstandard), (_Brotli, brotli), (_Gzip, zlib))
+    if available is not None
+}
+
+
+def negotiate():
+    """The content coding to compress the current response with, or None.
+
+    Picked from the request's Accept-Encoding by quality, ties going to the first
+    of CODECS; None when COMPRESSION_ENABLED is off or the client accepts none of them.
+    """
+    if not current_app.config["COMPRESSION_ENABLED"]:
+        return None
+    return request.accept_encodings.best_match(CODECS)
+
+
+def compress(data, encoding):
+    """Return data compressed with encoding, or None when it is below COMPRESSION_MIN_SIZE."""
+    if len(data) < current_app.config["COMPRESSION_MIN_SIZE"]:
+        return None
+    codec = CODECS[encoding]
+    return codec.compress(data, current_app.config[codec.config])
+
+
+def _compressed_chunks(codec, level, chunks):
+    """Compress a streamed body, flushing after every chunk so each reaches the client as it is produced."""
+    encoded = (chunk.encode("utf-8") if isinstance(chunk, str) else chunk for chunk in chunks)
+    try:
+        for data in codec.stream(encoded, level):
+            if data:
+                yield data
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+
+
+def init_app(app):
+    """Compress responses with the best encoding the client accepts.
+
+    Registered after the other hooks, so it runs before them: metrics record the size
+    sent, and Server-Timing includes the time spent compressing. Responses that are
+    already encoded (such as cached variants, see utils.cache.cached) are left alone.
+    A compressed response of a @conditional view gets the ETag of its encoding.
+    """
+    app.after_request(_compress_response)
+
+
+def _compress_response(response):
+    if response.mimetype not in COMPRESSIBLE_MIMETYPES or response.direct_passthrough:
+        return response
+    response.vary.add("Accept-Encoding")
+    if response.status_code < 200 or response.status_code in (204, 304) or "Content-Encoding" in response.headers:
+        return response
+
+    encoding = negotiate()
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        codec = CODECS[encoding]
+        response.response = _compressed_chunks(codec, current_app.config[codec.config], response.response)
+        response.headers.pop("Content-Length", None)
+    else:
+        data = compress(response.get_data(), encoding)
+        if data is None:
+            return response
+        response.set_data(data)
+    response.headers["Content-Encoding"] = encoding
+    if "ETag" in response.headers and "resource_version" in g:
+        # The compressed body is a representation of its own (imported here, as it imports this module)
+        from utils.conditional import entity_tag
+        response.set_etag(entity_tag(g.resource_version, encoding), weak=True)
+    return response
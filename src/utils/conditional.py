@@ -0,0 +1,71 @@
+import hashlib
+from functools import wraps
+from flask import g, make_response, request
+from utils import compression, negotiation
+
+
+def entity_tag(version, encoding=None):
+    """Hash the request (path and query string), the resource version and the representation into an entity tag.
+
+    The representation is the negotiated mimetype (JSON or MessagePack) and the content
+    coding, so a client or cache holding one variant never revalidates another with it.
+    """
+    representation = (negotiation.response_mimetype(), encoding)
+    return hashlib.sha1(repr((request.full_path, version, representation)).encode("utf-8")).hexdigest()
+
+
+def _not_modified(etags, last_modified):
+    """Return the tag of the client's copy when it is still current, or None."""
+    if request.if_none_match:
+        return next((etag for etag in etags if request.if_none_match.contains_weak(etag)), None)
+    if request.if_modified_since and last_modified:
+        if last_modified.replace(microsecond=0) <= request.if_modified_since.replace(tzinfo=None):
+            return etags[-1]
+    return None
+
+
+def conditional(validator):
+    """Answer conditional GETs with 304 Not Modified using a cheap validator query.
+
+    The validator receives the view's keyword arguments and returns a (last_modified,
+    version) tuple read from the updated_at columns and row counts, or None when the
+    resource does not exist. It runs before the view, so a 304 never loads relationships
+    or runs the serializer. Successful responses get a weak ETag and a Last-Modified
+    header. The version is left in g.resource_version for the response cache, and for
+    utils.compression to tag the body it compresses.
+
+    Args:
+        validator (callable): Returns (datetime or None, hashable version) or None.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            state = validator(**kwargs)
+            if state is None:
+                return view(*args, **kwargs)
+
+            last_modified, version = state
+            g.resource_version = version
+            # Bodies below COMPRESSION_MIN_SIZE go out unencoded, so a client accepting an
+            # encoding may hold either variant
+            etags = [entity_tag(version)]
+            encoding = compression.negotiate()
+            if encoding is not None:
+                etags.append(entity_tag(version, encoding))
+
+            etag = _not_modified(etags, last_modified)
+            if etag is not None:
+                response = make_response("", 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                # Cached variants arrive compressed already (see utils.cache.cached)
+                etag = entity_tag(version, response.headers.get("Content-Encoding"))
+
+            response.set_etag(etag, weak=True)
+            if last_modified:
+                response.last_modified = last_modified
+            return response
+        return wrapper
+    return decorator
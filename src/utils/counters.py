@@ -0,0 +1,132 @@
+from init import db
+from models.category import Category
+from models.comment import Comment
+from models.task import Task
+
+# Each trigger changes the parent's counter by one in the same statement as the write.
+# A relative UPDATE locks the parent row until the transaction ends, so concurrent
+# writers queue up behind each other instead of overwriting each other's counts.
+SQLITE_DDL = (
+    """CREATE TRIGGER IF NOT EXISTS comment_count_insert AFTER INSERT ON comments BEGIN
+        UPDATE tasks SET comment_count = comment_count + 1 WHERE id = NEW.task_idfi;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS comment_count_delete AFTER DELETE ON comments BEGIN
+        UPDATE tasks SET comment_count = comment_count - 1 WHERE id = OLD.task_idfi;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS comment_count_move AFTER UPDATE OF task_idfi ON comments
+    WHEN NEW.task_idfi IS NOT OLD.task_idfi BEGIN
+        UPDATE tasks SET comment_count = comment_count - 1 WHERE id = OLD.task_idfi;
+        UPDATE tasks SET comment_count = comment_count + 1 WHERE id = NEW.task_idfi;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS task_count_insert AFTER INSERT ON tasks BEGIN
+        UPDATE categories SET task_count = task_count + 1 WHERE id = NEW.category_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS task_count_delete AFTER DELETE ON tasks BEGIN
+        UPDATE categories SET task_count = task_count - 1 WHERE id = OLD.category_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS task_count_move AFTER UPDATE OF category_id ON tasks
+    WHEN NEW.category_id IS NOT OLD.category_id BEGIN
+        UPDATE categories SET task_count = task_count - 1 WHERE id = OLD.category_id;
+        UPDATE categories SET task_count = task_count + 1 WHERE id = NEW.category_id;
+    END""",
+)
+
+SQLITE_DROP = (
+    "DROP TRIGGER IF EXISTS comment_count_insert",
+    "DROP TRIGGER IF EXISTS comment_count_delete",
+    "DROP TRIGGER IF EXISTS comment_count_move",
+    "DROP TRIGGER IF EXISTS task_count_insert",
+    "DROP TRIGGER IF EXISTS task_count_delete",
+    "DROP TRIGGER IF EXISTS task_count_move",
+)
+
+POSTGRESQL_DDL = (
+    """CREATE OR REPLACE FUNCTION count_task_comments() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'UPDATE' AND NEW.task_idfi IS NOT DISTINCT FROM OLD.task_idfi THEN
+            RETURN NULL;
+        END IF;
+        IF TG_OP <> 'INSERT' THEN
+            UPDATE tasks SET comment_count = comment_count - 1 WHERE id = OLD.task_idfi;
+        END IF;
+        IF TG_OP <> 'DELETE' THEN
+            UPDATE tasks SET comment_count = comment_count + 1 WHERE id = NEW.task_idfi;
+        END IF;
+        RETURN NULL;
+    END $$""",
+    """CREATE OR REPLACE FUNCTION count_category_tasks() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'UPDATE' AND NEW.category_id IS NOT DISTINCT FROM OLD.category_id THEN
+            RETURN NULL;
+        END IF;
+        IF TG_OP <> 'INSERT' THEN
+            UPDATE categories SET task_count = task_count - 1 WHERE id = OLD.category_id;
+        END IF;
+        IF TG_OP <> 'DELETE' THEN
+            UPDATE categories SET task_count = task_count + 1 WHERE id = NEW.category_id;
+        END IF;
+        RETURN NULL;
+    END $$""",
+    "DROP TRIGGER IF EXISTS comment_count ON comments",
+    """CREATE TRIGGER comment_count AFTER INSERT OR DELETE OR UPDATE OF task_idfi ON comments
+        FOR EACH ROW EXECUTE FUNCTION count_task_comments()""",
+    "DROP TRIGGER IF EXISTS task_count ON tasks",
+    """CREATE TRIGGER task_count AFTER INSERT OR DELETE OR UPDATE OF category_id ON tasks
+        FOR EACH ROW EXECUTE FUNCTION count_category_tasks()""",
+)
+
+POSTGRESQL_DROP = (
+    "DROP FUNCTION IF EXISTS count_task_comments() CASCADE",
+    "DROP FUNCTION IF EXISTS count_category_tasks() CASCADE",
+)
+
+
+def _statements(connection, sqlite, postgresql):
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        return sqlite
+    if dialect == "postgresql":
+        return postgresql
+    raise NotImplementedError(f"Counter triggers are not supported on {dialect}")
+
+
+def install(connection):
+    """Create the triggers that keep Task.comment_count and Category.task_count up to date.
+
+    Triggers see every insert, delete and re-parenting of comments and tasks, whether it
+    comes from the ORM (including relationship cascades), the bulk endpoints' Core
+    statements or the synthetic data generator, and apply it in the same transaction.
+    """
+    for statement in _statements(connection, SQLITE_DDL, POSTGRESQL_DDL):
+        connection.exec_driver_sql(statement)
+
+
+def uninstall(connection):
+    """Drop the counter triggers."""
+    for statement in _statements(connection, SQLITE_DROP, POSTGRESQL_DROP):
+        connection.exec_driver_sql(statement)
+
+
+def recount(connection):
+    """Recompute every counter from the child tables and fix the ones that drifted.
+
+    On PostgreSQL, writes to tasks and comments wait until the recount commits, so no
+    increment made by a concurrent transaction is overwritten. SQLite only ever has one
+    writer, so the UPDATE statements are already isolated.
+
+    Returns:
+        tuple: Number of tasks and of categories whose counter was corrected.
+    """
+    if connection.dialect.name == "postgresql":
+        connection.exec_driver_sql("LOCK TABLE tasks, comments IN SHARE ROW EXCLUSIVE MODE")
+
+    comments = db.select(db.func.count(Comment.id)).where(Comment.task_idfi == Task.id).scalar_subquery()
+    tasks_fixed = connection.execute(
+        db.update(Task).values(comment_count=comments).where(Task.comment_count != comments)
+    ).rowcount
+
+    tasks = db.select(db.func.count(Task.id)).where(Task.category_id == Category.id).scalar_subquery()
+    categories_fixed = connection.execute(
+        db.update(Category).values(task_count=tasks).where(Category.task_count != tasks)
+    ).rowcount
+    return tasks_fixed, categories_fixed
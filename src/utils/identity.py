@@ -0,0 +1,103 @@
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from sqlalchemy import event
+from init import db
+
+# The parts of a user that authorisation checks need, without the password hash or relationships
+CurrentUser = namedtuple("CurrentUser", ["id", "email", "is_admin"])
+
+
+class IdentityCache:
+    """Maps JWT identities to CurrentUser records for a limited time.
+
+    Entries are evicted least recently used first once IDENTITY_CACHE_MAX_ENTRIES is
+    reached, and reloaded after IDENTITY_CACHE_TTL seconds. A commit that updates or
+    deletes a user evicts that user straight away in this worker; other workers pick the
+    change up when their entry expires, so the TTL bounds how long a deleted account's
+    tokens keep working there.
+    """
+
+    def __init__(self):
+        self.max_entries = 10000
+        self.ttl = 60
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.max_entries = app.config["IDENTITY_CACHE_MAX_ENTRIES"]
+        self.ttl = app.config["IDENTITY_CACHE_TTL"]
+        self.clear()
+        app.extensions["identity_cache"] = self
+
+        if not event.contains(db.session, "after_flush", _collect_users):
+            event.listen(db.session, "after_flush", _collect_users)
+            event.listen(db.session, "after_commit", _evict_users)
+            event.listen(db.session, "after_soft_rollback", _discard_users)
+
+    def get(self, identity):
+        """Return the CurrentUser for a JWT identity, or None if the user does not exist.
+
+        Args:
+            identity (str): The token's sub claim, the user's id.
+        """
+        try:
+            user_id = int(identity)
+        except (TypeError, ValueError):
+            return None
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(user_id)
+                return entry[0]
+
+        # Imported here so that create_app, which sets the cache up, does not load the
+        # models (STARTUP_LAZY leaves that to the first request)
+        from models.users import User
+        row = db.session.execute(
+            db.select(User.id, User.email, User.is_admin).filter_by(id=user_id)
+        ).first()
+        if row is None:
+            self.evict([user_id])
+            return None
+
+        user = CurrentUser(row.id, row.email, bool(row.is_admin))
+        with self._lock:
+            self._entries[user_id] = (user, now + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return user
+
+    def evict(self, user_ids):
+        with self._lock:
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+identity_cache = IdentityCache()
+
+
+def _collect_users(session, flush_context):
+    from models.users import User
+    changed = session.info.setdefault("changed_users", set())
+    for obj in (*session.dirty, *session.deleted):
+        if isinstance(obj, User) and obj.id is not None:
+            changed.add(obj.id)
+
+
+def _evict_users(session):
+    changed = session.info.pop("changed_users", None)
+    if changed:
+        identity_cache.evict(changed)
+
+
+def _discard_users(session, previous_transaction):
+    if not session.in_transaction():
+        session.info.pop("changed_users", None)
@@ -0,0 +1,106 @@
+from flask import current_app
+from marshmallow import fields
+from init import db
+
+
+def nested_schema(field):
+    """Return the schema a field serializes into, or None for plain value fields.
+
+    Handles both fields.Nested and fields.List(fields.Nested(...)), the two ways the
+    schemas in this app declare relationships.
+    """
+    if isinstance(field, fields.List):
+        field = field.inner
+    if isinstance(field, fields.Nested):
+        return field.schema
+    return None
+
+
+def _mapped_attribute(model, name):
+    """Return the mapped attribute called name on model, if there is one."""
+    attr = getattr(model, name, None)
+    if getattr(attr, "property", None) is None:
+        return None
+    return attr
+
+
+def _is_relationship(attr):
+    return hasattr(attr.property, "mapper")
+
+
+def _column_attributes(model, schema):
+    """Return the column attributes schema will read from model."""
+    columns = []
+    for name, field in schema.dump_fields.items():
+        if nested_schema(field) is not None:
+            continue
+        attr = _mapped_attribute(model, field.attribute or name)
+        if attr is not None and not _is_relationship(attr):
+            columns.append(attr)
+    return columns
+
+
+def _entity_options(model, schema, keep=()):
+    """Build the options for one entity level: its columns and its relationship loaders.
+
+    Columns are only narrowed when the schema was given an explicit only= projection,
+    which keeps the full-row load (and any columns the view itself needs) otherwise.
+    """
+    strict = current_app.config.get("STRICT_LOADING", False)
+    options = []
+
+    if schema.only is not None:
+        options.append(db.load_only(*_column_attributes(model, schema), *keep))
+
+    for name, field in schema.dump_fields.items():
+        child_schema = nested_schema(field)
+        if child_schema is None:
+            continue
+
+        attr = _mapped_attribute(model, field.attribute or name)
+        if attr is None or not _is_relationship(attr):
+            continue
+
+        # Collections get a single IN query for the whole page, scalar references are
+        # joined into the parent query because they never multiply its rows
+        if attr.property.uselist:
+            loader = db.selectinload(attr)
+        else:
+            loader = db.joinedload(attr)
+
+        child_options = _entity_options(attr.property.mapper.class_, child_schema)
+        if strict:
+            child_options.append(db.raiseload("*", sql_only=True))
+        if child_options:
+            loader = loader.options(*child_options)
+
+        options.append(loader)
+
+    return options
+
+
+def loader_options(model, schema, keep=()):
+    """Return the loader options needed to dump instances of model with schema.
+
+    The schema's nested fields are walked recursively and each relationship it will
+    serialize is eagerly loaded, so dumping a list issues a fixed number of SELECTs
+    instead of one per row per relationship. Relationships the schema does not
+    serialize are left alone, and when a level of the schema has an only= projection
+    the SELECT for that level is narrowed to the projected columns.
+
+    When STRICT_LOADING is enabled every other relationship is set to raise on access,
+    so a serializer that reaches for a relationship the query did not load fails loudly
+    instead of quietly issuing an extra SELECT per row.
+
+    Args:
+        model: The mapped class being selected.
+        schema: The schema instance the results will be dumped with.
+        keep: Extra column attributes the view needs even when they are not projected.
+
+    Returns:
+        list: Options to pass to Select.options().
+    """
+    options = _entity_options(model, schema, keep)
+    if current_app.config.get("STRICT_LOADING", False):
+        options.append(db.raiseload("*", sql_only=True))
+    return options
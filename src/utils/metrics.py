@@ -0,0 +1,164 @@
+import os
+import time
+import weakref
+
+# prometheus_client only checks that the variable exists when it is imported, so an empty
+# one (KEY= in .env) would switch it to multiprocess mode without a directory
+if not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+    os.environ.pop("PROMETHEUS_MULTIPROC_DIR", None)
+
+import ipaddress
+from flask import current_app, g, request
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# With PROMETHEUS_MULTIPROC_DIR set (before this module is imported) every worker process
+# writes its samples to files in that directory and /metrics adds them up, so the numbers
+# are right behind a pre-forking server. The directory must be emptied when the server
+# starts, and gunicorn's child_exit hook should call mark_process_dead(worker.pid).
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Time spent handling a request.",
+    ["blueprint", "endpoint", "method"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+REQUESTS = Counter(
+    "http_requests_total", "Requests handled, by response status.",
+    ["blueprint", "endpoint", "method", "status"]
+)
+IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "Requests currently being handled.",
+    ["blueprint", "endpoint"], multiprocess_mode="livesum"
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes", "Size of response bodies (streamed responses are not counted).",
+    ["blueprint", "endpoint"],
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+)
+POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out_connections", "Database connections currently checked out of the pool.",
+    ["database"], multiprocess_mode="livesum"
+)
+POOL_OVERFLOW = Gauge(
+    "db_pool_overflow_connections", "Connections open beyond the pool size.",
+    ["database"], multiprocess_mode="livesum"
+)
+POOL_WAIT = Histogram(
+    "db_pool_checkout_seconds", "Time taken to get a connection from the pool, including waiting and connecting.",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30)
+)
+
+
+class MeteredQueuePool(QueuePool):
+    """QueuePool that records how long each checkout takes."""
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            POOL_WAIT.observe(time.perf_counter() - started)
+
+
+class MeteredAsyncQueuePool(MeteredQueuePool, AsyncAdaptedQueuePool):
+    """MeteredQueuePool for engines on asyncio drivers, whose checkouts wait without blocking the event loop."""
+
+
+_watched_pools = weakref.WeakSet()
+
+
+def init_app(app):
+    """Register the request hooks when METRICS_ENABLED is set.
+
+    Call it before db.init_app so the metered pool class is part of the engine options,
+    and call watch_pools once the engines exist. SQLite in-memory databases keep their
+    single-connection pool and report no pool metrics.
+    """
+    if not app.config["METRICS_ENABLED"]:
+        return
+
+    uri = app.config.get("SQLALCHEMY_DATABASE_URI")
+    if uri and make_url(uri).database not in (None, "", ":memory:"):
+        poolclass = MeteredAsyncQueuePool if app.config.get("SQLALCHEMY_ASYNC") else MeteredQueuePool
+        app.config.setdefault("SQLALCHEMY_ENGINE_OPTIONS", {}).setdefault("poolclass", poolclass)
+
+    app.before_request(_start_request)
+    app.after_request(_record_response)
+    app.teardown_request(_finish_request)
+
+
+def watch_pools(app):
+    """Keep the pool gauges of the app's engines up to date as connections are checked out and returned."""
+    if not app.config["METRICS_ENABLED"]:
+        return
+
+    from init import db
+    with app.app_context():
+        engines = list(db.engines.values())
+
+    for engine in engines:
+        pool = engine.pool
+        if not isinstance(pool, QueuePool) or pool in _watched_pools:
+            continue
+        _watched_pools.add(pool)
+        checked_out = POOL_CHECKED_OUT.labels(engine.url.database or "")
+        overflow = POOL_OVERFLOW.labels(engine.url.database or "")
+
+        def pool_changed(*args, pool=pool, checked_out=checked_out, overflow=overflow):
+            checked_out.set(pool.checkedout())
+            overflow.set(max(pool.overflow(), 0))
+
+        event.listen(pool, "checkout", pool_changed)
+        event.listen(pool, "checkin", pool_changed)
+
+
+def _labels():
+    endpoint = request.endpoint or "unmatched"
+    return request.blueprint or "", endpoint
+
+
+def _start_request():
+    blueprint, endpoint = _labels()
+    IN_FLIGHT.labels(blueprint, endpoint).inc()
+    g.metrics_started = time.perf_counter()
+
+
+def _record_response(response):
+    started = g.get("metrics_started")
+    if started is None:
+        return response
+    blueprint, endpoint = _labels()
+    REQUEST_LATENCY.labels(blueprint, endpoint, request.method).observe(time.perf_counter() - started)
+    REQUESTS.labels(blueprint, endpoint, request.method, str(response.status_code)).inc()
+    if not response.is_streamed and response.content_length is not None:
+        RESPONSE_SIZE.labels(blueprint, endpoint).observe(response.content_length)
+    return response
+
+
+def _finish_request(exc):
+    if g.pop("metrics_started", None) is not None:
+        IN_FLIGHT.labels(*_labels()).dec()
+
+
+def allowed(address):
+    """Return True if a client at address may read the metrics, per METRICS_ALLOWED_NETWORKS."""
+    try:
+        address = ipaddress.ip_address(address)
+    except (TypeError, ValueError):
+        return False
+    # An IPv6 client connecting over an IPv4-mapped address (::ffff:10.0.0.5) is an IPv4 client
+    address = getattr(address, "ipv4_mapped", None) or address
+    return any(address in network for network in current_app.config["METRICS_ALLOWED_NETWORKS"])
+
+
+def render():
+    """Return the exposition text and its content type, merged across workers in multiprocess mode."""
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        from prometheus_client import REGISTRY as registry
+    return generate_latest(registry), CONTENT_TYPE_LATEST
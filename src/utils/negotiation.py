@@ -0,0 +1,88 @@
+from datetime import date, datetime, time
+import msgpack
+from flask import Request, current_app, request
+from utils.timing import span
+
+MSGPACK_MIMETYPE = "application/msgpack"
+
+
+def wants_msgpack():
+    """True when the current request's Accept header prefers MessagePack over JSON.
+
+    JSON wins ties, so clients sending */* or no Accept header keep receiving JSON.
+    """
+    if not current_app.config["MSGPACK_ENABLED"]:
+        return False
+    return request.accept_mimetypes.best_match((current_app.json.mimetype, MSGPACK_MIMETYPE)) == MSGPACK_MIMETYPE
+
+
+def response_mimetype():
+    """The mimetype a response body to the current request is encoded as."""
+    return MSGPACK_MIMETYPE if wants_msgpack() else current_app.json.mimetype
+
+
+def _default(obj):
+    # Same ISO 8601 strings as the orjson provider writes; everything else as Flask's JSON does
+    if isinstance(obj, (date, datetime, time)):
+        return obj.isoformat()
+    return current_app.json.default(obj)
+
+
+def packb(obj):
+    """Encode obj as MessagePack, converting the values it has no type for as the JSON provider does."""
+    return msgpack.packb(obj, default=_default)
+
+
+class MsgpackRequest(Request):
+    """Request whose get_json also decodes application/msgpack bodies.
+
+    Controllers read request bodies with request.get_json(), so every write endpoint
+    accepts MessagePack as well as JSON. Invalid MessagePack is a 400 Bad Request,
+    like invalid JSON.
+    """
+
+    def get_json(self, force=False, silent=False, cache=True):
+        if self.mimetype != MSGPACK_MIMETYPE or not current_app.config["MSGPACK_ENABLED"]:
+            return super().get_json(force=force, silent=silent, cache=cache)
+        try:
+            return msgpack.unpackb(self.get_data(cache=cache))
+        except ValueError as err:
+            if silent:
+                return None
+            return self.on_json_loading_failed(err)
+
+
+def init_app(app):
+    """Negotiate MessagePack responses and accept MessagePack request bodies.
+
+    Every response built by app.json (returned dicts and lists, jsonify, error handlers)
+    is encoded as MessagePack when the Accept header prefers application/msgpack. Wraps
+    the provider already set as app.json, so it works with any JSON_PROVIDER. JSON and
+    MessagePack responses carry Vary: Accept.
+    """
+    app.request_class = MsgpackRequest
+    app.json = _negotiating_provider(app)
+    app.after_request(_vary_accept)
+
+
+def _vary_accept(response):
+    if current_app.config["MSGPACK_ENABLED"] and response.mimetype in (current_app.json.mimetype, MSGPACK_MIMETYPE):
+        response.vary.add("Accept")
+    return response
+
+
+def _negotiating_provider(app):
+    provider_class = type(app.json)
+
+    class NegotiatingProvider(provider_class):
+        def response(self, *args, **kwargs):
+            if not wants_msgpack():
+                return super().response(*args, **kwargs)
+            obj = self._prepare_response_obj(args, kwargs)
+            with span("json"):
+                body = packb(obj)
+            return self._app.response_class(body, mimetype=MSGPACK_MIMETYPE)
+
+    provider = NegotiatingProvider(app)
+    provider.__dict__.update(app.json.__dict__)
+    return provider
@@ -0,0 +1,160 @@
+import base64
+import binascii
+import json
+from datetime import date
+from flask import current_app, request
+from init import db
+
+
+class PaginationError(ValueError):
+    """Raised when the limit or cursor query parameters cannot be used."""
+
+
+def _encode(position):
+    payload = json.dumps(position, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode(cursor):
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+
+
+def encode_cursor(due_date, task_id):
+    """Encode the (due_date, id) position of a task into an opaque cursor string."""
+    return _encode([due_date.isoformat() if due_date else None, task_id])
+
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by encode_cursor back into a (due_date, id) tuple.
+
+    Raises:
+        PaginationError: If the cursor is malformed.
+    """
+    try:
+        due_date, task_id = _decode(cursor)
+        if due_date is not None:
+            due_date = date.fromisoformat(due_date)
+        if not isinstance(task_id, int):
+            raise ValueError
+        return due_date, task_id
+    except (ValueError, TypeError, binascii.Error, UnicodeError):
+        raise PaginationError("Invalid cursor")
+
+
+def encode_search_cursor(score, task_id, floor, ceiling):
+    """Encode the (score, id) position of a search result and the id range being ranked into an opaque cursor string."""
+    return _encode([score, task_id, floor, ceiling])
+
+
+def decode_search_cursor(cursor):
+    """Decode a cursor produced by encode_search_cursor back into a (score, id, floor, ceiling) tuple.
+
+    Raises:
+        PaginationError: If the cursor is malformed.
+    """
+    try:
+        score, task_id, floor, ceiling = _decode(cursor)
+        if not isinstance(score, (int, float)) or isinstance(score, bool):
+            raise ValueError
+        if not all(type(value) is int for value in (task_id, floor, ceiling)):
+            raise ValueError
+        return score, task_id, floor, ceiling
+    except (ValueError, TypeError, binascii.Error, UnicodeError):
+        raise PaginationError("Invalid cursor")
+
+
+def encode_change_token(transaction_id, seq):
+    """Encode a (transaction_id, seq) position in the change feed into an opaque token string."""
+    return _encode([transaction_id, seq])
+
+
+def decode_change_token(token):
+    """Decode a token produced by encode_change_token back into a (transaction_id, seq) tuple.
+
+    Raises:
+        PaginationError: If the token is malformed.
+    """
+    try:
+        transaction_id, seq = _decode(token)
+        if not all(isinstance(value, int) and not isinstance(value, bool) for value in (transaction_id, seq)):
+            raise ValueError
+        return transaction_id, seq
+    except (ValueError, TypeError, binascii.Error, UnicodeError):
+        raise PaginationError("Invalid change token")
+
+
+def get_page_limit():
+    """Read the ?limit= query parameter, falling back to the configured page size.
+
+    A limit above the maximum page size is lowered to it.
+
+    Raises:
+        PaginationError: If the limit is not a positive integer.
+    """
+    default_limit = current_app.config["TASKS_PAGE_SIZE"]
+    max_limit = current_app.config["TASKS_MAX_PAGE_SIZE"]
+    limit = request.args.get("limit", default_limit)
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        raise PaginationError("Limit must be an integer")
+    if limit < 1:
+        raise PaginationError("Limit must be at least 1")
+    return min(limit, max_limit)
+
+
+def keyset_page(stmt, model, limit, after=None):
+    """Fetch one page of a select statement with (due_date, id) keyset pagination.
+
+    Rows are ordered by due date descending with ties broken by id descending, and tasks
+    without a due date come last. Because the position is expressed as a WHERE clause on
+    the ordering columns instead of an OFFSET, every page costs the same as the first one.
+
+    Dated and undated rows are read as two phases, so each query is a single range of
+    the (due_date, id) index: the dated rows after the cursor, then, once those run out,
+    the rows without a due date. A cursor with no due date resumes in the second phase.
+
+    Args:
+        stmt: The select statement to paginate.
+        model: The mapped class providing the due_date and id columns.
+        limit (int): Maximum number of rows in the page.
+        after (str): Cursor returned with the previous page, if any; empty means the first page.
+
+    Returns:
+        tuple: The rows of this page and the next cursor, or None on the last page.
+    """
+    # ?after= with no value starts from the first page, like leaving it out
+    after = after or None
+    due_date, last_id = decode_cursor(after) if after is not None else (None, None)
+    order = (model.due_date.desc().nulls_last(), model.id.desc())
+
+    rows = []
+    if after is None or due_date is not None:
+        dated = stmt.where(model.due_date.is_not(None))
+        if after is not None:
+            dated = dated.where(db.tuple_(model.due_date, model.id) < (due_date, last_id))
+        # One extra row tells whether another page follows
+        rows = db.session.scalars(dated.order_by(*order).limit(limit + 1)).all()
+        if len(rows) > limit:
+            return split_page(rows, limit)
+        last_id = None
+
+    undated = stmt.where(model.due_date.is_(None))
+    if last_id is not None:
+        undated = undated.where(model.id < last_id)
+    rows += db.session.scalars(undated.order_by(*order).limit(limit + 1 - len(rows))).all()
+    return split_page(rows, limit)
+
+
+def split_page(rows, limit):
+    """Trim the extra look-ahead row and build the cursor for the next page.
+
+    Returns:
+        tuple: The rows belonging to this page and the next cursor, or None on the last page.
+    """
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(last.due_date, last.id)
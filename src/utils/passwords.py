@@ -0,0 +1,95 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from init import bcrypt
+from utils.asgi import wait
+from utils.timing import span
+
+
+class PasswordPoolFull(Exception):
+    """Raised when the password hashing queue is at its limit."""
+
+
+class PasswordHasher:
+    """Runs bcrypt hashing and verification on a dedicated, size-limited thread pool.
+
+    bcrypt releases the GIL while it works, so a small pool of threads keeps password
+    work off the request threads without a process pool. At most PASSWORD_POOL_SIZE
+    hashes run at once, and at most PASSWORD_QUEUE_LIMIT may be running or waiting.
+    Beyond that PasswordPoolFull is raised, which the app turns into a 503, so a login
+    storm is shed instead of starving cheap requests. Under create_async_app the event
+    loop serves other requests while a hash runs.
+    """
+
+    def __init__(self):
+        self._executor = None
+        self._slots = None
+        self._lock = threading.Lock()
+        self._stats = {
+            "completed": 0,
+            "rejected": 0,
+            "in_flight": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+            "hash_seconds_total": 0.0,
+            "hash_seconds_max": 0.0
+        }
+
+    def init_app(self, app):
+        pool_size = app.config["PASSWORD_POOL_SIZE"] or os.cpu_count() or 1
+        queue_limit = app.config["PASSWORD_QUEUE_LIMIT"] or pool_size * 4
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="bcrypt")
+        self._slots = threading.BoundedSemaphore(queue_limit)
+        app.extensions["password_hasher"] = self
+
+    def _record(self, waited, hashed):
+        with self._lock:
+            stats = self._stats
+            stats["completed"] += 1
+            stats["wait_seconds_total"] += waited
+            stats["wait_seconds_max"] = max(stats["wait_seconds_max"], waited)
+            stats["hash_seconds_total"] += hashed
+            stats["hash_seconds_max"] = max(stats["hash_seconds_max"], hashed)
+
+    def _run(self, func, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._stats["rejected"] += 1
+            raise PasswordPoolFull("Too many password operations in progress, please retry shortly")
+
+        queued_at = time.perf_counter()
+
+        def task():
+            started_at = time.perf_counter()
+            try:
+                return func(*args)
+            finally:
+                self._record(started_at - queued_at, time.perf_counter() - started_at)
+
+        with self._lock:
+            self._stats["in_flight"] += 1
+        try:
+            with span("auth"):
+                return wait(self._executor.submit(task))
+        finally:
+            with self._lock:
+                self._stats["in_flight"] -= 1
+            self._slots.release()
+
+    def hash(self, password):
+        """Return the bcrypt hash of password as a string."""
+        return self._run(bcrypt.generate_password_hash, password).decode("utf-8")
+
+    def check(self, password_hash, password):
+        """Return True if password matches password_hash."""
+        return self._run(bcrypt.check_password_hash, password_hash, password)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,83 @@
+from flask import request
+from utils.loading import nested_schema
+
+
+class ProjectionError(ValueError):
+    """Raised when the fields or expand query parameters name something the schema lacks."""
+
+
+def _split(value):
+    if value is None:
+        return []
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
+def _projection(schema, requested, expand):
+    """Work out the only= names for one schema level.
+
+    Args:
+        schema: The schema instance for this level.
+        requested (list): Field names asked for with ?fields=, empty for every plain field.
+        expand (list): Relationship paths to include, dotted for deeper levels.
+
+    Returns:
+        list: Field names, with dotted names for nested levels, in the schema's field order.
+    """
+    relations = {name: field for name, field in schema.dump_fields.items() if nested_schema(field) is not None}
+
+    for name in requested:
+        if name not in schema.dump_fields:
+            raise ProjectionError(f"Unknown field '{name}'")
+
+    nested_expand = {}
+    for path in expand:
+        parent, _, rest = path.partition(".")
+        if parent not in relations:
+            raise ProjectionError(f"Cannot expand '{parent}'")
+        nested_expand.setdefault(parent, [])
+        if rest:
+            nested_expand[parent].append(rest)
+
+    for name in requested:
+        if name in relations:
+            nested_expand.setdefault(name, [])
+
+    only = []
+    for name in schema.dump_fields:
+        if name in relations:
+            if name not in nested_expand:
+                continue
+            child_only = _projection(nested_schema(relations[name]), [], nested_expand[name])
+            only.append(name)
+            only.extend(f"{name}.{child}" for child in child_only)
+        elif not requested or name in requested:
+            only.append(name)
+
+    return only
+
+
+def projected_schema(schema):
+    """Return a schema narrowed to the ?fields= and ?expand= query parameters.
+
+    fields is a comma separated list of top level field names. expand is a comma
+    separated list of relationships to include, using dots to reach deeper levels
+    (e.g. expand=tasks,tasks.comments). When either parameter is given, relationships
+    are only serialized, and therefore only loaded, if they are expanded or named in
+    fields. Without either parameter the schema is returned unchanged.
+
+    Args:
+        schema: The module level schema instance the endpoint normally dumps with.
+
+    Returns:
+        Schema: A schema instance for this request.
+
+    Raises:
+        ProjectionError: If a requested field or expansion does not exist.
+    """
+    fields_param = request.args.get("fields")
+    expand_param = request.args.get("expand")
+    if fields_param is None and expand_param is None:
+        return schema
+
+    only = _projection(schema, _split(fields_param), _split(expand_param))
+    return type(schema)(many=schema.many, only=only, exclude=schema.exclude)
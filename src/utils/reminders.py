@@ -0,0 +1,120 @@
+import importlib
+import json
+import logging
+from datetime import timedelta
+from init import db
+from models.task import Task
+from models.task_reminder import TaskReminder
+from models.users import User
+from utils.timestamps import utc_now
+
+logger = logging.getLogger("reminders")
+
+
+class LogSink:
+    """Logs every reminder as a JSON line to the reminders logger."""
+
+    def __init__(self, app):
+        if not logger.handlers:
+            logger.addHandler(logging.StreamHandler())
+            logger.setLevel(logging.INFO)
+
+    def send(self, reminders):
+        for reminder in reminders:
+            logger.info(json.dumps(reminder))
+
+
+class FileSink:
+    """Appends every reminder as a JSON line to the REMINDER_FILE file."""
+
+    def __init__(self, app):
+        self.path = app.config["REMINDER_FILE"]
+
+    def send(self, reminders):
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.writelines(json.dumps(reminder) + "\n" for reminder in reminders)
+
+
+# Sinks selectable by name in REMINDER_SINK
+SINKS = {"log": LogSink, "file": FileSink}
+
+
+def load_sink(app):
+    """Create the sink named by REMINDER_SINK.
+
+    It is either a name from SINKS or "module:attribute", naming a class or function that
+    takes the app and returns an object with a send(reminders) method. send receives a
+    batch of reminder dicts and must raise if it could not deliver them.
+
+    Raises:
+        ValueError: If REMINDER_SINK is neither.
+    """
+    name = app.config["REMINDER_SINK"]
+    if name in SINKS:
+        return SINKS[name](app)
+    if ":" not in name:
+        raise ValueError(f"Unknown REMINDER_SINK '{name}'. Use {', '.join(SINKS)} or module:attribute")
+    module, attribute = name.split(":", 1)
+    return getattr(importlib.import_module(module), attribute)(app)
+
+
+def send_reminders(sink, hours, batch_size):
+    """Hand a reminder for every task due within the next hours to sink, once per due date.
+
+    A task is due within the window when its due date falls between today and the day
+    hours from now (UTC). Tasks are read in (due_date, id) order, batch_size at a time,
+    as an index range scan that resumes after the last task of the previous batch. Only
+    the task, its owner's name and email are selected, so no relationship is loaded.
+
+    Each batch is sent, then recorded in task_reminders and committed. Tasks with a
+    record for their current due date are skipped by a primary key lookup, so repeated
+    runs only send and write the reminders that are new. A failure between sending and
+    committing means the batch is sent again on the next run, never lost.
+
+    Returns:
+        int: Number of reminders sent.
+    """
+    now = utc_now()
+    first_day, last_day = now.date(), (now + timedelta(hours=hours)).date()
+
+    notified = db.exists().where(TaskReminder.task_id == Task.id, TaskReminder.due_date == Task.due_date)
+    # NULLS FIRST matches PostgreSQL's descending tasks index read backwards and is
+    # SQLite's default, so both databases walk the index instead of sorting the window
+    window = (
+        db.select(Task.id, Task.title, Task.due_date, Task.user_id, User.name, User.email)
+        .join(User, User.id == Task.user_id)
+        .where(Task.due_date >= first_day, Task.due_date <= last_day, ~notified)
+        .order_by(Task.due_date.asc().nulls_first(), Task.id.asc())
+        .limit(batch_size)
+    )
+
+    sent, position = 0, None
+    while True:
+        stmt = window if position is None else window.where(db.tuple_(Task.due_date, Task.id) > position)
+        rows = db.session.execute(stmt).all()
+        if rows:
+            sink.send([
+                {
+                    "task_id": row.id,
+                    "title": row.title,
+                    "due_date": row.due_date.isoformat(),
+                    "user_id": row.user_id,
+                    "name": row.name,
+                    "email": row.email
+                }
+                for row in rows
+            ])
+            db.session.execute(
+                db.insert(TaskReminder),
+                [{"task_id": row.id, "due_date": row.due_date, "sent_at": now} for row in rows]
+            )
+            db.session.commit()
+            sent += len(rows)
+        if len(rows) < batch_size:
+            break
+        position = (rows[-1].due_date, rows[-1].id)
+
+    # Records of past due dates can never match a task in the window again
+    db.session.execute(db.delete(TaskReminder).where(TaskReminder.due_date < first_day))
+    db.session.commit()
+    return sent
@@ -0,0 +1,163 @@
+import itertools
+import math
+import threading
+import time
+from functools import wraps
+from flask import g, has_request_context, request
+from flask_jwt_extended import get_jwt, verify_jwt_in_request
+from flask_jwt_extended.exceptions import JWTExtendedException
+from flask_sqlalchemy.session import Session
+from jwt.exceptions import PyJWTError
+from sqlalchemy import event
+
+# Cookie telling every worker that the client wrote recently and must read from the primary
+PRIMARY_COOKIE = "read_primary_until"
+# The same deadline as a header, for API clients that send headers back but keep no cookies
+PRIMARY_HEADER = "X-Read-Primary-Until"
+
+
+class RoutingSession(Session):
+    """Session that sends the queries of read-only requests to the replica chosen for them.
+
+    Flushes always go to the primary, so an accidental write in a read-only view still
+    lands in the right database.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and has_request_context():
+            replica = g.get("db_replica")
+            if replica is not None:
+                return self._db.engines[replica]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class ReplicaRouter:
+    """Adds the DATABASE_REPLICA_URLS databases as binds and chooses one per read-only request.
+
+    Requests to views marked @read_only query a replica, chosen round robin or by the
+    fewest checked-out connections (DATABASE_REPLICA_SELECTION). Everything else uses the
+    primary. After a request commits a write, that client's reads stay on the primary for
+    READ_YOUR_WRITES_SECONDS, long enough for the replicas to catch up. The deadline is
+    remembered for the token's identity, so the user's later requests with any token read
+    from the primary on this worker. The response also carries it as a cookie and an
+    X-Read-Primary-Until header; a client sending either back is honoured by every worker,
+    unless the deadline is further away than READ_YOUR_WRITES_SECONDS.
+    """
+
+    def __init__(self):
+        self.bind_keys = []
+        self.selection = "round_robin"
+        self.window = 5
+        self._counter = itertools.count()
+        self._writers = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Register the replica binds and write tracking. Call it before db.init_app."""
+        urls = app.config["DATABASE_REPLICA_URLS"]
+        self.bind_keys = [f"replica_{index}" for index in range(len(urls))]
+        self.selection = app.config["DATABASE_REPLICA_SELECTION"]
+        self.window = app.config["READ_YOUR_WRITES_SECONDS"]
+        if self.selection not in ("round_robin", "least_connections"):
+            raise ValueError("DATABASE_REPLICA_SELECTION must be round_robin or least_connections")
+        self._writers.clear()
+        if not urls:
+            return
+
+        app.config.setdefault("SQLALCHEMY_BINDS", {}).update(zip(self.bind_keys, urls))
+        app.after_request(_set_primary_cookie)
+
+        from init import db
+        if not event.contains(db.session, "after_commit", _note_commit):
+            event.listen(db.session, "after_commit", _note_commit)
+
+    def choose(self):
+        """Return the bind key of the replica to read from."""
+        if self.selection == "least_connections":
+            from init import db
+            return min(self.bind_keys, key=lambda key: _checked_out(db.engines[key]))
+        return self.bind_keys[next(self._counter) % len(self.bind_keys)]
+
+    def note_write(self, identity, until):
+        """Keep reads of the user with this JWT identity on the primary until the until timestamp."""
+        now = time.time()
+        with self._lock:
+            # Entries only matter for a few seconds, so drop the expired ones as the map grows
+            if len(self._writers) >= 1024:
+                self._writers = {key: value for key, value in self._writers.items() if value > now}
+            self._writers[identity] = until
+
+    def wrote_recently(self, identity):
+        """Whether the user with this JWT identity committed a write within the window."""
+        with self._lock:
+            return self._writers.get(identity, 0) > time.time()
+
+
+replica_router = ReplicaRouter()
+
+
+def read_only(view):
+    """Run a view's queries on a replica, unless the client wrote within the read-your-writes window."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if replica_router.bind_keys and not _recently_wrote():
+            g.db_replica = replica_router.choose()
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def _checked_out(engine):
+    checkedout = getattr(engine.pool, "checkedout", None)
+    return checkedout() if checkedout else 0
+
+
+def _recently_wrote():
+    # The client sends these back unsigned, so a deadline further away than any write
+    # could have set is ignored instead of pinning its reads to the primary (with a
+    # second's leeway for clocks that differ between workers)
+    now = time.time()
+    for value in (request.headers.get(PRIMARY_HEADER), request.cookies.get(PRIMARY_COOKIE)):
+        try:
+            if value and now < float(value) <= now + replica_router.window + 1:
+                return True
+        except ValueError:
+            pass
+    identity = _token_identity(verify=True)
+    return identity is not None and replica_router.wrote_recently(identity)
+
+
+def _token_identity(verify=False):
+    """The sub claim of the request's access token, or None without a valid one.
+
+    Read-only views are often public and run before @jwt_required, so verify=True checks
+    an optional token first; an invalid one is left for @jwt_required to reject.
+    """
+    try:
+        if verify:
+            verify_jwt_in_request(optional=True)
+        return get_jwt().get("sub")
+    except (JWTExtendedException, PyJWTError, RuntimeError):
+        return None
+
+
+def _note_commit(session):
+    # Any commit made while handling a POST, PUT, PATCH or DELETE counts as a write. This
+    # also covers the bulk endpoints' Core statements, which never flush. (A do_orm_execute
+    # listener would see those too, but its presence breaks yield_per with selectinload.)
+    if has_request_context() and request.method not in ("GET", "HEAD", "OPTIONS"):
+        g.db_wrote = True
+
+
+def _set_primary_cookie(response):
+    if g.get("db_wrote"):
+        window = replica_router.window
+        until = time.time() + window
+        identity = _token_identity()
+        if identity is not None:
+            replica_router.note_write(identity, until)
+        response.headers[PRIMARY_HEADER] = f"{until:.3f}"
+        response.set_cookie(
+            PRIMARY_COOKIE, f"{until:.3f}",
+            max_age=math.ceil(window), httponly=True, samesite="Lax"
+        )
+    return response
@@ -0,0 +1,272 @@
+import re
+from flask import current_app
+from sqlalchemy import inspect
+from init import db
+from utils.pagination import decode_search_cursor, encode_search_cursor
+
+# Table holding the inverted index; SQLite also creates shadow tables named task_search_*
+SEARCH_TABLE = "task_search"
+
+# Title, description and comment matches are weighted 5:2:1, the ratio of PostgreSQL's
+# default weights for the A, B and C labels, so both databases rank results alike
+SQLITE_DDL = (
+    """CREATE VIRTUAL TABLE IF NOT EXISTS task_search
+        USING fts5(title, description, comments, tokenize='porter unicode61')""",
+    """CREATE TRIGGER IF NOT EXISTS task_search_task_insert AFTER INSERT ON tasks BEGIN
+        INSERT INTO task_search (rowid, title, description, comments) VALUES (NEW.id, NEW.title, NEW.description, '');
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS task_search_task_update AFTER UPDATE OF title, description ON tasks BEGIN
+        UPDATE task_search SET title = NEW.title, description = NEW.description WHERE rowid = NEW.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS task_search_task_delete AFTER DELETE ON tasks BEGIN
+        DELETE FROM task_search WHERE rowid = OLD.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS task_search_comment_insert AFTER INSERT ON comments BEGIN
+        UPDATE task_search SET comments = comments || ' ' || coalesce(NEW.content, '') WHERE rowid = NEW.task_idfi;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS task_search_comment_update AFTER UPDATE OF content, task_idfi ON comments BEGIN
+        UPDATE task_search
+        SET comments = coalesce((SELECT group_concat(content, ' ') FROM comments WHERE task_idfi = task_search.rowid), '')
+        WHERE rowid IN (OLD.task_idfi, NEW.task_idfi);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS task_search_comment_delete AFTER DELETE ON comments BEGIN
+        UPDATE task_search
+        SET comments = coalesce((SELECT group_concat(content, ' ') FROM comments WHERE task_idfi = OLD.task_idfi), '')
+        WHERE rowid = OLD.task_idfi;
+    END""",
+)
+
+SQLITE_DROP = (
+    "DROP TRIGGER IF EXISTS task_search_task_insert",
+    "DROP TRIGGER IF EXISTS task_search_task_update",
+    "DROP TRIGGER IF EXISTS task_search_task_delete",
+    "DROP TRIGGER IF EXISTS task_search_comment_insert",
+    "DROP TRIGGER IF EXISTS task_search_comment_update",
+    "DROP TRIGGER IF EXISTS task_search_comment_delete",
+    "DROP TABLE IF EXISTS task_search",
+)
+
+SQLITE_REBUILD = (
+    "DELETE FROM task_search",
+    """INSERT INTO task_search (rowid, title, description, comments)
+    SELECT t.id, t.title, t.description, coalesce(c.content, '')
+    FROM tasks t
+    LEFT JOIN (SELECT task_idfi, group_concat(content, ' ') AS content FROM comments GROUP BY task_idfi) c
+        ON c.task_idfi = t.id""",
+)
+
+# The ids bounding the :candidates newest matches, read once for the first page and
+# carried in the cursor, so later pages rank the same candidates however tasks change
+SQLITE_WINDOW = """
+    SELECT coalesce(min(rowid), 0) AS floor, coalesce(max(rowid), 0) AS ceiling FROM (
+        SELECT rowid FROM task_search WHERE task_search MATCH :query ORDER BY rowid DESC LIMIT :candidates
+    )
+"""
+
+SQLITE_SEARCH = """
+    SELECT id, score FROM (
+        SELECT rowid AS id, bm25(task_search, 5.0, 2.0, 1.0) AS score
+        FROM task_search
+        WHERE task_search MATCH :query AND rowid BETWEEN :floor AND :ceiling
+    )
+    WHERE :after_id IS NULL OR score > :after_score OR (score = :after_score AND id < :after_id)
+    ORDER BY score, id DESC
+    LIMIT :limit
+"""
+
+# Weighted document of task t, given c.content holding its comments joined together
+_PG_DOCUMENT = """
+    setweight(to_tsvector('english', coalesce(t.title, '')), 'A')
+    || setweight(to_tsvector('english', coalesce(t.description, '')), 'B')
+    || setweight(to_tsvector('english', coalesce(c.content, '')), 'C')
+"""
+
+POSTGRESQL_DDL = (
+    """CREATE TABLE IF NOT EXISTS task_search (
+        task_id integer PRIMARY KEY REFERENCES tasks (id) ON DELETE CASCADE,
+        document tsvector NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS ix_task_search_document ON task_search USING gin (document)",
+    f"""CREATE OR REPLACE FUNCTION task_search_refresh(target integer) RETURNS void LANGUAGE sql AS $$
+        INSERT INTO task_search (task_id, document)
+        SELECT t.id, {_PG_DOCUMENT}
+        FROM tasks t
+        LEFT JOIN (SELECT string_agg(content, ' ') AS content FROM comments WHERE task_idfi = target) c ON true
+        WHERE t.id = target
+        ON CONFLICT (task_id) DO UPDATE SET document = EXCLUDED.document
+    $$""",
+    """CREATE OR REPLACE FUNCTION task_search_task_changed() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        PERFORM task_search_refresh(NEW.id);
+        RETURN NULL;
+    END $$""",
+    """CREATE OR REPLACE FUNCTION task_search_comment_changed() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP <> 'INSERT' THEN
+            PERFORM task_search_refresh(OLD.task_idfi);
+        END IF;
+        IF TG_OP = 'INSERT' OR (TG_OP = 'UPDATE' AND NEW.task_idfi IS DISTINCT FROM OLD.task_idfi) THEN
+            PERFORM task_search_refresh(NEW.task_idfi);
+        END IF;
+        RETURN NULL;
+    END $$""",
+    "DROP TRIGGER IF EXISTS task_search_task ON tasks",
+    """CREATE TRIGGER task_search_task AFTER INSERT OR UPDATE OF title, description ON tasks
+        FOR EACH ROW EXECUTE FUNCTION task_search_task_changed()""",
+    "DROP TRIGGER IF EXISTS task_search_comment ON comments",
+    """CREATE TRIGGER task_search_comment AFTER INSERT OR DELETE OR UPDATE OF content, task_idfi ON comments
+        FOR EACH ROW EXECUTE FUNCTION task_search_comment_changed()""",
+)
+
+POSTGRESQL_DROP = (
+    "DROP TABLE IF EXISTS task_search",
+    "DROP FUNCTION IF EXISTS task_search_task_changed() CASCADE",
+    "DROP FUNCTION IF EXISTS task_search_comment_changed() CASCADE",
+    "DROP FUNCTION IF EXISTS task_search_refresh(integer)",
+)
+
+POSTGRESQL_REBUILD = (
+    "TRUNCATE task_search",
+    f"""INSERT INTO task_search (task_id, document)
+    SELECT t.id, {_PG_DOCUMENT}
+    FROM tasks t
+    LEFT JOIN (SELECT task_idfi, string_agg(content, ' ') AS content FROM comments GROUP BY task_idfi) c
+        ON c.task_idfi = t.id""",
+)
+
+# ts_rank returns a real, whose text form does not convert back to the same value, so the
+# score is cast to double precision for cursors to compare equal ranks exactly
+POSTGRESQL_WINDOW = """
+    SELECT coalesce(min(task_id), 0) AS floor, coalesce(max(task_id), 0) AS ceiling FROM (
+        SELECT task_id FROM task_search
+        WHERE document @@ plainto_tsquery('english', :query)
+        ORDER BY task_id DESC LIMIT :candidates
+    ) newest
+"""
+
+POSTGRESQL_SEARCH = """
+    SELECT id, score FROM (
+        SELECT task_id AS id, -CAST(ts_rank(document, query) AS double precision) AS score
+        FROM task_search, plainto_tsquery('english', :query) query
+        WHERE document @@ query AND task_id BETWEEN :floor AND :ceiling
+    ) matches
+    WHERE CAST(:after_id AS integer) IS NULL OR score > :after_score OR (score = :after_score AND id < :after_id)
+    ORDER BY score, id DESC
+    LIMIT :limit
+"""
+
+
+# Whether a match older than the window exists, i.e. whether the cap left some of them unranked
+SQLITE_OLDER_MATCHES = "SELECT rowid FROM task_search WHERE task_search MATCH :query AND rowid < :floor LIMIT 1"
+POSTGRESQL_OLDER_MATCHES = """
+    SELECT task_id FROM task_search WHERE document @@ plainto_tsquery('english', :query) AND task_id < :floor LIMIT 1
+"""
+
+
+class SearchError(ValueError):
+    """Raised when the search query has no words to look for."""
+
+
+def _statements(connection, sqlite, postgresql):
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        return sqlite
+    if dialect == "postgresql":
+        return postgresql
+    raise NotImplementedError(f"Full-text search is not supported on {dialect}")
+
+
+def install(connection):
+    """Create the search index and the triggers that keep it up to date.
+
+    The triggers update a task's entry whenever the task or one of its comments is
+    inserted, edited or deleted, so the ORM, the bulk endpoints' Core statements and the
+    synthetic data generator all keep the index current without any application code.
+    An index created over existing tasks is filled from them.
+    """
+    existed = inspect(connection).has_table(SEARCH_TABLE)
+    for statement in _statements(connection, SQLITE_DDL, POSTGRESQL_DDL):
+        connection.exec_driver_sql(statement)
+    if not existed:
+        rebuild(connection)
+
+
+def uninstall(connection):
+    """Drop the search index and its triggers."""
+    for statement in _statements(connection, SQLITE_DROP, POSTGRESQL_DROP):
+        connection.exec_driver_sql(statement)
+
+
+def rebuild(connection):
+    """Rebuild the whole search index from the tasks and comments tables."""
+    for statement in _statements(connection, SQLITE_REBUILD, POSTGRESQL_REBUILD):
+        connection.exec_driver_sql(statement)
+
+
+def is_search_table(name):
+    """Whether a table belongs to the search index, which lives outside the models' metadata."""
+    return name == SEARCH_TABLE or name.startswith(SEARCH_TABLE + "_")
+
+
+def search_page(text, limit, after=None):
+    """Return one page of the ids of tasks matching text, best match first.
+
+    A task matches when its title, description or comments contain every word of text
+    (after stemming, so "reports" finds "report"). Matches in the title rank highest,
+    then the description, then comments, and equal matches list the newest task first.
+
+    Ranking costs time for every matching task, so only the SEARCH_MAX_CANDIDATES newest
+    matches (10000 by default) are ranked. That keeps queries for common words as fast as
+    rare ones but leaves older matches out; the result then says it was truncated.
+    Setting it to 0 ranks every match.
+
+    The first page fixes the range of task ids being ranked, and the cursor carries it,
+    so paging never skips or repeats a match when tasks are added or edited meanwhile.
+
+    Args:
+        text (str): The search query.
+        limit (int): Maximum number of task ids in the page.
+        after (str): Cursor returned with the previous page, if any.
+
+    Returns:
+        tuple: The task ids of this page, the cursor of the next page (None on the last page)
+        and whether matches beyond SEARCH_MAX_CANDIDATES were left out of the ranking.
+
+    Raises:
+        SearchError: If text contains no words.
+        PaginationError: If the cursor is malformed.
+    """
+    words = re.findall(r"\w+", text)
+    if not words:
+        raise SearchError("Search query must contain at least one word")
+
+    max_candidates = current_app.config["SEARCH_MAX_CANDIDATES"] or None
+    candidates = max_candidates
+    if db.session.get_bind().dialect.name == "sqlite":
+        # Quote every word so FTS5 operators and punctuation in the query are taken literally;
+        # a negative LIMIT is SQLite's "no limit"
+        window, statement, older_matches = SQLITE_WINDOW, SQLITE_SEARCH, SQLITE_OLDER_MATCHES
+        query = " ".join(f'"{word}"' for word in words)
+        candidates = candidates or -1
+    else:
+        window, statement, older_matches = POSTGRESQL_WINDOW, POSTGRESQL_SEARCH, POSTGRESQL_OLDER_MATCHES
+        query = " ".join(words)
+
+    if after:
+        after_score, after_id, floor, ceiling = decode_search_cursor(after)
+    else:
+        after_score, after_id = None, None
+        floor, ceiling = db.session.execute(db.text(window), {"query": query, "candidates": candidates}).one()
+
+    rows = db.session.execute(db.text(statement), {
+        "query": query, "floor": floor, "ceiling": ceiling, "after_score": after_score, "after_id": after_id,
+        "limit": limit + 1
+    }).all()
+    truncated = max_candidates is not None and db.session.execute(
+        db.text(older_matches), {"query": query, "floor": floor}
+    ).first() is not None
+
+    if len(rows) <= limit:
+        return [row.id for row in rows], None, truncated
+    rows = rows[:limit]
+    return [row.id for row in rows], encode_search_cursor(rows[-1].score, rows[-1].id, floor, ceiling), truncated
@@ -0,0 +1,247 @@
+from flask import current_app
+from marshmallow import Schema, fields
+from marshmallow.decorators import PRE_DUMP, POST_DUMP
+from marshmallow.utils import missing, ensure_text_type
+from utils.loading import nested_schema
+from utils.timing import span
+
+# Compiled dump functions keyed by the options that determine a schema's output
+_compiled = {}
+_MAX_COMPILED = 256
+
+
+class UnsupportedSchema(Exception):
+    """Raised when a schema relies on behaviour the compiled serializer does not reproduce."""
+
+
+def _schema_key(schema):
+    """Return a hashable key identifying everything that shapes a schema's output.
+
+    marshmallow moves the dotted only= and exclude= names onto the nested fields, so
+    the nested schemas' keys are part of it: ?expand=comments and ?expand=comments.user
+    give the same top level fields but different output. The key is kept on the schema
+    instance, as the module level schemas are dumped with on every request.
+    """
+    key = schema.__dict__.get("_compiled_key")
+    if key is None:
+        nested = tuple(
+            (name, _schema_key(nested_schema(field)))
+            for name, field in schema.dump_fields.items() if nested_schema(field) is not None
+        )
+        key = (
+            type(schema),
+            schema.many,
+            tuple(schema.only) if schema.only is not None else None,
+            tuple(schema.exclude),
+            nested,
+        )
+        schema._compiled_key = key
+    return key
+
+
+def _check_schema(schema):
+    if any(schema._has_processors(tag) for tag in (PRE_DUMP, POST_DUMP)):
+        raise UnsupportedSchema(f"{type(schema).__name__} has dump processors")
+    if type(schema).get_attribute is not Schema.get_attribute:
+        raise UnsupportedSchema(f"{type(schema).__name__} overrides get_attribute")
+
+
+def _plain_value_field(field):
+    """True when the field reads its value with a plain attribute lookup."""
+    return (
+        field.dump_default is missing
+        and field._CHECK_ATTRIBUTE
+        and type(field).get_value is fields.Field.get_value
+        and type(field).serialize is fields.Field.serialize
+    )
+
+
+class _Compiler:
+    """Generates one Python function per schema level that builds the dumped dict directly."""
+
+    def __init__(self):
+        self.namespace = {"_missing": missing, "_text": ensure_text_type}
+        self.sources = []
+        self.counter = 0
+
+    def name(self, prefix, value):
+        self.counter += 1
+        name = f"_{prefix}{self.counter}"
+        self.namespace[name] = value
+        return name
+
+    def value_expression(self, field, schema):
+        """Return an expression converting the local v the way field._serialize would.
+
+        Returns None when the field has no fast form, in which case the caller falls back
+        to the field's own serialize method.
+        """
+        field_type = type(field)
+
+        if field_type in (fields.String, fields.Email):
+            return "None if v is None else (v if v.__class__ is str else _text(v))"
+
+        if field_type in (fields.DateTime, fields.Date):
+            data_format = field.format or field.DEFAULT_FORMAT
+            format_func = field.SERIALIZATION_FUNCS.get(data_format)
+            if format_func:
+                return f"None if v is None else {self.name('fmt', format_func)}(v)"
+            return f"None if v is None else v.strftime({data_format!r})"
+
+        if field_type in (fields.Integer, fields.Float) and not field.as_string:
+            return f"None if v is None else {field.num_type.__name__}(v)"
+
+        if field_type is fields.Raw:
+            return "v"
+
+        if field_type is fields.Inferred:
+            return f"{self.name('infer', self.inferred_converter(field, schema))}(v)"
+
+        if field_type is fields.Nested:
+            child = self.compile_level(field.schema)
+            if field.schema.many or field.many:
+                return f"None if v is None else [{child}(x) for x in v]"
+            return f"None if v is None else {child}(v)"
+
+        if field_type is fields.List and type(field.inner) is fields.Nested and not field.inner.many:
+            child = self.compile_level(field.inner.schema)
+            return f"None if v is None else [None if x is None else {child}(x) for x in v]"
+
+        return None
+
+    def inferred_converter(self, field, schema):
+        """Build the type dispatch marshmallow's Inferred field performs on every value."""
+        converters = {}
+        for value_type, field_cls in schema.TYPE_MAPPING.items():
+            bound = field_cls()
+            bound._bind_to_schema(field.name, field.parent)
+            if field_cls in (fields.Raw, fields.String, fields.Integer, fields.Float, fields.Boolean) \
+                    and value_type in (str, int, float, bool, tuple, list, set):
+                # These serialize an exact instance of their own type to itself
+                continue
+            if field_cls in (fields.DateTime, fields.Date):
+                format_func = bound.SERIALIZATION_FUNCS.get(bound.format or bound.DEFAULT_FORMAT)
+                if format_func:
+                    converters[value_type] = format_func
+                    continue
+            converters[value_type] = lambda value, bound=bound: bound._serialize(value, None, None)
+
+        get = converters.get
+
+        def infer(value):
+            convert = get(value.__class__)
+            return value if convert is None else convert(value)
+
+        return infer
+
+    def compile_level(self, schema):
+        """Emit the dump function for a single (non-many) object of schema and return its name."""
+        _check_schema(schema)
+        func_name = self.name("dump", None)
+        lines = [
+            f"def {func_name}(obj):",
+            "    d = {}",
+        ]
+
+        for attr_name, field in schema.dump_fields.items():
+            key = field.data_key if field.data_key is not None else attr_name
+            attribute = field.attribute or attr_name
+            expression = None
+            if _plain_value_field(field) and "." not in attribute:
+                expression = self.value_expression(field, schema)
+
+            if expression is None:
+                # Exactly what Schema._serialize does for fields without a fast form
+                field_name = self.name("field", field)
+                accessor = self.name("accessor", schema.get_attribute)
+                lines.append(f"    v = {field_name}.serialize({attr_name!r}, obj, accessor={accessor})")
+                lines.append("    if v is not _missing:")
+                lines.append(f"        d[{key!r}] = v")
+            else:
+                lines.append(f"    v = getattr(obj, {attribute!r}, _missing)")
+                lines.append("    if v is not _missing:")
+                lines.append(f"        d[{key!r}] = {expression}")
+
+        lines.append("    return d")
+        self.sources.append("\n".join(lines))
+        return func_name
+
+    def build(self, schema):
+        entry = self.compile_level(schema)
+        exec(compile("\n\n".join(self.sources), f"<compiled {type(schema).__name__}>", "exec"), self.namespace)
+        return self.namespace[entry]
+
+
+def compile_schema(schema):
+    """Generate a dump function equivalent to schema.dump.
+
+    The generated code reads each attribute once and converts it inline, skipping the
+    per-field dispatch marshmallow does on every value. Nested schemas are compiled into
+    the same module, so a task with its comments, user, category and tracking record is
+    dumped by straight-line code. Fields without a fast form fall back to their own
+    serialize method, and the output is the same as schema.dump's.
+
+    Args:
+        schema: The schema instance to compile.
+
+    Returns:
+        function: Takes an object (or a list of objects for many schemas) and returns
+        the dumped data.
+
+    Raises:
+        UnsupportedSchema: If the schema or a nested schema uses dump processors or a
+        custom get_attribute.
+    """
+    dump_one = _Compiler().build(schema)
+    plain_types = set()
+    fallback = type(schema)(only=schema.only, exclude=schema.exclude)
+
+    def dump_object(obj):
+        # marshmallow tries item access before attributes, so mappings take the slow path
+        cls = obj.__class__
+        if cls not in plain_types:
+            if hasattr(cls, "__getitem__"):
+                return fallback.dump(obj)
+            plain_types.add(cls)
+        return dump_one(obj)
+
+    if schema.many:
+        return lambda objs: [dump_object(obj) for obj in objs]
+    return dump_object
+
+
+def _compiled_dump(schema):
+    key = _schema_key(schema)
+    dump = _compiled.get(key)
+    if dump is None:
+        try:
+            dump = compile_schema(schema)
+        except UnsupportedSchema:
+            dump = schema.dump
+        if len(_compiled) >= _MAX_COMPILED:
+            _compiled.clear()
+        _compiled[key] = dump
+    return dump
+
+
+def precompile(*schemas):
+    """Compile the given schemas up front so the first requests don't pay for it."""
+    for schema in schemas:
+        _compiled_dump(schema)
+
+
+def fast_dump(schema, obj):
+    """Dump obj with the compiled form of schema, or schema.dump when FAST_SERIALIZER is off.
+
+    Only serialization is compiled; loading and validation always go through marshmallow.
+    """
+    with span("serialize"):
+        if not current_app.config.get("FAST_SERIALIZER", True):
+            return schema.dump(obj)
+        return _compiled_dump(schema)(obj)
+
+
+def load_data(schema, data, **kwargs):
+    """Validate and deserialize data with schema.load, counting the time as serialization."""
+    with span("serialize"):
+        return schema.load(data, **kwargs)
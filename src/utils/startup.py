@@ -0,0 +1,132 @@
+import threading
+import time
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy.orm import configure_mappers
+from sqlalchemy.pool import QueuePool
+from init import db
+
+
+class LazyAppGroup(AppGroup):
+    """The app's CLI group, running load() before its commands are first listed or looked up."""
+
+    def __init__(self, name, load):
+        super().__init__(name)
+        self._load = load
+        self._loaded = False
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self._loaded = True
+            self._load()
+
+    def get_command(self, ctx, cmd_name):
+        self._ensure_loaded()
+        return super().get_command(ctx, cmd_name)
+
+    def list_commands(self, ctx):
+        self._ensure_loaded()
+        return super().list_commands(ctx)
+
+
+class Startup:
+    """Loads the app's views, in create_app or on the first request, and warms the app up.
+
+    Loading the views imports the controllers and registers their blueprints. With
+    STARTUP_LAZY it happens just before the first request is dispatched, since a Flask
+    app cannot add routes once it has handled one, and each serializer is compiled the
+    first time it is used rather than all of them up front.
+
+    The pre-warm (STARTUP_PREWARM) loads the views, compiles the serializers, configures
+    the mappers and opens every engine's pool connections, so the first requests don't
+    pay for any of it. Until it has finished GET /ready answers 503, keeping a readiness
+    probe from routing traffic to the worker.
+    """
+
+    def __init__(self, app, load_views, precompile):
+        self.app = app
+        self._load_views = load_views
+        self._precompile = precompile
+        self._lock = threading.Lock()
+        self.loaded = False
+        self.warmed = not app.config["STARTUP_PREWARM"]
+        self.load_seconds = None
+        self.warm_seconds = None
+
+    def load(self):
+        """Load the views unless that has been done already."""
+        with self._lock:
+            if self.loaded:
+                return
+            started = time.perf_counter()
+            self._load_views(self.app)
+            self.load_seconds = time.perf_counter() - started
+            self.loaded = True
+
+    def warm(self):
+        """Do the work the first requests would otherwise pay for, then mark the app ready.
+
+        Under create_async_app it must run in a greenlet (see utils.asgi.GreenletASGI).
+        """
+        started = time.perf_counter()
+        self.load()
+        with self.app.app_context():
+            self._precompile(self.app)
+            configure_mappers()
+            self.app.url_map.update()
+            for engine in db.engines.values():
+                # A pool keeps pool_size connections; other pools hold one per thread, or none
+                size = engine.pool.size() if isinstance(engine.pool, QueuePool) else 1
+                connections = [engine.connect() for _ in range(size)]
+                for connection in connections:
+                    connection.close()
+        self.warm_seconds = time.perf_counter() - started
+        self.warmed = True
+
+    @property
+    def ready(self):
+        return self.loaded and self.warmed
+
+    def wsgi_middleware(self, wsgi_app):
+        def load_then_dispatch(environ, start_response):
+            if not self.loaded:
+                self.load()
+            return wsgi_app(environ, start_response)
+        return load_then_dispatch
+
+
+def init_app(app, load_views, load_commands, precompile):
+    """Load the app's views and CLI commands according to the STARTUP_* settings and add GET /ready.
+
+    With STARTUP_LAZY the CLI commands are loaded the first time the flask command
+    looks one up, so serving requests never imports them.
+
+    Args:
+        app: The Flask application.
+        load_views (callable): Takes the app; registers the HTTP blueprints and compiles the serializers.
+        load_commands (callable): Takes the app; registers the CLI blueprints.
+        precompile (callable): Takes the app; compiles the serializers.
+    """
+    startup = Startup(app, load_views, precompile)
+    app.extensions["startup"] = startup
+    app.add_url_rule("/ready", "ready", _ready)
+
+    if app.config["STARTUP_LAZY"]:
+        app.cli = LazyAppGroup(app.cli.name, lambda: load_commands(app))
+        app.wsgi_app = startup.wsgi_middleware(app.wsgi_app)
+    else:
+        load_commands(app)
+        startup.load()
+        precompile(app)
+
+    # The async app warms up from its ASGI lifespan startup, inside the event loop
+    if app.config["STARTUP_PREWARM"] and not app.config["SQLALCHEMY_ASYNC"]:
+        threading.Thread(target=startup.warm, name="prewarm", daemon=True).start()
+    return startup
+
+
+def _ready():
+    startup = current_app.extensions["startup"]
+    if not startup.ready:
+        return {"status": "starting"}, 503, {"Retry-After": "1"}
+    return {"status": "ready"}
@@ -0,0 +1,51 @@
+from flask import Response, current_app, request, stream_with_context
+from init import db
+from utils.negotiation import MSGPACK_MIMETYPE, packb, wants_msgpack
+from utils.serializer import fast_dump
+
+
+def wants_stream():
+    """True when the client asked for a streamed response with ?stream=true."""
+    return request.args.get("stream", "").lower() in ("1", "true", "yes")
+
+
+def stream_json(stmt, schema):
+    """Stream the rows of stmt as a JSON array, dumping them a chunk at a time.
+
+    The statement runs with yield_per (and therefore stream_results, so PostgreSQL uses
+    a server-side cursor). Each chunk of rows is eagerly loaded, dumped and encoded
+    before the next one is fetched, and nothing keeps a reference to earlier chunks, so
+    peak memory depends on STREAM_CHUNK_SIZE rather than on the size of the table.
+
+    Args:
+        stmt: The select statement, with its ordering and loader options applied.
+        schema: The many=True schema to dump each chunk with.
+
+    MessagePack has no array of unknown length, so when the client asks for
+    application/msgpack (see utils.negotiation) the rows are streamed as a sequence of
+    MessagePack maps, one after the other, to be read with msgpack.Unpacker.
+
+    Returns:
+        Response: A chunked application/json (or application/msgpack) response.
+    """
+    chunk_size = current_app.config["STREAM_CHUNK_SIZE"]
+    stmt = stmt.execution_options(yield_per=chunk_size)
+
+    if wants_msgpack():
+        def generate_msgpack():
+            for rows in db.session.scalars(stmt).partitions():
+                yield b"".join(packb(item) for item in fast_dump(schema, rows))
+
+        return Response(stream_with_context(generate_msgpack()), mimetype=MSGPACK_MIMETYPE)
+
+    def generate():
+        dumps = current_app.json.dumps
+        separator = ""
+        yield "["
+        for rows in db.session.scalars(stmt).partitions():
+            encoded = ",".join(dumps(item) for item in fast_dump(schema, rows))
+            yield separator + encoded
+            separator = ","
+        yield "]"
+
+    return Response(stream_with_context(generate()), mimetype="application/json")
@@ -0,0 +1,190 @@
+import random
+import time
+from datetime import datetime, timedelta
+from init import bcrypt, db
+from models.users import User
+from models.category import Category
+from models.task import Task
+from models.comment import Comment
+from models.task_tracking import TaskTracking
+
+# Every generated user logs in with this password
+SYNTHETIC_PASSWORD = "password123"
+
+# Categories with Zipf-like weights, so a few labels hold most tasks
+CATEGORY_LABELS = (
+    "Work", "Personal", "Team Collaboration", "On Hold", "Errands", "Finance",
+    "Health", "Learning", "Home", "Travel", "Side Project", "Admin"
+)
+CATEGORY_WEIGHTS = tuple(1 / rank ** 1.2 for rank in range(1, len(CATEGORY_LABELS) + 1))
+
+PRIORITY_WEIGHTS = {"Medium": 40, "Low": 25, "High": 15, "Routine": 10, "Optional": 6, "Critical": 4}
+
+VERBS = ("Review", "Update", "Prepare", "Fix", "Plan", "Draft", "Test", "Book", "Organise", "Clean", "Email", "Finish")
+NOUNS = (
+    "quarterly budget", "project report", "login module", "team meeting", "release notes",
+    "client proposal", "dentist appointment", "garden", "tax return", "onboarding guide",
+    "database backup", "holiday itinerary", "API documentation", "grocery list"
+)
+COMMENTS = (
+    "Looks good, needs more testing.", "Can we move this to next week?", "Blocked on feedback.",
+    "Done, please review.", "Added the missing details.", "Found another issue while checking this.",
+    "This is taking longer than estimated.", "Reassigning after the meeting."
+)
+
+# Dates are spread around a fixed day so the same seed always produces the same rows
+ANCHOR = datetime(2024, 7, 1, 9, 0)
+
+
+def _next_id(model):
+    return db.session.scalar(db.select(db.func.coalesce(db.func.max(model.id), 0))) + 1
+
+
+def _batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class _Inserter:
+    """Inserts rows with executemany in batches and keeps per-table counts and timings."""
+
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+        self.counts = {}
+        self.seconds = {}
+
+    def insert(self, model, rows):
+        table = model.__table__
+        for batch in _batches(rows, self.batch_size):
+            start = time.perf_counter()
+            db.session.execute(table.insert(), batch)
+            db.session.commit()
+            self.seconds[table.name] = self.seconds.get(table.name, 0) + time.perf_counter() - start
+            self.counts[table.name] = self.counts.get(table.name, 0) + len(batch)
+
+
+def _category_ids(labels):
+    """Return the ids of the synthetic categories, creating the ones that don't exist yet."""
+    stmt = db.select(db.func.lower(Category.label), Category.id)
+    existing = dict(db.session.execute(stmt).all())
+    missing = [{"label": label} for label in labels if label.lower() not in existing]
+    if missing:
+        db.session.execute(Category.__table__.insert(), missing)
+        db.session.commit()
+        existing = dict(db.session.execute(stmt).all())
+    return [existing[label.lower()] for label in labels]
+
+
+def generate(users, tasks_per_user, comments_per_task, seed=0, batch_size=5000):
+    """Insert a reproducible synthetic dataset and return per-table row counts and timings.
+
+    Each user gets tasks_per_user tasks, and each task gets comments_per_task comments
+    from random users. About 70% of tasks have a tracking record and 10% have no due
+    date. Categories and priorities are skewed the way real task lists are, with a few
+    labels and Medium/Low priorities covering most tasks. Rows are generated lazily and
+    inserted batch_size at a time with executemany and ids assigned up front, so memory
+    use does not grow with the dataset. All users share one password hash, computed once.
+
+    The first generated user is an admin. Emails are user<id>@example.com and the
+    password is SYNTHETIC_PASSWORD.
+
+    Args:
+        users (int): Number of users to create.
+        tasks_per_user (int): Tasks created for each user.
+        comments_per_task (int): Comments created on each task.
+        seed (int): Seed for the random generator; the same seed gives the same data.
+        batch_size (int): Rows per INSERT and per commit.
+
+    Returns:
+        tuple: Dicts of rows inserted and seconds spent, keyed by table name.
+    """
+    rng = random.Random(seed)
+    inserter = _Inserter(batch_size)
+    password = bcrypt.generate_password_hash(SYNTHETIC_PASSWORD).decode("utf-8")
+
+    first_user = _next_id(User)
+    inserter.insert(User, (
+        {
+            "id": user_id,
+            "name": f"User {user_id}",
+            "email": f"user{user_id}@example.com",
+            "password": password,
+            "is_admin": user_id == first_user
+        }
+        for user_id in range(first_user, first_user + users)
+    ))
+
+    category_ids = _category_ids(CATEGORY_LABELS)
+    priorities = tuple(PRIORITY_WEIGHTS)
+    priority_weights = tuple(PRIORITY_WEIGHTS.values())
+    first_task = _next_id(Task)
+    comment_id = _next_id(Comment)
+    tracking_id = _next_id(TaskTracking)
+    total_tasks = users * tasks_per_user
+
+    for start in range(0, total_tasks, batch_size):
+        count = min(batch_size, total_tasks - start)
+        task_ids = range(first_task + start, first_task + start + count)
+        categories = rng.choices(category_ids, weights=CATEGORY_WEIGHTS, k=count)
+        task_priorities = rng.choices(priorities, weights=priority_weights, k=count)
+
+        tasks = []
+        for offset, task_id in enumerate(task_ids):
+            due = None if rng.random() < 0.1 else (ANCHOR + timedelta(days=rng.randint(-180, 180))).date()
+            tasks.append({
+                "id": task_id,
+                "title": f"{rng.choice(VERBS)} {rng.choice(NOUNS)}",
+                "description": f"Task {task_id}: {rng.choice(VERBS).lower()} the {rng.choice(NOUNS)} before the deadline.",
+                "due_date": due,
+                "priority": task_priorities[offset],
+                "category_id": categories[offset],
+                "user_id": first_user + (start + offset) // tasks_per_user
+            })
+        inserter.insert(Task, tasks)
+
+        comments = []
+        for task_id in task_ids:
+            for _ in range(comments_per_task):
+                comments.append({
+                    "id": comment_id,
+                    "content": rng.choice(COMMENTS),
+                    "timestamp": ANCHOR + timedelta(minutes=rng.randint(0, 525600)),
+                    "user_id": first_user + rng.randrange(users),
+                    "task_idfi": task_id
+                })
+                comment_id += 1
+        inserter.insert(Comment, comments)
+
+        trackings = []
+        for task_id in task_ids:
+            if rng.random() < 0.7:
+                started = ANCHOR + timedelta(minutes=rng.randint(0, 525600))
+                estimated = rng.choice((1, 2, 4, 8, 16, 40))
+                finished = started + timedelta(hours=estimated * rng.uniform(0.5, 2)) if rng.random() < 0.5 else None
+                trackings.append({
+                    "id": tracking_id,
+                    "task_id": task_id,
+                    "estimated_hours": estimated,
+                    "started_at": started,
+                    "finished_at": finished,
+                    "actual_hours": round((finished - started).total_seconds() / 3600, 2) if finished else None
+                })
+                tracking_id += 1
+        inserter.insert(TaskTracking, trackings)
+
+    if db.engine.dialect.name == "postgresql":
+        # Ids were assigned explicitly, so move the serial sequences past them
+        for model in (User, Category, Task, Comment, TaskTracking):
+            table = model.__tablename__
+            db.session.execute(db.text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT COALESCE(MAX(id), 1) FROM {table}))"
+            ))
+        db.session.commit()
+
+    return inserter.counts, inserter.seconds
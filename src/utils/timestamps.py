@@ -0,0 +1,6 @@
+from datetime import datetime, timezone
+
+
+def utc_now():
+    """Return the current UTC time as a naive datetime, the way the database columns store it."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
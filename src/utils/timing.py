@@ -0,0 +1,159 @@
+import json
+import logging
+import time
+from contextlib import nullcontext
+from flask import g, has_request_context, request
+from flask_jwt_extended.default_callbacks import default_decode_key_callback
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger("server_timing")
+
+# Metrics in the order they appear in the Server-Timing header
+METRICS = ("db", "serialize", "json", "auth")
+
+_null_span = nullcontext()
+
+
+class _Span:
+    __slots__ = ("name", "started")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        timings = g.get("server_timing")
+        if timings is not None:
+            timings[self.name] += time.perf_counter() - self.started
+
+
+def span(name):
+    """Context manager adding the time spent inside it to metric name of the current request.
+
+    Returns a shared no-op context outside a request, or when the request's app has
+    SERVER_TIMING off, so instrumented code costs a lookup in g when disabled.
+    """
+    if not _timed():
+        return _null_span
+    return _Span(name)
+
+
+def _timed():
+    # Only requests of apps with SERVER_TIMING on get g.server_timing (see _start_request)
+    return has_request_context() and g.get("server_timing") is not None
+
+
+def auth_checked():
+    """Close the auth span opened when the JWT's decode key was looked up."""
+    if _timed():
+        started = g.pop("auth_started", None)
+        if started is not None:
+            g.server_timing["auth"] += time.perf_counter() - started
+
+
+def init_app(app):
+    """Register the timing hooks when SERVER_TIMING is set; otherwise do nothing at all.
+
+    Timed: SQL statements (every engine, via cursor execute events), schema dump and load
+    (serialize), response JSON or MessagePack encoding (json), and JWT verification plus
+    bcrypt work (auth). Each response gets a Server-Timing header, and a JSON line with the
+    same breakdown is logged to the server_timing logger. Time spent producing a streamed
+    body after the headers are sent is not included.
+
+    The SQL listeners are registered once for every engine, but only time statements run
+    by a request of an app with SERVER_TIMING on.
+    """
+    if not app.config["SERVER_TIMING"]:
+        return
+
+    if not logger.handlers:
+        logger.addHandler(logging.StreamHandler())
+        logger.setLevel(logging.INFO)
+
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
+
+    from init import jwt
+    jwt.decode_key_loader(_start_auth)
+    app.json = _timed_json_provider(app)
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+
+
+def _timed_json_provider(app):
+    provider_class = type(app.json)
+
+    class TimedJSONProvider(provider_class):
+        def dumps(self, obj, **kwargs):
+            with span("json"):
+                return super().dumps(obj, **kwargs)
+
+    provider = TimedJSONProvider(app)
+    provider.__dict__.update(app.json.__dict__)
+    return provider
+
+
+def _start_auth(jwt_header, jwt_data):
+    # Called first while a token is verified; auth_checked() runs after the user lookup
+    if has_request_context():
+        g.auth_started = time.perf_counter()
+    return default_decode_key_callback(jwt_header, jwt_data)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _timed():
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started_stack = conn.info.get("query_started")
+    if not started_stack:
+        return
+    started = started_stack.pop()
+    if _timed():
+        g.server_timing["db"] += time.perf_counter() - started
+        g.server_timing["db-count"] += 1
+
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute; drop its start time so the
+    # next statement on this connection is not matched with it
+    connection = exception_context.connection
+    if connection is not None and exception_context.execution_context is not None:
+        started_stack = connection.info.get("query_started")
+        if started_stack:
+            started_stack.pop()
+
+
+def _start_request():
+    g.server_timing = dict.fromkeys(METRICS, 0.0)
+    g.server_timing["db-count"] = 0
+    g.request_started = time.perf_counter()
+
+
+def _finish_request(response):
+    timings = g.get("server_timing")
+    if timings is None:
+        return response
+    total = time.perf_counter() - g.request_started
+
+    metrics = [f"{name};dur={timings[name] * 1000:.2f}" for name in METRICS]
+    metrics.insert(1, f'db-count;desc="{timings["db-count"]}"')
+    metrics.append(f"total;dur={total * 1000:.2f}")
+    response.headers["Server-Timing"] = ", ".join(metrics)
+
+    logger.info(json.dumps({
+        "method": request.method,
+        "path": request.path,
+        "endpoint": request.endpoint,
+        "status": response.status_code,
+        "total_ms": round(total * 1000, 2),
+        **{f"{name}_ms": round(timings[name] * 1000, 2) for name in METRICS},
+        "db_count": timings["db-count"],
+    }))
+    return response
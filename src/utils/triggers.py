@@ -0,0 +1,45 @@
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from init import db
+
+# The databases the search index, counters and change feed have SQL for
+SUPPORTED_DIALECTS = ("sqlite", "postgresql")
+
+
+def check_dialects(app):
+    """Raise ValueError unless every configured database is SQLite or PostgreSQL.
+
+    Any other database would only fail part way through db.create_all or a migration,
+    so create_app checks the URLs before connecting to anything.
+    """
+    urls = [("DATABASE_URL", app.config["SQLALCHEMY_DATABASE_URI"])]
+    urls += [("DATABASE_REPLICA_URLS", url) for url in app.config["DATABASE_REPLICA_URLS"]]
+    for setting, url in urls:
+        if not url:
+            continue
+        dialect = make_url(url).get_backend_name()
+        if dialect not in SUPPORTED_DIALECTS:
+            raise ValueError(f"{setting} must be a SQLite or PostgreSQL database, not {dialect}")
+
+
+@event.listens_for(db.metadata, "after_create")
+def _install(metadata, connection, **kwargs):
+    """Install the search index, counter triggers and change triggers after db.create_all.
+
+    They live outside the models, so the modules defining them are imported only here:
+    main imports this module, and the listeners are registered whether or not the CLI
+    or the controllers (loaded on the first request with STARTUP_LAZY) have been imported.
+    """
+    from utils import changes, counters, search
+    search.install(connection)
+    counters.install(connection)
+    changes.install(connection)
+
+
+@event.listens_for(db.metadata, "before_drop")
+def _uninstall(metadata, connection, **kwargs):
+    from utils import changes, counters, search
+    # On PostgreSQL the search index references tasks, so it has to go first
+    search.uninstall(connection)
+    counters.uninstall(connection)
+    changes.uninstall(connection)
@@ -0,0 +1,83 @@
+"""Validator queries for conditional GETs.
+
+Each function returns (last_modified, version) for a resource, or None if it does not
+exist. They only read updated_at columns and maintained counters, never relationships,
+and every query they run is answered from an index or a primary key lookup, so a
+validator costs the same however many tasks there are.
+
+Task and category responses embed the name and email of users, so every version
+includes the newest users.updated_at. Renaming any user changes them all, which is
+rare enough to be cheaper than working out whose names a response holds.
+"""
+from init import db
+from models.task import Task
+from models.category import Category
+from models.users import User
+
+
+def _latest(*timestamps):
+    return max((ts for ts in timestamps if ts is not None), default=None)
+
+
+def _newest(column):
+    # max() of an indexed column reads one end of the index
+    return db.select(db.func.max(column)).scalar_subquery()
+
+
+def _task_count():
+    # The counter triggers keep task_count right on every insert and delete, so the sum
+    # over the few categories stands in for counting the tasks table
+    return db.select(db.func.coalesce(db.func.sum(Category.task_count), 0)).scalar_subquery()
+
+
+def tasks_version():
+    """Validator for the task list: count and newest change of tasks, plus category labels and user names."""
+    stmt = db.select(_task_count(), _newest(Task.updated_at), _newest(Category.updated_at), _newest(User.updated_at))
+    count, tasks_changed, categories_changed, users_changed = db.session.execute(stmt).one()
+    return (
+        _latest(tasks_changed, categories_changed, users_changed),
+        (count, tasks_changed, categories_changed, users_changed)
+    )
+
+
+def task_version(task_id):
+    """Validator for a single task, also used for its comments and tracking records."""
+    stmt = (
+        db.select(Task.updated_at, Category.updated_at, _newest(User.updated_at))
+        .join(Category, Task.category_id == Category.id)
+        .where(Task.id == task_id)
+    )
+    row = db.session.execute(stmt).first()
+    if row is None:
+        return None
+    return _latest(*row), tuple(row)
+
+
+def categories_version():
+    """Validator for the category list, which embeds every category's tasks."""
+    stmt = db.select(
+        db.select(db.func.count(Category.id)).scalar_subquery(),
+        _newest(Category.updated_at),
+        _task_count(),
+        _newest(Task.updated_at),
+        _newest(User.updated_at)
+    )
+    row = tuple(db.session.execute(stmt).one())
+    return _latest(row[1], row[3], row[4]), row
+
+
+def category_version(category_id):
+    """Validator for a single category and for the list of its tasks."""
+    category_tasks_changed = (
+        db.select(db.func.max(Task.updated_at))
+        .where(Task.category_id == Category.id)
+        .scalar_subquery()
+    )
+    stmt = (
+        db.select(Category.updated_at, Category.task_count, category_tasks_changed, _newest(User.updated_at))
+        .where(Category.id == category_id)
+    )
+    row = db.session.execute(stmt).first()
+    if row is None:
+        return None
+    return _latest(row[0], row[2], row[3]), tuple(row)
@@ -0,0 +1,42 @@
+from sqlalchemy import event
+from init import db
+from utils.timestamps import utc_now
+
+
+def _parent_task_ids(session):
+    """Collect the ids of tasks whose comments or tracking records are being written."""
+    from models.comment import Comment
+    from models.task_tracking import TaskTracking
+
+    task_ids = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Comment):
+            task_id = obj.task_idfi
+        elif isinstance(obj, TaskTracking):
+            task_id = obj.task_id
+        else:
+            continue
+        # New children attached through the relationship get their foreign key at flush time
+        if task_id is None and obj.task is not None:
+            task_id = obj.task.id
+        if obj in session.dirty and not session.is_modified(obj):
+            continue
+        if task_id is not None:
+            task_ids.add(task_id)
+    return task_ids
+
+
+@event.listens_for(db.session, "before_flush")
+def bump_parent_tasks(session, flush_context, instances):
+    """Bump Task.updated_at when one of its comments or tracking records changes.
+
+    Task responses embed their comments and tracking record, so their validators have to
+    move whenever those children are inserted, edited or deleted. Rows' own updated_at
+    columns are maintained by the column default and onupdate.
+    """
+    from models.task import Task
+
+    for task_id in _parent_task_ids(session):
+        task = session.get(Task, task_id)
+        if task is not None and task not in session.deleted:
+            task.updated_at = utc_now()